@@ -0,0 +1,449 @@
+import collections
+import fnmatch
+import json
+import math
+import queue
+import threading
+import urllib.request
+
+FIRING = 'firing'
+RESOLVED = 'resolved'
+
+_OPERATORS = {
+    '>': lambda value, limit: value > limit,
+    '>=': lambda value, limit: value >= limit,
+    '<': lambda value, limit: value < limit,
+    '<=': lambda value, limit: value <= limit,
+}
+
+# 默认规则：CPU持续过高、磁盘将满、网络吞吐突变、温度过高
+DEFAULT_RULES = [
+    {"name": "cpu-high", "metric": "cpu.usage", "type": "threshold", "op": ">", "value": 90, "for": 60},
+    {"name": "disk-full", "metric": "disk.partitions.*.usage", "type": "threshold", "op": ">", "value": 95},
+    {"name": "network-download-spike", "metric": "network.download", "type": "ewma", "sigma": 6, "warmup": 60},
+    {"name": "network-upload-spike", "metric": "network.upload", "type": "ewma", "sigma": 6, "warmup": 60},
+    {"name": "temperature-high", "metric": "sensors.*", "type": "threshold", "op": ">", "value": 85, "for": 30},
+]
+
+
+class P2Quantile:
+    """Streaming quantile estimate in constant memory (P-square algorithm)"""
+
+    def __init__(self, Quantile: float):
+        if not 0 < Quantile < 1:
+            raise ValueError("quantile must be between 0 and 1")
+        p = Quantile
+        self.Quantile = p
+        self.Count = 0
+        self._heights = []
+        self._positions = [0, 1, 2, 3, 4]
+        self._desired = [0, 2 * p, 4 * p, 2 + 2 * p, 4]
+        self._increments = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def Add(self, Value: float):
+        """Add one observation"""
+        self.Count += 1
+        q = self._heights
+        if len(q) < 5:
+            q.append(Value)
+            q.sort()
+            return
+        n = self._positions
+        if Value < q[0]:
+            q[0] = Value
+            k = 0
+        elif Value >= q[4]:
+            q[4] = Value
+            k = 3
+        else:
+            k = 0
+            while Value >= q[k + 1]:
+                k += 1
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self._desired[i] += self._increments[i]
+        # 调整中间三个标记的位置和高度
+        for i in (1, 2, 3):
+            d = self._desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                height = q[i] + d / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i]) +
+                    (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1]))
+                if not q[i - 1] < height < q[i + 1]:
+                    height = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                q[i] = height
+                n[i] += d
+
+    def Value(self):
+        """Get the current estimate, or None before any observation"""
+        q = self._heights
+        if not q:
+            return None
+        if self.Count < 5:
+            return q[min(len(q) - 1, int(self.Quantile * len(q)))]
+        return q[2]
+
+
+class Rule:
+    """Base alert rule; Metric may be a glob such as disk.partitions.*.usage"""
+
+    def __init__(self, Name: str, Metric: str):
+        self.Name = Name
+        self.Metric = Metric
+
+    def Matches(self, Metric: str) -> bool:
+        return fnmatch.fnmatchcase(Metric, self.Metric)
+
+    def NewState(self):
+        return {}
+
+    def Evaluate(self, State, Timestamp: float, Value: float):
+        """Update state with one sample; returns (firing, description)"""
+        raise NotImplementedError
+
+
+class ThresholdRule(Rule):
+    """Fire when the value stays beyond a limit for at least For seconds"""
+
+    def __init__(self, Name: str, Metric: str, Op: str, Value: float, For: float = 0.0):
+        super().__init__(Name, Metric)
+        if Op not in _OPERATORS:
+            raise ValueError(f"Unknown operator: {Op}")
+        self.Op = Op
+        self.Value = float(Value)
+        self.For = float(For)
+        self._compare = _OPERATORS[Op]
+
+    def Evaluate(self, State, Timestamp, Value):
+        if not self._compare(Value, self.Value):
+            State.pop('since', None)
+            return False, None
+        since = State.setdefault('since', Timestamp)
+        held = Timestamp - since
+        return held >= self.For, f"{Value:.2f} {self.Op} {self.Value:g} for {held:.0f}s"
+
+
+class RollingRule(Rule):
+    """Fire when the avg/max/min over a sliding time window crosses a limit"""
+
+    def __init__(self, Name: str, Metric: str, Op: str, Value: float, Window: float, Func: str = 'avg'):
+        super().__init__(Name, Metric)
+        if Op not in _OPERATORS:
+            raise ValueError(f"Unknown operator: {Op}")
+        if Func not in ('avg', 'max', 'min'):
+            raise ValueError(f"Unknown window function: {Func}")
+        self.Op = Op
+        self.Value = float(Value)
+        self.Window = float(Window)
+        self.Func = Func
+        self._compare = _OPERATORS[Op]
+
+    def NewState(self):
+        # samples: 窗口内全部样本（求和用）；extremes: 单调队列（求最大/最小值用）
+        return {"samples": collections.deque(), "sum": 0.0, "extremes": collections.deque()}
+
+    def Evaluate(self, State, Timestamp, Value):
+        samples, extremes = State["samples"], State["extremes"]
+        samples.append((Timestamp, Value))
+        State["sum"] += Value
+        if self.Func != 'avg':
+            better = (lambda a, b: a >= b) if self.Func == 'max' else (lambda a, b: a <= b)
+            while extremes and better(Value, extremes[-1][1]):
+                extremes.pop()
+            extremes.append((Timestamp, Value))
+        horizon = Timestamp - self.Window
+        while samples[0][0] < horizon:
+            State["sum"] -= samples.popleft()[1]
+        while extremes and extremes[0][0] < horizon:
+            extremes.popleft()
+        observed = State["sum"] / len(samples) if self.Func == 'avg' else extremes[0][1]
+        # 窗口尚未填满时不判定
+        if Timestamp - samples[0][0] < self.Window * 0.9:
+            return False, None
+        return self._compare(observed, self.Value), \
+            f"{self.Func} over {self.Window:g}s = {observed:.2f} {self.Op} {self.Value:g}"
+
+
+class EWMARule(Rule):
+    """Fire on a sudden change: value more than Sigma deviations from its EWMA baseline"""
+
+    def __init__(self, Name: str, Metric: str, Alpha: float = 0.1, Sigma: float = 4.0,
+                 Warmup: int = 30, MinDelta: float = 0.0):
+        super().__init__(Name, Metric)
+        self.Alpha = float(Alpha)
+        self.Sigma = float(Sigma)
+        self.Warmup = int(Warmup)
+        self.MinDelta = float(MinDelta)
+
+    def NewState(self):
+        return {"count": 0, "mean": 0.0, "variance": 0.0}
+
+    def Evaluate(self, State, Timestamp, Value):
+        count, mean, variance = State["count"], State["mean"], State["variance"]
+        delta = Value - mean
+        deviation = math.sqrt(variance)
+        firing = (count >= self.Warmup and abs(delta) > max(self.Sigma * deviation, self.MinDelta)
+                  and deviation > 0)
+        # 先判定再更新基线
+        if count == 0:
+            State["mean"] = Value
+        else:
+            State["mean"] = mean + self.Alpha * delta
+            State["variance"] = (1 - self.Alpha) * (variance + self.Alpha * delta * delta)
+        State["count"] = count + 1
+        return firing, f"{Value:.2f} vs baseline {mean:.2f} ± {deviation:.2f}"
+
+
+class PercentileRule(Rule):
+    """Fire when a streaming quantile of the metric crosses a limit"""
+
+    def __init__(self, Name: str, Metric: str, Op: str, Value: float, Quantile: float = 0.99, MinSamples: int = 30):
+        super().__init__(Name, Metric)
+        if Op not in _OPERATORS:
+            raise ValueError(f"Unknown operator: {Op}")
+        self.Op = Op
+        self.Value = float(Value)
+        self.Quantile = float(Quantile)
+        self.MinSamples = int(MinSamples)
+        self._compare = _OPERATORS[Op]
+
+    def NewState(self):
+        return {"estimator": P2Quantile(self.Quantile)}
+
+    def Evaluate(self, State, Timestamp, Value):
+        estimator = State["estimator"]
+        estimator.Add(Value)
+        if estimator.Count < self.MinSamples:
+            return False, None
+        observed = estimator.Value()
+        return self._compare(observed, self.Value), \
+            f"p{self.Quantile * 100:g} = {observed:.2f} {self.Op} {self.Value:g}"
+
+
+def ParseRule(Data: dict) -> Rule:
+    """Build a rule from its JSON form; raises ValueError naming the rule when it is invalid"""
+    if not isinstance(Data, dict):
+        raise ValueError(f"Alert rule must be an object: {Data!r}")
+    try:
+        return _parse_rule(Data)
+    except (KeyError, TypeError, ValueError) as e:
+        detail = f"missing field {e}" if isinstance(e, KeyError) else str(e)
+        raise ValueError(f"Invalid alert rule {Data.get('name', '<unnamed>')!r}: {detail}") from None
+
+
+def _parse_rule(Data: dict) -> Rule:
+    kind = Data.get('type', 'threshold')
+    name, metric = Data['name'], Data['metric']
+    if kind == 'threshold':
+        return ThresholdRule(name, metric, Data.get('op', '>'), Data['value'], For=Data.get('for', 0))
+    if kind == 'rolling':
+        return RollingRule(name, metric, Data.get('op', '>'), Data['value'], Data['window'], Func=Data.get('func', 'avg'))
+    if kind == 'ewma':
+        return EWMARule(name, metric, Alpha=Data.get('alpha', 0.1), Sigma=Data.get('sigma', 4.0),
+                        Warmup=Data.get('warmup', 30), MinDelta=Data.get('min_delta', 0.0))
+    if kind == 'percentile':
+        return PercentileRule(name, metric, Data.get('op', '>'), Data['value'], Quantile=Data.get('quantile', 0.99),
+                              MinSamples=Data.get('min_samples', 30))
+    raise ValueError(f"Unknown rule type: {kind}")
+
+
+def LoadRules(Path: str = None) -> list:
+    """Load rules from a JSON file (a list of rule objects), or the default rules; invalid rules are skipped"""
+    if not Path:
+        return [ParseRule(data) for data in DEFAULT_RULES]
+    with open(Path, encoding='utf-8') as f:
+        data = json.load(f)
+    if not isinstance(data, list):
+        raise ValueError(f"Alert rules file must contain a list of rules: {Path}")
+    rules = []
+    for item in data:
+        try:
+            rules.append(ParseRule(item))
+        except ValueError as e:
+            print(f"Skipping {e}")
+    return rules
+
+
+class StdoutNotifier:
+    """Print alerts as JSON lines"""
+
+    Name = 'stdout'
+
+    def Send(self, Event: dict):
+        print(json.dumps(Event, ensure_ascii=False), flush=True)
+
+
+class FileNotifier:
+    """Append alerts to a file as JSON lines"""
+
+    Name = 'file'
+
+    def __init__(self, Path: str):
+        self.Path = Path
+
+    def Send(self, Event: dict):
+        with open(self.Path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(Event, ensure_ascii=False) + '\n')
+
+
+class WebhookNotifier:
+    """POST alerts as JSON to a URL"""
+
+    Name = 'webhook'
+
+    def __init__(self, Url: str, Timeout: float = 5.0):
+        self.Url = Url
+        self.Timeout = Timeout
+
+    def Send(self, Event: dict):
+        request = urllib.request.Request(self.Url, data=json.dumps(Event).encode('utf-8'), method='POST')
+        request.add_header('Content-Type', 'application/json')
+        with urllib.request.urlopen(request, timeout=self.Timeout) as response:
+            if not 200 <= response.status < 300:
+                raise OSError(f"webhook returned {response.status}")
+
+
+class _Channel:
+    """One notifier with its own bounded queue and sender thread, retrying with back-off"""
+
+    def __init__(self, Notifier, MaxQueue: int, MaxRetries: int):
+        self.Notifier = Notifier
+        self.MaxRetries = MaxRetries
+        self.Dropped = 0
+        self._queue = queue.Queue(maxsize=MaxQueue)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def Put(self, Event: dict):
+        # 队列满时丢弃最旧的告警，绝不阻塞采样线程
+        while True:
+            try:
+                self._queue.put_nowait(Event)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    self.Dropped += 1
+                except queue.Empty:
+                    pass
+
+    def Start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=f"PySystemInfo-Alert-{self.Notifier.Name}",
+                                            daemon=True)
+            self._thread.start()
+
+    def Stop(self, Timeout: float = 5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(Timeout)
+            self._thread = None
+
+    def _run(self):
+        while not (self._stop.is_set() and self._queue.empty()):
+            try:
+                event = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            backoff = 1.0
+            for attempt in range(self.MaxRetries + 1):
+                try:
+                    self.Notifier.Send(event)
+                    break
+                except Exception as e:
+                    if attempt == self.MaxRetries or self._stop.is_set():
+                        print(f"Alert delivery via {self.Notifier.Name} failed, dropping: {e}")
+                        self.Dropped += 1
+                        break
+                    self._stop.wait(backoff)
+                    backoff = min(60.0, backoff * 2)
+
+
+class AlertEngine:
+    """Evaluate rules incrementally on every sample and deliver state changes asynchronously"""
+
+    def __init__(self, Rules: list, Notifiers=(), Cooldown: float = 300.0, Repeat: float = 0.0,
+                 MaxQueue: int = 1000, MaxRetries: int = 5):
+        self.Rules = list(Rules)
+        self.Cooldown = Cooldown
+        self.Repeat = Repeat
+        self._channels = [_Channel(notifier, MaxQueue, MaxRetries) for notifier in Notifiers]
+        # 指标名 -> 匹配的规则，每个指标只做一次通配符匹配
+        self._matches = {}
+        # (规则名, 指标名) -> [规则状态, 是否告警中, 上次通知时间, 上次恢复时间]
+        self._states = {}
+        self._active = {}
+        self._recent = collections.deque(maxlen=100)
+        self._lock = threading.Lock()
+
+    def Start(self):
+        """Start the delivery threads"""
+        for channel in self._channels:
+            channel.Start()
+
+    def Stop(self):
+        """Deliver what is queued and stop the delivery threads"""
+        for channel in self._channels:
+            channel.Stop()
+
+    def Evaluate(self, Timestamp: float, Values: dict):
+        """Evaluate every rule against one flattened sample"""
+        for metric, value in Values.items():
+            rules = self._matches.get(metric)
+            if rules is None:
+                rules = [rule for rule in self.Rules if rule.Matches(metric)]
+                self._matches[metric] = rules
+            for rule in rules:
+                key = (rule.Name, metric)
+                entry = self._states.get(key)
+                if entry is None:
+                    entry = [rule.NewState(), False, 0.0, None]
+                    self._states[key] = entry
+                firing, detail = rule.Evaluate(entry[0], Timestamp, value)
+                if firing and not entry[1]:
+                    # 刚恢复又触发（抖动）时，冷却期内不重复通知
+                    if entry[3] is not None and Timestamp - entry[3] < self.Cooldown:
+                        continue
+                    entry[1], entry[2] = True, Timestamp
+                    self._emit(FIRING, rule, metric, value, detail, Timestamp)
+                elif firing and self.Repeat and Timestamp - entry[2] >= self.Repeat:
+                    entry[2] = Timestamp
+                    self._emit(FIRING, rule, metric, value, detail, Timestamp)
+                elif not firing and entry[1]:
+                    entry[1], entry[3] = False, Timestamp
+                    self._emit(RESOLVED, rule, metric, value, detail, Timestamp)
+
+    def _emit(self, state: str, rule: Rule, metric: str, value: float, detail, timestamp: float):
+        event = {
+            "rule": rule.Name,
+            "metric": metric,
+            "state": state,
+            "value": value,
+            "detail": detail,
+            "timestamp": timestamp
+        }
+        with self._lock:
+            if state == FIRING:
+                self._active[(rule.Name, metric)] = event
+            else:
+                self._active.pop((rule.Name, metric), None)
+            self._recent.append(event)
+        for channel in self._channels:
+            channel.Put(event)
+
+    def Active(self) -> list:
+        """Get the alerts currently firing"""
+        with self._lock:
+            return list(self._active.values())
+
+    def Recent(self, Limit: int = 50) -> list:
+        """Get the most recent alert events, newest first"""
+        with self._lock:
+            return list(self._recent)[::-1][:Limit]
+
+    def Dropped(self) -> int:
+        """Get the number of alerts dropped by full queues or failed deliveries"""
+        return sum(channel.Dropped for channel in self._channels)
@@ -0,0 +1,294 @@
+import json
+import math
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+
+MAGIC = b'PSIA'
+PREFIX = struct.Struct('<4sI')
+NAN = float('nan')
+
+# 各分辨率的段文件时长（秒）
+SEGMENT_SPANS = {
+    'raw': 3600,
+    '1m': 86400,
+    '1h': 30 * 86400,
+}
+ROLLUPS = (('1m', 60), ('1h', 3600))
+
+
+class Segment:
+    """Append-only file of fixed-width records: a timestamp followed by one double per column"""
+
+    def __init__(self, Path: str, Columns: list = None):
+        self.Path = Path
+        if Columns is None:
+            with open(Path, 'rb') as f:
+                magic, header_size = PREFIX.unpack(f.read(PREFIX.size))
+                if magic != MAGIC:
+                    raise ValueError(f"Not an archive segment: {Path}")
+                self.Columns = json.loads(f.read(header_size - PREFIX.size))
+            self.HeaderSize = header_size
+        else:
+            self.Columns = list(Columns)
+            header = json.dumps(self.Columns).encode('utf-8')
+            # 头部按8字节对齐，记录区可直接按偏移计算
+            self.HeaderSize = (PREFIX.size + len(header) + 7) // 8 * 8
+            with open(Path, 'wb') as f:
+                f.write(PREFIX.pack(MAGIC, self.HeaderSize))
+                f.write(header.ljust(self.HeaderSize - PREFIX.size))
+        self.Record = struct.Struct('<%dd' % (len(self.Columns) + 1))
+        self._file = None
+
+    def Append(self, Timestamp: float, Values: list):
+        """Append one record; Values follow the column order"""
+        if self._file is None:
+            self._file = open(self.Path, 'ab')
+            # 进程崩溃可能在末尾留下不完整的记录：先截掉，保证新记录落在记录边界上
+            size = os.fstat(self._file.fileno()).st_size
+            aligned = self.HeaderSize + max(0, size - self.HeaderSize) // self.Record.size * self.Record.size
+            if aligned != size:
+                self._file.truncate(aligned)
+        self._file.write(self.Record.pack(Timestamp, *Values))
+
+    def Flush(self):
+        if self._file is not None:
+            self._file.flush()
+
+    def Close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def Read(self, Columns: list, Start: float, End: float) -> list:
+        """Read the given columns between Start and End through mmap, without parsing the whole file"""
+        indexes = [self.Columns.index(column) + 1 if column in self.Columns else None for column in Columns]
+        rows = []
+        with open(self.Path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            count = (size - self.HeaderSize) // self.Record.size
+            if count <= 0:
+                return rows
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                record_size = self.Record.size
+                base = self.HeaderSize
+                unpack_double = struct.Struct('<d').unpack_from
+                # 记录按时间追加，二分查找起始记录
+                lo, hi = 0, count
+                while lo < hi:
+                    mid = (lo + hi) // 2
+                    if unpack_double(data, base + mid * record_size)[0] < Start:
+                        lo = mid + 1
+                    else:
+                        hi = mid
+                for i in range(lo, count):
+                    offset = base + i * record_size
+                    t = unpack_double(data, offset)[0]
+                    if t > End:
+                        break
+                    rows.append((t, [NAN if index is None else unpack_double(data, offset + index * 8)[0]
+                                     for index in indexes]))
+        return rows
+
+
+class _Rollup:
+    """Min/max/avg accumulator for one rollup resolution"""
+
+    def __init__(self, Period: int):
+        self.Period = Period
+        self.Bucket = None
+        self.Stats = {}
+
+    def Add(self, Timestamp: float, Values: dict):
+        """Add a sample; returns (bucket, stats) when the previous bucket is complete"""
+        bucket = math.floor(Timestamp / self.Period) * self.Period
+        finished = None
+        if bucket != self.Bucket:
+            if self.Bucket is not None and self.Stats:
+                finished = (self.Bucket, self.Stats)
+            self.Bucket = bucket
+            self.Stats = {}
+        stats = self.Stats
+        for name, value in Values.items():
+            entry = stats.get(name)
+            if entry is None:
+                stats[name] = [value, value, value, 1]
+            else:
+                if value < entry[0]:
+                    entry[0] = value
+                if value > entry[1]:
+                    entry[1] = value
+                entry[2] += value
+                entry[3] += 1
+        return finished
+
+
+class Archive:
+    """On-disk metrics archive with time-rotated binary segments and 1 min / 1 h rollups"""
+
+    def __init__(self, Directory: str, RetentionSeconds: float = None):
+        self.Directory = Directory
+        self.RetentionSeconds = RetentionSeconds
+        self._queue = queue.SimpleQueue()
+        self._segments = {}
+        self._rollups = [_Rollup(period) for _, period in ROLLUPS]
+        self._thread = None
+        for resolution in SEGMENT_SPANS:
+            os.makedirs(os.path.join(Directory, resolution), exist_ok=True)
+
+    def Append(self, Timestamp: float, Values: dict):
+        """Queue one sample for the writer thread; never touches the disk on the caller's thread"""
+        self._queue.put((Timestamp, Values))
+
+    def Start(self):
+        """Start the background writer thread"""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="PySystemInfo-Archive", daemon=True)
+            self._thread.start()
+
+    def Stop(self):
+        """Flush pending samples and stop the writer thread"""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            # 一次取出队列中积压的所有样本，批量写入后再flush
+            batch = [item]
+            while item is not None:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                batch.append(item)
+            for sample in batch:
+                if sample is None:
+                    self._close_all()
+                    return
+                try:
+                    self._write(*sample)
+                except Exception as e:
+                    print(f"Archive write failed: {e}")
+            for segment, _ in self._segments.values():
+                segment.Flush()
+
+    def _close_all(self):
+        for segment, _ in self._segments.values():
+            segment.Close()
+        self._segments = {}
+
+    def _segment_for(self, resolution: str, timestamp: float, columns: list) -> Segment:
+        span = SEGMENT_SPANS[resolution]
+        start = int(timestamp // span * span)
+        current = self._segments.get(resolution)
+        if current is not None and current[1] == start and set(columns) <= set(current[0].Columns):
+            return current[0]
+
+        if current is not None and current[1] == start:
+            # 新指标出现时保留已有列顺序，只在末尾追加新列
+            columns = current[0].Columns + sorted(set(columns) - set(current[0].Columns))
+        else:
+            columns = sorted(columns)
+        if current is not None:
+            current[0].Close()
+        segment = self._open_segment(resolution, start, columns)
+        self._segments[resolution] = (segment, start)
+        if resolution == 'raw':
+            self._expire(start)
+        return segment
+
+    def _open_segment(self, resolution: str, start: int, columns: list) -> Segment:
+        directory = os.path.join(self.Directory, resolution)
+        sequence = 0
+        while True:
+            name = f"{start}.seg" if sequence == 0 else f"{start}-{sequence}.seg"
+            path = os.path.join(directory, name)
+            if not os.path.exists(path):
+                return Segment(path, columns)
+            try:
+                existing = Segment(path)
+                # 重启后继续追加到列完全一致的已有段文件
+                if set(columns) <= set(existing.Columns):
+                    return existing
+            except (OSError, ValueError):
+                pass
+            sequence += 1
+
+    def _expire(self, now: int):
+        if not self.RetentionSeconds:
+            return
+        for path, start in self._list_segments('raw'):
+            if start + SEGMENT_SPANS['raw'] < now - self.RetentionSeconds:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def _write(self, timestamp: float, values: dict):
+        segment = self._segment_for('raw', timestamp, list(values))
+        segment.Append(timestamp, [values.get(column, NAN) for column in segment.Columns])
+
+        for (resolution, _), rollup in zip(ROLLUPS, self._rollups):
+            finished = rollup.Add(timestamp, values)
+            if finished is None:
+                continue
+            bucket, stats = finished
+            flat = {}
+            for name, (low, high, total, n) in stats.items():
+                flat[name + ':min'] = low
+                flat[name + ':max'] = high
+                flat[name + ':avg'] = total / n
+            segment = self._segment_for(resolution, bucket, list(flat))
+            segment.Append(bucket, [flat.get(column, NAN) for column in segment.Columns])
+
+    def _list_segments(self, resolution: str) -> list:
+        directory = os.path.join(self.Directory, resolution)
+        segments = []
+        for name in os.listdir(directory):
+            if name.endswith('.seg'):
+                try:
+                    segments.append((os.path.join(directory, name), int(name[:-4].split('-')[0])))
+                except ValueError:
+                    continue
+        segments.sort(key=lambda item: (item[1], item[0]))
+        return segments
+
+    def Query(self, Metric: str, Start: float, End: float = None, Resolution: str = 'raw') -> dict:
+        """Get a metric between Start and End from the raw segments or a rollup"""
+        if Resolution not in SEGMENT_SPANS:
+            raise ValueError(f"Unknown resolution: {Resolution}")
+        if End is None:
+            End = time.time()
+        span = SEGMENT_SPANS[Resolution]
+        if Resolution == 'raw':
+            columns = [Metric]
+            result = {"metric": Metric, "resolution": Resolution, "t": [], "value": []}
+            outputs = [result["value"]]
+        else:
+            columns = [Metric + ':min', Metric + ':max', Metric + ':avg']
+            result = {"metric": Metric, "resolution": Resolution, "t": [], "min": [], "max": [], "avg": []}
+            outputs = [result["min"], result["max"], result["avg"]]
+
+        rows = []
+        for path, start in self._list_segments(Resolution):
+            if start > End or start + span < Start:
+                continue
+            try:
+                rows.extend(Segment(path).Read(columns, Start, End))
+            except (OSError, ValueError):
+                continue
+        # 同一时段可能有多个段文件（列变化或重启），按时间合并
+        rows.sort(key=lambda row: row[0])
+        for t, values in rows:
+            if math.isnan(values[0]):
+                continue
+            result["t"].append(t)
+            for output, value in zip(outputs, values):
+                output.append(value)
+        return result
@@ -0,0 +1,288 @@
+import os
+import sys
+import threading
+import time
+from collections import namedtuple
+
+# 与psutil在Linux上返回的字段一致，两种后端的结果可以互换使用
+CPUTimes = namedtuple('CPUTimes', 'user nice system idle iowait irq softirq steal guest guest_nice')
+CPUStats = namedtuple('CPUStats', 'ctx_switches interrupts soft_interrupts syscalls')
+MemoryInfo = namedtuple('MemoryInfo', 'total available percent used free active inactive buffers cached shared slab')
+SwapInfo = namedtuple('SwapInfo', 'total used free percent sin sout')
+DiskIO = namedtuple('DiskIO', 'read_count write_count read_bytes write_bytes read_time write_time '
+                              'read_merged_count write_merged_count busy_time')
+NicIO = namedtuple('NicIO', 'bytes_sent bytes_recv packets_sent packets_recv errin errout dropin dropout')
+
+# 一次采样的完整主机计数器
+HostSample = namedtuple('HostSample', 'timestamp cpu cpu_per_core cpu_stats memory swap disks nics')
+
+CLOCK_TICKS = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+SECTOR_SIZE = 512
+# /proc/vmstat 中 pswpin/pswpout 以页为单位
+SWAP_PAGE_SIZE = 4096
+
+
+def SumCounters(Counters: dict, Names=None):
+    """Sum {name: namedtuple} field by field, optionally only for the given names"""
+    records = [value for name, value in Counters.items() if Names is None or name in Names]
+    if not records:
+        return None
+    return type(records[0])(*map(sum, zip(*records)))
+
+
+def _percent(used, total) -> float:
+    return round(used / total * 100, 1) if total > 0 else 0.0
+
+
+class Backend:
+    """Source of host counters; Sample() reads everything once"""
+
+    Name = 'base'
+
+    def __init__(self, SysRoot: str = '/sys'):
+        self.SysRoot = SysRoot
+        self._storage = {}
+
+    def ReadCPU(self):
+        """Get (total CPUTimes, [per-core CPUTimes], CPUStats)"""
+        raise NotImplementedError
+
+    def ReadMemory(self):
+        """Get (MemoryInfo, SwapInfo)"""
+        raise NotImplementedError
+
+    def ReadDisks(self) -> dict:
+        """Get {disk name: DiskIO}"""
+        raise NotImplementedError
+
+    def ReadNetwork(self) -> dict:
+        """Get {interface name: NicIO}"""
+        raise NotImplementedError
+
+    def Sample(self) -> HostSample:
+        """Read every counter family in one pass"""
+        cpu, cpu_per_core, cpu_stats = self.ReadCPU()
+        memory, swap = self.ReadMemory()
+        return HostSample(time.monotonic(), cpu, cpu_per_core, cpu_stats, memory, swap,
+                          self.ReadDisks(), self.ReadNetwork())
+
+    def DiskTotals(self, Disks: dict):
+        """Sum the counters of whole storage devices, skipping partitions like psutil does"""
+        return SumCounters(Disks, Names=[name for name in Disks if self._is_storage_device(name)])
+
+    def _is_storage_device(self, name: str) -> bool:
+        if not sys.platform.startswith('linux'):
+            return True
+        storage = self._storage.get(name)
+        if storage is None:
+            # /sys/block 下只有整块设备，分区不在其中
+            storage = os.path.exists(os.path.join(self.SysRoot, 'block', name.replace('/', '!')))
+            self._storage[name] = storage
+        return storage
+
+    def Close(self):
+        """Release any resources held by the backend"""
+
+
+class PsutilBackend(Backend):
+    """Portable backend built on psutil"""
+
+    Name = 'psutil'
+
+    def ReadCPU(self):
+        import psutil
+        return psutil.cpu_times(), psutil.cpu_times(percpu=True), psutil.cpu_stats()
+
+    def ReadMemory(self):
+        import psutil
+        return psutil.virtual_memory(), psutil.swap_memory()
+
+    def ReadDisks(self) -> dict:
+        import psutil
+        return psutil.disk_io_counters(perdisk=True) or {}
+
+    def ReadNetwork(self) -> dict:
+        import psutil
+        return psutil.net_io_counters(pernic=True) or {}
+
+
+class ProcFile:
+    """A procfs file kept open and re-read with pread into a reused buffer"""
+
+    def __init__(self, Path: str, Size: int = 16384):
+        self.Path = Path
+        self._fd = os.open(Path, os.O_RDONLY)
+        self._buffer = bytearray(Size)
+        self._lock = threading.Lock()
+
+    def Read(self) -> bytes:
+        with self._lock:
+            offset = 0
+            while True:
+                if offset == len(self._buffer):
+                    # 缓冲区已满，扩大后从当前位置继续读
+                    self._buffer.extend(bytes(len(self._buffer)))
+                with memoryview(self._buffer) as view:
+                    size = os.preadv(self._fd, [view[offset:]], offset)
+                # seq_file一次只返回大约一页，读到0字节才是文件末尾
+                if size == 0:
+                    return bytes(self._buffer[:offset])
+                offset += size
+
+    def Close(self):
+        with self._lock:
+            if self._fd >= 0:
+                os.close(self._fd)
+                self._fd = -1
+
+
+def _parse_stat(data: bytes):
+    total = None
+    cores = []
+    ctx_switches = interrupts = soft_interrupts = 0
+    for line in data.split(b'\n'):
+        if line.startswith(b'cpu'):
+            fields = line.split()
+            values = [int(value) / CLOCK_TICKS for value in fields[1:11]]
+            values.extend([0.0] * (10 - len(values)))
+            times = CPUTimes(*values)
+            if fields[0] == b'cpu':
+                total = times
+            else:
+                cores.append(times)
+        elif line.startswith(b'ctxt '):
+            ctx_switches = int(line[5:])
+        elif line.startswith(b'intr '):
+            interrupts = int(line.split(None, 2)[1])
+        elif line.startswith(b'softirq '):
+            soft_interrupts = int(line.split(None, 2)[1])
+    # /proc/stat 没有系统调用计数，psutil在Linux上同样返回0
+    return total, cores, CPUStats(ctx_switches, interrupts, soft_interrupts, 0)
+
+
+def _parse_memory(meminfo: bytes, vmstat: bytes):
+    values = {}
+    for line in meminfo.split(b'\n'):
+        fields = line.split()
+        if len(fields) >= 2:
+            values[fields[0]] = int(fields[1]) * 1024
+    get = values.get
+    total = get(b'MemTotal:', 0)
+    free = get(b'MemFree:', 0)
+    buffers = get(b'Buffers:', 0)
+    cached = get(b'Cached:', 0) + get(b'SReclaimable:', 0)
+    # 与psutil一致：没有MemAvailable（旧内核）时估算
+    available = get(b'MemAvailable:') or free + buffers + cached
+    if available > total:
+        available = free
+    memory = MemoryInfo(total, available, _percent(total - available, total), total - available, free,
+                        get(b'Active:', 0), get(b'Inactive:', 0), buffers, cached,
+                        get(b'Shmem:', 0), get(b'Slab:', 0))
+
+    swap_in = swap_out = 0
+    for line in vmstat.split(b'\n'):
+        if line.startswith(b'pswpin '):
+            swap_in = int(line[7:]) * SWAP_PAGE_SIZE
+        elif line.startswith(b'pswpout '):
+            swap_out = int(line[8:]) * SWAP_PAGE_SIZE
+            break
+    swap_total = get(b'SwapTotal:', 0)
+    swap_used = swap_total - get(b'SwapFree:', 0)
+    swap = SwapInfo(swap_total, swap_used, swap_total - swap_used, _percent(swap_used, swap_total), swap_in, swap_out)
+    return memory, swap
+
+
+def _parse_diskstats(data: bytes) -> dict:
+    disks = {}
+    for line in data.split(b'\n'):
+        fields = line.split()
+        if len(fields) < 14:
+            continue
+        disks[fields[2].decode()] = DiskIO(
+            int(fields[3]), int(fields[7]),
+            int(fields[5]) * SECTOR_SIZE, int(fields[9]) * SECTOR_SIZE,
+            int(fields[6]), int(fields[10]),
+            int(fields[4]), int(fields[8]),
+            int(fields[12]))
+    return disks
+
+
+def _parse_net_dev(data: bytes) -> dict:
+    nics = {}
+    # 前两行是表头
+    for line in data.split(b'\n')[2:]:
+        name, sep, rest = line.partition(b':')
+        if not sep:
+            continue
+        fields = rest.split()
+        nics[name.strip().decode()] = NicIO(
+            int(fields[8]), int(fields[0]),
+            int(fields[9]), int(fields[1]),
+            int(fields[2]), int(fields[10]),
+            int(fields[3]), int(fields[11]))
+    return nics
+
+
+class ProcfsBackend(Backend):
+    """Linux backend reading /proc directly with persistent file descriptors"""
+
+    Name = 'procfs'
+
+    def __init__(self, Root: str = '/proc', SysRoot: str = '/sys'):
+        super().__init__(SysRoot=SysRoot)
+        self.Root = Root
+        self._files = {}
+        try:
+            for name in ('stat', 'meminfo', 'vmstat', 'diskstats', 'net/dev'):
+                self._files[name] = ProcFile(os.path.join(Root, name))
+        except OSError:
+            self.Close()
+            raise
+
+    def ReadCPU(self):
+        return _parse_stat(self._files['stat'].Read())
+
+    def ReadMemory(self):
+        return _parse_memory(self._files['meminfo'].Read(), self._files['vmstat'].Read())
+
+    def ReadDisks(self) -> dict:
+        return _parse_diskstats(self._files['diskstats'].Read())
+
+    def ReadNetwork(self) -> dict:
+        return _parse_net_dev(self._files['net/dev'].Read())
+
+    def Sample(self) -> HostSample:
+        # 先连续读取所有文件，再统一解析，使各计数器的读取时间尽量接近
+        files = self._files
+        stat = files['stat'].Read()
+        meminfo = files['meminfo'].Read()
+        vmstat = files['vmstat'].Read()
+        diskstats = files['diskstats'].Read()
+        net_dev = files['net/dev'].Read()
+        timestamp = time.monotonic()
+        cpu, cpu_per_core, cpu_stats = _parse_stat(stat)
+        memory, swap = _parse_memory(meminfo, vmstat)
+        return HostSample(timestamp, cpu, cpu_per_core, cpu_stats, memory, swap,
+                          _parse_diskstats(diskstats), _parse_net_dev(net_dev))
+
+    def Close(self):
+        for proc_file in self._files.values():
+            proc_file.Close()
+        self._files = {}
+
+
+BACKENDS = {'procfs': ProcfsBackend, 'psutil': PsutilBackend}
+
+
+def GetBackend(Name: str = None) -> Backend:
+    """Create a backend by name; None or 'auto' picks procfs on Linux and psutil elsewhere"""
+    if Name in (None, '', 'auto'):
+        if sys.platform.startswith('linux'):
+            try:
+                return ProcfsBackend()
+            except OSError:
+                pass
+        return PsutilBackend()
+    if Name not in BACKENDS:
+        raise ValueError(f"Unknown backend: {Name}")
+    return BACKENDS[Name]()
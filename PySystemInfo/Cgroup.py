@@ -0,0 +1,278 @@
+import os
+import threading
+import time
+from collections import namedtuple
+
+from .Backend import ProcFile
+
+# 每个cgroup读取的接口文件；控制器未启用时文件不存在，对应字段为None
+CGROUP_FILES = ('cpu.stat', 'cpu.max', 'memory.current', 'memory.max', 'io.stat', 'pids.current')
+
+CgroupStats = namedtuple('CgroupStats', 'usage_usec user_usec system_usec nr_periods nr_throttled throttled_usec '
+                                        'cpu_quota cpu_period memory_current memory_max '
+                                        'io_rbytes io_wbytes io_rios io_wios pids_current')
+
+# 列式输出的字段顺序
+COLUMNS = ('path', 'cpu_cores', 'cpu_limit', 'cpu_limit_percent', 'throttled_percent', 'throttled_seconds',
+           'memory_current', 'memory_max', 'memory_percent', 'io_read_bytes_per_sec', 'io_write_bytes_per_sec',
+           'io_read_iops', 'io_write_iops', 'pids')
+
+
+def CurrentCgroup(ProcRoot: str = '/proc') -> str:
+    """Get the cgroup v2 path of this process from /proc/self/cgroup, or None without a unified hierarchy"""
+    try:
+        with open(os.path.join(ProcRoot, 'self', 'cgroup')) as f:
+            for line in f:
+                hierarchy, _, path = line.rstrip('\n').split(':', 2)
+                if hierarchy == '0':
+                    return path or '/'
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def _parse_keyed(data: bytes) -> dict:
+    values = {}
+    for line in data.split(b'\n'):
+        key, _, value = line.partition(b' ')
+        if value:
+            values[key] = int(value)
+    return values
+
+
+def _parse_limit(data: bytes):
+    value = data.strip()
+    return None if value == b'max' or not value else int(value)
+
+
+def _parse_cpu_max(data: bytes):
+    quota, _, period = data.strip().partition(b' ')
+    return (None if quota == b'max' else int(quota)), int(period or 100000)
+
+
+def _parse_io_stat(data: bytes):
+    # 每行一个设备："8:0 rbytes=.. wbytes=.. rios=.. wios=.. dbytes=.. dios=.."，按设备求和
+    rbytes = wbytes = rios = wios = 0
+    for line in data.split(b'\n'):
+        for field in line.split()[1:]:
+            key, _, value = field.partition(b'=')
+            if key == b'rbytes':
+                rbytes += int(value)
+            elif key == b'wbytes':
+                wbytes += int(value)
+            elif key == b'rios':
+                rios += int(value)
+            elif key == b'wios':
+                wios += int(value)
+    return rbytes, wbytes, rios, wios
+
+
+class _Group:
+    __slots__ = ('path', 'directory', 'mtime', 'children', 'files')
+
+    def __init__(self, path: str, directory: str):
+        self.path = path
+        self.directory = directory
+        self.mtime = None
+        self.children = ()
+        # 文件名 -> ProcFile（常驻句柄）或文件路径（句柄数超出上限时每次打开）
+        self.files = {}
+
+
+class CgroupMonitor:
+    """Usage, limits and throttling of a cgroup v2 subtree, sampled with cached file handles"""
+
+    def __init__(self, Root: str = '/sys/fs/cgroup', Path: str = None, ProcRoot: str = '/proc',
+                 MaxHandles: int = None, RescanInterval: float = 60.0):
+        self.Root = Root
+        self.Path = '/' + (Path or CurrentCgroup(ProcRoot) or '/').strip('/')
+        self.Base = os.path.join(Root, self.Path.strip('/'))
+        if MaxHandles is None:
+            MaxHandles = 4096
+            try:
+                import resource
+                # 最多使用一半的文件描述符配额，剩余留给进程的其他部分
+                MaxHandles = min(MaxHandles, resource.getrlimit(resource.RLIMIT_NOFILE)[0] // 2)
+            except (ImportError, ValueError, OSError):
+                pass
+        self.MaxHandles = MaxHandles
+        self.RescanInterval = RescanInterval
+        self._groups = {}
+        self._handles = 0
+        self._rescanned = 0.0
+        self._previous = {}
+        self._latest = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def Available(Root: str = '/sys/fs/cgroup') -> bool:
+        """Whether Root is a cgroup v2 (unified) hierarchy"""
+        return os.path.exists(os.path.join(Root, 'cgroup.controllers'))
+
+    def _open(self, group: _Group):
+        for name in CGROUP_FILES:
+            path = os.path.join(group.directory, name)
+            if not os.path.exists(path):
+                continue
+            if self._handles < self.MaxHandles:
+                try:
+                    group.files[name] = ProcFile(path, Size=512)
+                    self._handles += 1
+                    continue
+                except OSError:
+                    pass
+            group.files[name] = path
+
+    def _close(self, group: _Group):
+        for handle in group.files.values():
+            if isinstance(handle, ProcFile):
+                handle.Close()
+                self._handles -= 1
+        group.files = {}
+
+    def Discover(self) -> int:
+        """Walk the hierarchy, listing only directories whose mtime changed; returns the number of cgroups"""
+        now = time.monotonic()
+        # 定期完整重新列目录，防止遗漏时间戳没有变化的修改
+        relist = now - self._rescanned >= self.RescanInterval
+        if relist:
+            self._rescanned = now
+        seen = set()
+        stack = [(self.Path, self.Base)]
+        while stack:
+            path, directory = stack.pop()
+            try:
+                mtime = os.stat(directory).st_mtime_ns
+            except OSError:
+                continue
+            group = self._groups.get(path)
+            if group is None:
+                group = self._groups[path] = _Group(path, directory)
+                self._open(group)
+            if relist or group.mtime != mtime:
+                # 子cgroup的创建和删除会更新父目录的mtime
+                try:
+                    with os.scandir(directory) as entries:
+                        group.children = tuple(entry.name for entry in entries if entry.is_dir(follow_symlinks=False))
+                except OSError:
+                    group.children = ()
+                group.mtime = mtime
+            seen.add(path)
+            prefix = path.rstrip('/')
+            for name in group.children:
+                stack.append((f"{prefix}/{name}", os.path.join(directory, name)))
+        for path in [path for path in self._groups if path not in seen]:
+            self._close(self._groups.pop(path))
+            self._previous.pop(path, None)
+        return len(self._groups)
+
+    def _read(self, group: _Group, name: str):
+        handle = group.files.get(name)
+        if handle is None:
+            return None
+        if isinstance(handle, ProcFile):
+            return handle.Read()
+        fd = os.open(handle, os.O_RDONLY)
+        try:
+            return os.read(fd, 65536)
+        finally:
+            os.close(fd)
+
+    def ReadGroup(self, group: _Group) -> CgroupStats:
+        """Read the raw counters of one cgroup"""
+        cpu = self._read(group, 'cpu.stat')
+        cpu = _parse_keyed(cpu) if cpu is not None else {}
+        cpu_max = self._read(group, 'cpu.max')
+        quota, period = _parse_cpu_max(cpu_max) if cpu_max is not None else (None, None)
+        memory_current = self._read(group, 'memory.current')
+        memory_max = self._read(group, 'memory.max')
+        io = self._read(group, 'io.stat')
+        io = _parse_io_stat(io) if io is not None else (None, None, None, None)
+        pids = self._read(group, 'pids.current')
+        return CgroupStats(cpu.get(b'usage_usec'), cpu.get(b'user_usec'), cpu.get(b'system_usec'),
+                           cpu.get(b'nr_periods'), cpu.get(b'nr_throttled'), cpu.get(b'throttled_usec'),
+                           quota, period,
+                           _parse_limit(memory_current) if memory_current is not None else None,
+                           _parse_limit(memory_max) if memory_max is not None else None,
+                           *io,
+                           _parse_limit(pids) if pids is not None else None)
+
+    def Sample(self, Now: float = None) -> dict:
+        """Read every cgroup and derive rates since the previous sample; returns a columnar table"""
+        with self._lock:
+            self.Discover()
+            table = {column: [] for column in COLUMNS}
+            previous = self._previous
+            current = {}
+            for path, group in sorted(self._groups.items()):
+                try:
+                    stats = self.ReadGroup(group)
+                except OSError:
+                    # cgroup在两次发现之间被删除
+                    continue
+                now = time.monotonic() if Now is None else Now
+                current[path] = (now, stats)
+                self._row(table, path, stats, previous.get(path), now)
+            self._previous = current
+            self._latest = table
+            return table
+
+    @staticmethod
+    def _row(table: dict, path: str, stats: CgroupStats, previous, now: float):
+        def rate(field, scale=1.0):
+            value = getattr(stats, field)
+            if previous is None or value is None or now <= previous[0]:
+                return None
+            before = getattr(previous[1], field)
+            if before is None or value < before:
+                return None
+            return round((value - before) / (now - previous[0]) * scale, 3)
+
+        limit = stats.cpu_quota / stats.cpu_period if stats.cpu_quota is not None and stats.cpu_period else None
+        cores = rate('usage_usec', 1e-6)
+        throttled = None
+        if previous is not None and stats.nr_periods is not None and previous[1].nr_periods is not None:
+            periods = stats.nr_periods - previous[1].nr_periods
+            throttled = round((stats.nr_throttled - previous[1].nr_throttled) / periods * 100, 1) if periods > 0 else 0.0
+        memory = stats.memory_current
+        table['path'].append(path)
+        table['cpu_cores'].append(cores)
+        table['cpu_limit'].append(round(limit, 3) if limit is not None else None)
+        table['cpu_limit_percent'].append(round(cores / limit * 100, 1) if cores is not None and limit else None)
+        table['throttled_percent'].append(throttled)
+        # 每秒被限流的时间（秒）
+        table['throttled_seconds'].append(rate('throttled_usec', 1e-6))
+        table['memory_current'].append(memory)
+        table['memory_max'].append(stats.memory_max)
+        table['memory_percent'].append(round(memory / stats.memory_max * 100, 1)
+                                       if memory is not None and stats.memory_max else None)
+        table['io_read_bytes_per_sec'].append(rate('io_rbytes'))
+        table['io_write_bytes_per_sec'].append(rate('io_wbytes'))
+        table['io_read_iops'].append(rate('io_rios'))
+        table['io_write_iops'].append(rate('io_wios'))
+        table['pids'].append(stats.pids_current)
+
+    def GetLatest(self):
+        """Get the table produced by the most recent Sample"""
+        return self._latest
+
+    def Limits(self) -> dict:
+        """Get the CPU (in cores) and memory limits of the monitored cgroup; None when unlimited"""
+        with self._lock:
+            group = self._groups.get(self.Path)
+            if group is None:
+                group = self._groups[self.Path] = _Group(self.Path, self.Base)
+                self._open(group)
+            cpu_max = self._read(group, 'cpu.max')
+            memory_max = self._read(group, 'memory.max')
+        quota, period = _parse_cpu_max(cpu_max) if cpu_max is not None else (None, None)
+        return {
+            "cpus": round(quota / period, 3) if quota is not None and period else None,
+            "memory": _parse_limit(memory_max) if memory_max is not None else None
+        }
+
+    def Close(self):
+        with self._lock:
+            for group in self._groups.values():
+                self._close(group)
+            self._groups = {}
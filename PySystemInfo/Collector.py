@@ -0,0 +1,171 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+
+# 采样结果状态
+OK = 'ok'
+STALE = 'stale'
+FAILED = 'failed'
+
+
+class Collector:
+    """Background sampler that keeps the latest snapshot of every registered source"""
+
+    def __init__(self, Interval: float = 1.0, Workers: int = 8, Stats=None):
+        self.Interval = Interval
+        self.Workers = Workers
+        # 可选的 Instrument.Stats，记录每个数据源的耗时、错误和超时次数
+        self.Stats = Stats
+        self._sources = {}
+        self._deadlines = {}
+        self._pending = {}
+        self._executor = None
+        self._sample_lock = threading.Lock()
+        self._listeners = []
+        self._snapshot = {}
+        self._seq = 0
+        self._updated = threading.Condition()
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def Register(self, Name: str, Func, Deadline: float = None):
+        """Register a sampling function whose result is stored under Name
+
+        Deadline is how long one sample waits for this source (default: the sampling interval).
+        """
+        self._sources[Name] = Func
+        self._deadlines[Name] = Deadline
+
+    def Subscribe(self, Func):
+        """Register a callback that receives every new snapshot from the sampling thread"""
+        self._listeners.append(Func)
+
+    def Sample(self) -> dict:
+        """Run every source concurrently and publish the result as the new snapshot
+
+        A source that misses its deadline keeps its previous value and is marked stale
+        (or failed if it never produced one); it is not started again until the slow call returns.
+        """
+        with self._sample_lock:
+            return self._sample()
+
+    def _sample(self) -> dict:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.Workers, thread_name_prefix='PySystemInfo-Sampler')
+        start = time.monotonic()
+        futures = {}
+        for name, func in self._sources.items():
+            future = self._pending.get(name)
+            if future is None or future.done():
+                if self.Stats is not None:
+                    future = self._executor.submit(self._timed, name, func)
+                else:
+                    future = self._executor.submit(func)
+                self._pending[name] = future
+            futures[name] = future
+
+        previous = self._snapshot
+        snapshot = {}
+        status = {}
+        for name, future in futures.items():
+            deadline = self._deadlines[name] or self.Interval
+            try:
+                snapshot[name] = future.result(timeout=max(0.0, start + deadline - time.monotonic()))
+                status[name] = OK
+            except FuturesTimeoutError:
+                if name in previous:
+                    snapshot[name] = previous[name]
+                    status[name] = STALE
+                else:
+                    snapshot[name] = {"error": "timeout"}
+                    status[name] = FAILED
+                if self.Stats is not None:
+                    self.Stats.Mark('collectors', name, status[name])
+                continue
+            except Exception as e:
+                snapshot[name] = {"error": str(e)}
+                status[name] = FAILED
+            del self._pending[name]
+        snapshot["status"] = status
+        snapshot["timestamp"] = time.time()
+        if self.Stats is not None:
+            self.Stats.Observe('sampler', 'sample', time.monotonic() - start,
+                               Error=any(state != OK for state in status.values()))
+        # 整体替换引用，读者无需加锁即可拿到一致的快照
+        with self._updated:
+            self._snapshot = snapshot
+            self._seq += 1
+            self._updated.notify_all()
+        for listener in self._listeners:
+            try:
+                listener(snapshot)
+            except Exception as e:
+                print(f"Collector listener failed: {e}")
+        return snapshot
+
+    def _timed(self, name: str, func):
+        stats = self.Stats
+        session = stats.Session
+        start = time.perf_counter()
+        failed = True
+        try:
+            result = func() if session is None else session.Run(func)
+            # 采集函数内部捕获异常后返回 {"error": ...}，同样计为错误
+            failed = isinstance(result, dict) and "error" in result
+            return result
+        finally:
+            stats.Observe('collectors', name, time.perf_counter() - start, Error=failed)
+
+    def GetSnapshot(self) -> dict:
+        """Get the latest snapshot, starting the sampler on first use"""
+        if not self.IsRunning():
+            self.Start()
+        return self._snapshot
+
+    def WaitForSample(self, Seq: int = 0, Timeout: float = None):
+        """Block until a snapshot newer than Seq exists; returns (seq, snapshot) or None on timeout"""
+        with self._updated:
+            if not self._updated.wait_for(lambda: self._seq > Seq, Timeout):
+                return None
+            return self._seq, self._snapshot
+
+    def IsRunning(self) -> bool:
+        """Whether the sampling thread is alive"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def Start(self):
+        """Take a first sample synchronously, then keep sampling in a daemon thread"""
+        with self._lock:
+            if self.IsRunning():
+                return
+            self._stop.clear()
+            self.Sample()
+            self._thread = threading.Thread(target=self._run, name="PySystemInfo-Collector", daemon=True)
+            self._thread.start()
+
+    def Stop(self, Timeout: float = None):
+        """Stop the sampling thread"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(Timeout)
+        self._thread = None
+        if self._executor is not None:
+            # 不等待仍挂起的采样函数
+            self._executor.shutdown(wait=False)
+            self._executor = None
+            self._pending = {}
+
+    def _run(self):
+        next_tick = time.monotonic() + self.Interval
+        while not self._stop.wait(max(0.0, next_tick - time.monotonic())):
+            try:
+                self.Sample()
+            except RuntimeError:
+                # 解释器退出时线程池已关闭
+                break
+            next_tick += self.Interval
+            # 采样耗时超过间隔时不追赶，直接从当前时间重新对齐
+            now = time.monotonic()
+            if next_tick < now:
+                next_tick = now + self.Interval
@@ -0,0 +1,110 @@
+import operator
+import threading
+import time
+from array import array
+from itertools import chain
+
+# 输出的各项占比；guest/guest_nice 已包含在 user/nice 中，不重复计算
+BREAKDOWN_FIELDS = ('user', 'nice', 'system', 'idle', 'iowait', 'irq', 'softirq', 'steal')
+_NOT_BUSY = ('idle', 'iowait')
+
+
+class CoreTracker:
+    """Per-core utilization breakdown from successive cpu_times snapshots, without blocking"""
+
+    def __init__(self, History: int = 0):
+        self.History = History
+        self._fields = None
+        self._previous = None
+        self._previous_time = None
+        self._cores = 0
+        self._latest = None
+        # 热力图历史：cores × History 的环形缓冲，按采样顺序写入
+        self._history = None
+        self._history_times = None
+        self._head = 0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def Update(self, PerCore: list, Now: float = None):
+        """Feed per-core cpu_times; returns the breakdown since the previous call, or None for the first"""
+        if not PerCore:
+            return None
+        now = time.monotonic() if Now is None else Now
+        fields = PerCore[0]._fields
+        cores = len(PerCore)
+        # 所有核心的计数器展开成一个连续数组，差分和归一化都对整个数组进行
+        current = array('d', chain.from_iterable(PerCore))
+        with self._lock:
+            previous, previous_time = self._previous, self._previous_time
+            reset = previous is None or cores != self._cores or fields != self._fields
+            self._previous, self._previous_time = current, now
+            self._cores, self._fields = cores, fields
+            if reset:
+                # 核心数变化（CPU热插拔）时重新建立基线
+                self._reset_history(cores)
+                return None
+            breakdown = self._breakdown(current, previous, fields, cores)
+            breakdown["interval"] = now - previous_time
+            self._latest = breakdown
+            self._record(breakdown["usage"], time.time())
+            return breakdown
+
+    def _breakdown(self, current, previous, fields, cores: int) -> dict:
+        width = len(fields)
+        # 计数器回退（虚拟机迁移等）时按0处理
+        deltas = [delta if delta > 0 else 0.0 for delta in map(operator.sub, current, previous)]
+        columns = {name: deltas[index::width] for index, name in enumerate(fields)}
+        totals = [sum(deltas[offset:offset + width]) for offset in range(0, cores * width, width)]
+        for guest in ('guest', 'guest_nice'):
+            if guest in columns:
+                totals = list(map(operator.sub, totals, columns[guest]))
+        scales = [100.0 / total if total > 0 else 0.0 for total in totals]
+        result = {"cores": cores}
+        for name in BREAKDOWN_FIELDS:
+            if name in columns:
+                result[name] = [round(value, 1) for value in map(operator.mul, columns[name], scales)]
+        idle = columns.get('idle', [0.0] * cores)
+        for name in _NOT_BUSY[1:]:
+            if name in columns:
+                idle = list(map(operator.add, idle, columns[name]))
+        busy = map(operator.sub, totals, idle)
+        result["usage"] = [round(max(0.0, min(100.0, value)), 1) for value in map(operator.mul, busy, scales)]
+        return result
+
+    def _reset_history(self, cores: int):
+        self._history = array('f', bytes(4 * cores * self.History)) if self.History > 0 else None
+        self._history_times = array('d', bytes(8 * self.History)) if self.History > 0 else None
+        self._head = 0
+        self._count = 0
+
+    def _record(self, usage: list, timestamp: float):
+        if self._history is None:
+            return
+        cores = self._cores
+        offset = self._head * cores
+        self._history[offset:offset + cores] = array('f', usage)
+        self._history_times[self._head] = timestamp
+        self._head = (self._head + 1) % self.History
+        self._count = min(self._count + 1, self.History)
+
+    def GetBreakdown(self):
+        """Get the most recent breakdown: {"cores", "usage", "user", "system", ..., "interval"}"""
+        with self._lock:
+            return self._latest
+
+    def GetHistory(self, Limit: int = None) -> dict:
+        """Get the most recent per-core usage samples for a heatmap: {"t": [...], "usage": [[per-core], ...]}"""
+        with self._lock:
+            if self._history is None or not self._count:
+                return {"t": [], "usage": []}
+            cores, capacity = self._cores, self.History
+            count = self._count if Limit is None else min(self._count, Limit)
+            start = (self._head - count) % capacity
+            slots = [(start + index) % capacity for index in range(count)]
+            # 按时间从旧到新，每个采样一行
+            return {
+                "t": [self._history_times[slot] for slot in slots],
+                "usage": [[round(value, 1) for value in self._history[slot * cores:(slot + 1) * cores]]
+                          for slot in slots]
+            }
@@ -1,12 +1,72 @@
 import psutil
 import os
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FuturesTimeoutError
+
+# 带超时的disk_usage调用：NFS等挂载点失去响应时，调用线程可能被永久阻塞
+# 每个路径最多一个进行中的调用，各自使用独立线程，挂起的挂载点不会占满共享线程池而拖累正常的挂载点
+_usage_pending = {}
+_usage_lock = threading.Lock()
 
 def GetDiskMount(all: bool = False):
     """Get disk mount points"""
     return psutil.disk_partitions(all=all)
 
-def GetDiskUsage(Path: str = '/'):
-    """Get disk usage"""
+def _run_usage(Path: str, future: Future):
+    try:
+        result = _disk_usage(Path)
+    except BaseException as e:
+        error, result = e, None
+    else:
+        error = None
+    with _usage_lock:
+        del _usage_pending[Path]
+    if error is None:
+        future.set_result(result)
+    else:
+        future.set_exception(error)
+
+def _submit_usage(Path: str):
+    with _usage_lock:
+        # 上一次调用仍未返回时不再重复提交，挂起的挂载点最多占用一个线程
+        entry = _usage_pending.get(Path)
+        if entry is not None:
+            return entry
+        future = Future()
+        entry = (future, time.monotonic())
+        _usage_pending[Path] = entry
+    threading.Thread(target=_run_usage, args=(Path, future), name='PySystemInfo-DiskUsage', daemon=True).start()
+    return entry
+
+def GetDiskUsages(Paths: list, Timeout: float) -> dict:
+    """Get disk usage of several paths in parallel under one shared deadline; failed paths map to their exception"""
+    now = time.monotonic()
+    deadline = now + Timeout
+    entries = {path: _submit_usage(path) for path in Paths}
+    results = {}
+    for path, (future, submitted) in entries.items():
+        # 上一次调用仍未返回的挂载点直接判定为不可用，不再等待
+        remaining = 0 if submitted < now else deadline - time.monotonic()
+        try:
+            results[path] = future.result(timeout=max(0, remaining))
+        except FuturesTimeoutError:
+            results[path] = TimeoutError(f"disk_usage timed out after {Timeout}s: {path}" if submitted >= now
+                                         else f"disk_usage still pending from an earlier call: {path}")
+        except Exception as e:
+            results[path] = e
+    return results
+
+def GetDiskUsage(Path: str = '/', Timeout: float = None):
+    """Get disk usage; with Timeout, raise TimeoutError instead of blocking on a hung mount"""
+    if Timeout is None:
+        return _disk_usage(Path)
+    result = GetDiskUsages([Path], Timeout)[Path]
+    if isinstance(result, Exception):
+        raise result
+    return result
+
+def _disk_usage(Path: str):
     # 处理Windows路径的特殊情况
     if os.name == 'nt':  # Windows系统
         # 确保路径格式正确
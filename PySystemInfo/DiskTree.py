@@ -0,0 +1,236 @@
+import os
+import pickle
+import queue
+import stat
+import threading
+import time
+from collections import namedtuple
+
+INDEX_VERSION = 1
+
+# 一个目录的扫描结果：自身及直接包含的普通文件占用，多链接文件单独记录以便全局去重
+_Dir = namedtuple('_Dir', 'mtime bytes files links subdirs errors')
+
+
+def _allocated(st) -> int:
+    # 与du一致按实际分配的块计算；没有st_blocks的平台退回文件长度
+    blocks = getattr(st, 'st_blocks', None)
+    return blocks * 512 if blocks is not None else st.st_size
+
+
+class UsageTree:
+    """Directory-size index of one filesystem, rescanning only directories whose mtime changed"""
+
+    def __init__(self, Root: str, IndexPath: str = None, Workers: int = 8):
+        self.Root = os.path.abspath(Root)
+        self.IndexPath = IndexPath
+        self.Workers = max(1, Workers)
+        self.ScannedAt = None
+        # 最近一次完整扫描的时间；增量扫描看不到目录mtime不变时文件大小的变化
+        self.FullScannedAt = None
+        self.Stats = {}
+        self._index = {}
+        self._totals = {}
+        self._counts = {}
+        self._thread = None
+        self._lock = threading.Lock()
+        if IndexPath:
+            self._load()
+
+    def _load(self):
+        try:
+            with open(self.IndexPath, 'rb') as f:
+                data = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return
+        if data.get("version") != INDEX_VERSION or data.get("root") != self.Root:
+            return
+        self._index = {path: _Dir._make(record) for path, record in data["index"].items()}
+        self.ScannedAt = data.get("scanned_at")
+        self.FullScannedAt = data.get("full_scanned_at")
+        self.Stats = data.get("stats", {})
+        self._aggregate()
+
+    def _save(self):
+        data = {
+            "version": INDEX_VERSION,
+            "root": self.Root,
+            "scanned_at": self.ScannedAt,
+            "full_scanned_at": self.FullScannedAt,
+            "stats": self.Stats,
+            "index": {path: tuple(record) for path, record in self._index.items()}
+        }
+        os.makedirs(os.path.dirname(self.IndexPath) or '.', exist_ok=True)
+        # 先写临时文件再替换，进程中途退出不会留下损坏的索引
+        temporary = self.IndexPath + '.tmp'
+        with open(temporary, 'wb') as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, self.IndexPath)
+
+    def Scan(self, Full: bool = False) -> dict:
+        """Scan the filesystem, reusing unchanged directories from the index unless Full; returns scan stats"""
+        started = time.monotonic()
+        root_stat = os.stat(self.Root)
+        device = root_stat.st_dev
+        Full = Full or not self._index
+        previous = {} if Full else self._index
+        index = {}
+        counters = {"listed": 0, "reused": 0, "errors": 0}
+        counter_lock = threading.Lock()
+        work = queue.Queue()
+
+        def visit(path, mtime, own):
+            record = previous.get(path)
+            children = []
+            if record is not None and record.mtime == mtime:
+                # 目录项没有变化：沿用上次的结果，只需检查子目录本身是否变化
+                for name in record.subdirs:
+                    child = os.path.join(path, name)
+                    try:
+                        st = os.stat(child, follow_symlinks=False)
+                    except OSError:
+                        continue
+                    if stat.S_ISDIR(st.st_mode) and st.st_dev == device:
+                        children.append((child, st.st_mtime_ns, _allocated(st)))
+                listed = False
+            else:
+                record, children = self._list(path, mtime, own, device)
+                listed = True
+            index[path] = record
+            for child in children:
+                work.put(child)
+            with counter_lock:
+                counters["listed" if listed else "reused"] += 1
+                counters["errors"] += record.errors
+
+        def worker():
+            while True:
+                item = work.get()
+                if item is None:
+                    work.task_done()
+                    return
+                try:
+                    visit(*item)
+                finally:
+                    work.task_done()
+
+        threads = [threading.Thread(target=worker, name=f"PySystemInfo-DiskTree-{number}", daemon=True)
+                   for number in range(self.Workers)]
+        for thread in threads:
+            thread.start()
+        work.put((self.Root, root_stat.st_mtime_ns, _allocated(root_stat)))
+        work.join()
+        for _ in threads:
+            work.put(None)
+        for thread in threads:
+            thread.join()
+
+        stats = dict(counters, directories=len(index), seconds=round(time.monotonic() - started, 3), full=Full)
+        if not Full:
+            stats["note"] = ("Directories with an unchanged mtime reuse their previous sizes; files that grew or "
+                             "shrank in place are only picked up by a full scan")
+        with self._lock:
+            self._index = index
+            self.ScannedAt = time.time()
+            if Full:
+                self.FullScannedAt = self.ScannedAt
+            self.Stats = stats
+            self._aggregate()
+        if self.IndexPath:
+            self._save()
+        return stats
+
+    def _list(self, path: str, mtime: int, own: int, device: int):
+        total = own
+        files = 0
+        links = []
+        subdirs = []
+        children = []
+        errors = 0
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    try:
+                        st = entry.stat(follow_symlinks=False)
+                    except OSError:
+                        errors += 1
+                        continue
+                    if stat.S_ISDIR(st.st_mode):
+                        # 不跨越文件系统：挂载在其下的其他设备不计入
+                        if st.st_dev == device:
+                            subdirs.append(entry.name)
+                            children.append((entry.path, st.st_mtime_ns, _allocated(st)))
+                        continue
+                    files += 1
+                    if st.st_nlink > 1:
+                        # 硬链接在汇总时按inode只计一次
+                        links.append((st.st_ino, _allocated(st)))
+                    else:
+                        total += _allocated(st)
+        except OSError:
+            errors += 1
+        return _Dir(mtime, total, files, tuple(links), tuple(subdirs), errors), children
+
+    def _aggregate(self):
+        # 排序后父目录总在子目录之前：正序认领硬链接，逆序向上累加
+        paths = sorted(self._index)
+        claimed = set()
+        totals = {}
+        counts = {}
+        for path in paths:
+            record = self._index[path]
+            size = record.bytes
+            for inode, allocated in record.links:
+                if inode not in claimed:
+                    claimed.add(inode)
+                    size += allocated
+            totals[path] = size
+            counts[path] = record.files
+        for path in reversed(paths):
+            if path == self.Root:
+                continue
+            parent = os.path.dirname(path)
+            if parent in totals:
+                totals[parent] += totals[path]
+                counts[parent] += counts[path]
+        self._totals = totals
+        self._counts = counts
+
+    def Refresh(self, Full: bool = False) -> bool:
+        """Start a background scan unless one is running; returns whether a scan was started"""
+        with self._lock:
+            if self.Scanning:
+                return False
+            self._thread = threading.Thread(target=self._scan_quietly, args=(Full,),
+                                            name="PySystemInfo-DiskTree", daemon=True)
+            self._thread.start()
+            return True
+
+    def _scan_quietly(self, full: bool):
+        try:
+            self.Scan(Full=full)
+        except OSError as e:
+            self.Stats = {"error": str(e)}
+
+    @property
+    def Scanning(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def Tree(self, Depth: int = 2, Top: int = 10, Path: str = None):
+        """Get the largest subtrees as nested {"path", "bytes", "files", "children"}, or None before the first scan"""
+        with self._lock:
+            totals, counts, index = self._totals, self._counts, self._index
+        path = self.Root if Path is None else os.path.abspath(Path)
+        if path not in totals:
+            return None
+
+        def build(path, depth):
+            node = {"path": path, "bytes": totals[path], "files": counts[path]}
+            if depth > 0:
+                children = [os.path.join(path, name) for name in index[path].subdirs]
+                children = sorted((child for child in children if child in totals),
+                                  key=totals.__getitem__, reverse=True)
+                node["children"] = [build(child, depth - 1) for child in children[:Top]]
+            return node
+
+        return build(path, Depth)
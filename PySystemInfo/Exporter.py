@@ -0,0 +1,83 @@
+COUNTER = 'counter'
+GAUGE = 'gauge'
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+OPENMETRICS_CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+
+# 标签组合缓存上限，设备频繁变化时防止无限增长
+MAX_CACHED_LABELS = 10000
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value) -> str:
+    if value is True:
+        return '1'
+    if value is False:
+        return '0'
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+class MetricFamily:
+    """One metric family with pre-rendered headers and cached label prefixes"""
+
+    def __init__(self, Name: str, Type: str, Help: str, Labels: tuple = ()):
+        self.Name = Name
+        self.Type = Type
+        self.Labels = tuple(Labels)
+        # 计数器的样本名带 _total 后缀；OpenMetrics 的 TYPE 行使用不带后缀的族名
+        self.SampleName = Name + '_total' if Type == COUNTER else Name
+        help_text = _escape(Help)
+        self.Headers = {
+            False: f"# HELP {self.SampleName} {help_text}\n# TYPE {self.SampleName} {Type}\n",
+            True: f"# HELP {Name} {help_text}\n# TYPE {Name} {Type}\n",
+        }
+        self._plain = self.SampleName + ' '
+        self._prefixes = {}
+
+    def Line(self, Value, *LabelValues) -> str:
+        """Render one sample line"""
+        if not self.Labels:
+            return self._plain + _format_value(Value) + '\n'
+        prefix = self._prefixes.get(LabelValues)
+        if prefix is None:
+            if len(self._prefixes) >= MAX_CACHED_LABELS:
+                self._prefixes.clear()
+            labels = ','.join(f'{name}="{_escape(value)}"' for name, value in zip(self.Labels, LabelValues))
+            prefix = f"{self.SampleName}{{{labels}}} "
+            self._prefixes[LabelValues] = prefix
+        return prefix + _format_value(Value) + '\n'
+
+
+class Exporter:
+    """Registry of metric families rendered into Prometheus or OpenMetrics text"""
+
+    def __init__(self, Prefix: str = 'sysinfo'):
+        self.Prefix = Prefix
+        self._families = {}
+
+    def Family(self, Name: str, Type: str, Help: str, Labels: tuple = ()) -> MetricFamily:
+        """Declare a metric family; the name is prefixed automatically"""
+        family = MetricFamily(f"{self.Prefix}_{Name}", Type, Help, Labels)
+        self._families[Name] = family
+        return family
+
+    def Render(self, Samples: dict, OpenMetrics: bool = False) -> str:
+        """Render {family name: [(value, *label values), ...]} into exposition text"""
+        parts = []
+        for name, samples in Samples.items():
+            if not samples:
+                continue
+            family = self._families[name]
+            line = family.Line
+            lines = [line(*sample) for sample in samples if sample[0] is not None]
+            if lines:
+                parts.append(family.Headers[OpenMetrics])
+                parts.extend(lines)
+        if OpenMetrics:
+            parts.append('# EOF\n')
+        return ''.join(parts)
@@ -0,0 +1,225 @@
+import heapq
+import json
+import queue
+import socket
+import threading
+import time
+import urllib.request
+import zlib
+
+from .History import History
+
+# 单个上报批次解压后的大小上限，防止压缩炸弹
+MAX_BATCH_BYTES = 16 * 1024 * 1024
+
+DISK_PREFIX = 'disk.partitions.'
+DISK_SUFFIX = '.usage'
+
+
+def EncodeBatch(Host: str, Samples: list) -> bytes:
+    """Encode [(timestamp, {metric: value}), ...] as deflate-compressed columnar JSON"""
+    metrics = sorted({name for _, values in Samples for name in values})
+    rows = [[timestamp] + [values.get(name) for name in metrics] for timestamp, values in Samples]
+    payload = json.dumps({"host": Host, "metrics": metrics, "samples": rows}, separators=(',', ':'))
+    return zlib.compress(payload.encode('utf-8'), 6)
+
+
+def DecodeBatch(Data: bytes):
+    """Decode a batch produced by EncodeBatch; returns (host, [(timestamp, {metric: value}), ...])"""
+    decompressor = zlib.decompressobj()
+    try:
+        raw = decompressor.decompress(Data, MAX_BATCH_BYTES)
+    except zlib.error as e:
+        raise ValueError(f"Corrupt batch: {e}")
+    if decompressor.unconsumed_tail:
+        raise ValueError("Batch too large")
+    payload = json.loads(raw)
+    host = str(payload["host"])
+    metrics = payload["metrics"]
+    samples = []
+    for row in payload["samples"]:
+        values = {name: value for name, value in zip(metrics, row[1:]) if value is not None}
+        samples.append((float(row[0]), values))
+    return host, samples
+
+
+class Agent:
+    """Ship batched, compressed samples to a central aggregator from a background thread"""
+
+    def __init__(self, Url: str, Host: str = None, BatchSize: int = 5, FlushInterval: float = 5.0,
+                 Token: str = None, MaxPending: int = 1000):
+        self.Url = Url.rstrip('/') + '/api/fleet/ingest'
+        self.Host = Host or socket.gethostname()
+        self.BatchSize = BatchSize
+        self.FlushInterval = FlushInterval
+        self.Token = Token
+        self.MaxPending = MaxPending
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._stop = threading.Event()
+
+    def Add(self, Timestamp: float, Values: dict):
+        """Queue one flattened sample; never blocks on the network"""
+        self._queue.put((Timestamp, Values))
+
+    def Start(self):
+        """Start the sender thread"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="PySystemInfo-Agent", daemon=True)
+            self._thread.start()
+
+    def Stop(self):
+        """Flush what is queued and stop the sender thread"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _send(self, samples: list) -> bool:
+        request = urllib.request.Request(self.Url, data=EncodeBatch(self.Host, samples), method='POST')
+        request.add_header('Content-Type', 'application/json')
+        request.add_header('Content-Encoding', 'deflate')
+        if self.Token:
+            request.add_header('Authorization', f'Bearer {self.Token}')
+        try:
+            with urllib.request.urlopen(request, timeout=10) as response:
+                return 200 <= response.status < 300
+        except OSError as e:
+            print(f"Agent failed to send batch to {self.Url}: {e}")
+            return False
+
+    def _run(self):
+        pending = []
+        next_flush = time.monotonic() + self.FlushInterval
+        backoff = 0.0
+        while True:
+            stopping = self._stop.is_set()
+            try:
+                pending.append(self._queue.get(timeout=0.5))
+                while True:
+                    pending.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+            now = time.monotonic()
+            full = not backoff and len(pending) >= self.BatchSize
+            if pending and (stopping or full or now >= next_flush):
+                if self._send(pending):
+                    pending = []
+                    backoff = 0.0
+                else:
+                    # 聚合端不可用时指数退避重试，只保留最近的样本
+                    backoff = min(60.0, backoff * 2 or self.FlushInterval)
+                    del pending[:-self.MaxPending]
+                next_flush = time.monotonic() + (backoff or self.FlushInterval)
+            elif now >= next_flush:
+                next_flush = now + self.FlushInterval
+            if stopping:
+                return
+
+
+class Aggregator:
+    """Fleet-wide store: per-host ring buffers plus latest-value indexes"""
+
+    def __init__(self, Capacity: int = 900, Retention: float = None):
+        self.Capacity = Capacity
+        # 超过该时间（秒）没有再上报的主机、指标和磁盘从索引中移除
+        self.Retention = float(Capacity if Retention is None else Retention)
+        self._histories = {}
+        self._last_seen = {}
+        # host -> 聚合端最近一次收到该主机批次的时间
+        self._received = {}
+        # metric -> {host: (最新值, 收到时间)}，用于快速计算全局Top-N
+        self._latest = {}
+        # host -> {mountpoint: (使用率, 收到时间)}
+        self._disks = {}
+        self._next_prune = 0.0
+        self._lock = threading.Lock()
+
+    def Ingest(self, Data: bytes, Now: float = None) -> int:
+        """Ingest one compressed batch; returns the number of samples stored"""
+        host, samples = DecodeBatch(Data)
+        if not samples:
+            return 0
+        now = time.time() if Now is None else Now
+        samples.sort(key=lambda sample: sample[0])
+        with self._lock:
+            history = self._histories.get(host)
+            if history is None:
+                history = History(Capacity=self.Capacity)
+                self._histories[host] = history
+            disks = self._disks.setdefault(host, {})
+            # 按时间顺序合并整个批次：每个指标和磁盘保留批次中最后出现的值
+            for timestamp, values in samples:
+                history.Record(timestamp, values)
+                for name, value in values.items():
+                    self._latest.setdefault(name, {})[host] = (value, now)
+                    if name.startswith(DISK_PREFIX) and name.endswith(DISK_SUFFIX):
+                        disks[name[len(DISK_PREFIX):-len(DISK_SUFFIX)]] = (value, now)
+            self._last_seen[host] = samples[-1][0]
+            self._received[host] = now
+            if now >= self._next_prune:
+                self._prune(now)
+        return len(samples)
+
+    def _prune(self, now: float):
+        cutoff = now - self.Retention
+        self._next_prune = now + min(60.0, self.Retention / 10)
+        for host in [host for host, received in self._received.items() if received < cutoff]:
+            del self._received[host]
+            self._last_seen.pop(host, None)
+            self._histories.pop(host, None)
+            self._disks.pop(host, None)
+        for name, hosts in list(self._latest.items()):
+            for host in [host for host, (_, received) in hosts.items() if received < cutoff]:
+                del hosts[host]
+            if not hosts:
+                del self._latest[name]
+        for mounts in self._disks.values():
+            for mountpoint in [mountpoint for mountpoint, (_, received) in mounts.items() if received < cutoff]:
+                del mounts[mountpoint]
+
+    def _fresh(self, entries: dict, now: float) -> list:
+        # 两次清理之间过期的条目在读取时过滤掉
+        cutoff = now - self.Retention
+        return [(key, value) for key, (value, received) in entries.items() if received >= cutoff]
+
+    def Hosts(self, Now: float = None) -> list:
+        """Get every known host with its last sample time and headline metrics"""
+        now = time.time() if Now is None else Now
+        with self._lock:
+            cpu = dict(self._fresh(self._latest.get('cpu.usage', {}), now))
+            memory = dict(self._fresh(self._latest.get('memory.usage', {}), now))
+            return [{
+                "host": host,
+                "last_seen": last_seen,
+                "cpu": cpu.get(host),
+                "memory": memory.get(host)
+            } for host, last_seen in sorted(self._last_seen.items())
+                if self._received[host] >= now - self.Retention]
+
+    def Top(self, Metric: str = 'cpu.usage', Limit: int = 10, Now: float = None) -> list:
+        """Get the hosts with the highest latest value of a metric"""
+        now = time.time() if Now is None else Now
+        with self._lock:
+            values = self._fresh(self._latest.get(Metric, {}), now)
+        return [{"host": host, "value": value}
+                for host, value in heapq.nlargest(Limit, values, key=lambda item: item[1])]
+
+    def DisksOver(self, Threshold: float = 90.0, Now: float = None) -> list:
+        """Get every mount above the usage threshold across the fleet"""
+        now = time.time() if Now is None else Now
+        with self._lock:
+            disks = [(host, self._fresh(mounts, now)) for host, mounts in self._disks.items()]
+        result = [{"host": host, "mountpoint": mountpoint, "usage": usage}
+                  for host, mounts in disks for mountpoint, usage in mounts if usage > Threshold]
+        result.sort(key=lambda item: item["usage"], reverse=True)
+        return result
+
+    def Query(self, Host: str, Metric: str, Since: float = None, Step: float = None):
+        """Get one host's downsampled history for a metric"""
+        with self._lock:
+            history = self._histories.get(Host)
+        if history is None:
+            return None
+        return history.Query(Metric, Since=Since, Step=Step)
@@ -1,55 +1,180 @@
-import GPUtil
+import os
+import shutil
+import subprocess
+import threading
+import time
 
-def GetGPUInfo():
-    """Get GPU information"""
+# 一次查询所有需要的字段，替代GPUtil每个函数各启动一次nvidia-smi
+QUERY_FIELDS = ('index', 'uuid', 'name', 'utilization.gpu', 'memory.total',
+                'memory.used', 'memory.free', 'temperature.gpu')
+
+
+def _parse_number(value: str):
     try:
-        gpus = GPUtil.getGPUs()
-        if not gpus:
+        return float(value)
+    except ValueError:
+        # [N/A]、[Not Supported] 等无法获取的字段
+        return None
+
+
+def _parse_line(line: str):
+    fields = [field.strip() for field in line.split(',')]
+    if len(fields) != len(QUERY_FIELDS):
+        return None
+    index, uuid, name, load, total, used, free, temperature = fields
+    try:
+        index = int(index)
+    except ValueError:
+        return None
+    total = _parse_number(total)
+    used = _parse_number(used)
+    return {
+        'id': index,
+        'uuid': uuid,
+        'name': name,
+        'load': _parse_number(load),
+        'memory_used': used,
+        'memory_total': total,
+        'memory_free': _parse_number(free),
+        'memory_util': used / total * 100 if used is not None and total else None,
+        'temperature': _parse_number(temperature)
+    }
+
+
+class GPUBackend:
+    """Batched nvidia-smi query with a TTL cache shared by all GPU accessors"""
+
+    def __init__(self, Executable: str = None, TTL: float = 1.0):
+        self.Executable = Executable or os.environ.get('NVIDIA_SMI', 'nvidia-smi')
+        self.TTL = TTL
+        self._gpus = []
+        self._updated = None
+        self._lock = threading.Lock()
+        self._loop = None
+        self._loop_interval = None
+        self._stale_after = None
+
+    def _command(self, *extra) -> list:
+        path = shutil.which(self.Executable)
+        if path is None:
+            return None
+        return [path, '--query-gpu=' + ','.join(QUERY_FIELDS), '--format=csv,noheader,nounits', *extra]
+
+    def _query_once(self) -> list:
+        command = self._command()
+        if command is None:
             return []
+        try:
+            output = subprocess.run(command, capture_output=True, text=True, timeout=5).stdout
+        except (OSError, subprocess.SubprocessError):
+            return []
+        gpus = []
+        for line in output.splitlines():
+            gpu = _parse_line(line)
+            if gpu is not None:
+                gpus.append(gpu)
+        return gpus
+
+    def Query(self) -> list:
+        """Get the parsed GPU list, running at most one nvidia-smi query per TTL"""
+        if self.IsQueryLoopRunning():
+            if time.monotonic() - self._updated < self._stale_after:
+                return self._gpus
+            # nvidia-smi仍在运行却不再输出（例如驱动挂起）：结束它，改用单次查询，并重新启动循环
+            interval, stale_after = self._loop_interval, self._stale_after
+            self.StopQueryLoop()
+            self._updated = None
+            gpus = self.Query()
+            self.StartQueryLoop(Interval=interval, StaleAfter=stale_after)
+            return gpus
+        with self._lock:
+            now = time.monotonic()
+            if self._updated is None or now - self._updated >= self.TTL:
+                self._gpus = self._query_once()
+                self._updated = time.monotonic()
+            return self._gpus
+
+    def IsQueryLoopRunning(self) -> bool:
+        """Whether a long-running nvidia-smi query loop feeds the cache"""
+        return self._loop is not None and self._loop.poll() is None
+
+    def StartQueryLoop(self, Interval: float = 1.0, StaleAfter: float = None) -> bool:
+        """Keep one nvidia-smi process running in loop mode instead of spawning one per query;
+        the loop is restarted when it prints nothing for StaleAfter seconds (default 5 intervals, at least 5s)"""
+        with self._lock:
+            if self.IsQueryLoopRunning():
+                return True
+            self._loop_interval = Interval
+            self._stale_after = StaleAfter if StaleAfter is not None else max(5.0, Interval * 5)
+            command = self._command('-lms', str(max(1, int(Interval * 1000))))
+            if command is None:
+                return False
+            try:
+                self._loop = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                              text=True, bufsize=1)
+            except OSError:
+                self._loop = None
+                return False
+            # 第一轮输出之前也按启动时间判断是否停止输出
+            self._updated = time.monotonic()
+        threading.Thread(target=self._read_loop, args=(self._loop,), name="PySystemInfo-GPU", daemon=True).start()
+        return True
+
+    def StopQueryLoop(self):
+        """Terminate the nvidia-smi query loop"""
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is not None and loop.poll() is None:
+            loop.terminate()
+            try:
+                loop.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                loop.kill()
+
+    def _read_loop(self, process):
+        # nvidia-smi每轮按index升序输出所有GPU，同一index再次出现即开始新的一轮
+        previous = {}
+        block = {}
+        for line in process.stdout:
+            gpu = _parse_line(line)
+            # 循环已被停止或替换后，旧进程残留的输出不再发布
+            if gpu is None or self._loop is not process:
+                continue
+            index = gpu['id']
+            if index in block:
+                previous, block = block, {}
+            block[index] = gpu
+            # 上一轮中index更大、本轮尚未输出的GPU暂时保留；更小却没有出现的GPU已被移除
+            gpus = dict(block)
+            gpus.update((other, value) for other, value in previous.items() if other > index and other not in block)
+            # 每行对应一块GPU，整体替换列表以保证读者拿到一致的数据
+            self._gpus = [gpus[other] for other in sorted(gpus)]
+            self._updated = time.monotonic()
+
+
+_backend = GPUBackend()
+
+
+def GetGPUBackend() -> GPUBackend:
+    """Get the shared GPU backend"""
+    return _backend
+
+
+def GetGPUInfo():
+    """Get GPU information"""
+    return [dict(gpu) for gpu in _backend.Query()]
 
-        gpu_info = []
-        for gpu in gpus:
-            gpu_info.append({
-                'id': gpu.id,
-                'name': gpu.name,
-                'load': gpu.load * 100,  # Convert to percentage
-                'memory_used': gpu.memoryUsed,
-                'memory_total': gpu.memoryTotal,
-                'memory_free': gpu.memoryFree,
-                'memory_util': gpu.memoryUtil * 100,  # Convert to percentage
-                'temperature': gpu.temperature
-            })
-        return gpu_info
-    except Exception as e:
-        # If GPUtil fails, return empty list
-        return []
 
 def GetGPUUtilization():
     """Get GPU utilization for all GPUs"""
-    try:
-        gpus = GPUtil.getGPUs()
-        if not gpus:
-            return []
+    return [gpu['load'] for gpu in _backend.Query()]
 
-        return [gpu.load * 100 for gpu in gpus]
-    except Exception as e:
-        return []
 
 def GetGPUMemory():
     """Get GPU memory info for all GPUs"""
-    try:
-        gpus = GPUtil.getGPUs()
-        if not gpus:
-            return []
-
-        memory_info = []
-        for gpu in gpus:
-            memory_info.append({
-                'used': gpu.memoryUsed,
-                'total': gpu.memoryTotal,
-                'free': gpu.memoryFree,
-                'utilization': gpu.memoryUtil * 100
-            })
-        return memory_info
-    except Exception as e:
-        return []
+    return [{
+        'used': gpu['memory_used'],
+        'total': gpu['memory_total'],
+        'free': gpu['memory_free'],
+        'utilization': gpu['memory_util']
+    } for gpu in _backend.Query()]
@@ -0,0 +1,118 @@
+import math
+import threading
+from array import array
+
+NAN = float('nan')
+
+
+def FlattenSnapshot(Snapshot: dict, Prefix: str = '') -> dict:
+    """Flatten the numeric leaves of a snapshot into dotted metric names"""
+    values = {}
+    for key, value in Snapshot.items():
+        if key == 'timestamp' and not Prefix:
+            continue
+        name = f"{Prefix}{key}"
+        if isinstance(value, bool):
+            continue
+        if isinstance(value, (int, float)):
+            values[name] = float(value)
+        elif isinstance(value, dict):
+            values.update(FlattenSnapshot(value, name + '.'))
+        elif isinstance(value, list):
+            for index, item in enumerate(value):
+                if isinstance(item, dict):
+                    # 列表项优先使用挂载点/ID作为名称，避免顺序变化导致指标错位
+                    label = item.get('mountpoint', item.get('id', index))
+                    values.update(FlattenSnapshot(item, f"{name}.{label}."))
+    return values
+
+
+class History:
+    """Bounded time-series store backed by fixed-size ring buffers of doubles"""
+
+    def __init__(self, Capacity: int = 14400):
+        self.Capacity = Capacity
+        self._times = array('d', [NAN]) * Capacity
+        self._series = {}
+        self._head = 0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def Record(self, Timestamp: float, Values: dict):
+        """Append one sample; metrics missing from Values are stored as NaN"""
+        with self._lock:
+            pos = self._head
+            self._times[pos] = Timestamp
+            for name, series in self._series.items():
+                series[pos] = Values.get(name, NAN)
+            for name, value in Values.items():
+                if name not in self._series:
+                    series = array('d', [NAN]) * self.Capacity
+                    series[pos] = value
+                    self._series[name] = series
+            self._head = (pos + 1) % self.Capacity
+            if self._count < self.Capacity:
+                self._count += 1
+
+    def Metrics(self) -> list:
+        """Get the names of all recorded metrics"""
+        with self._lock:
+            return sorted(self._series)
+
+    def _first_index(self, start: int, since: float) -> int:
+        # 环形缓冲区中的时间戳按逻辑顺序递增，二分查找起始位置
+        lo, hi = 0, self._count
+        times = self._times
+        capacity = self.Capacity
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if times[(start + mid) % capacity] < since:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def Query(self, Metric: str, Since: float = None, Step: float = None) -> dict:
+        """Get a metric's series since a timestamp, downsampled to min/max/avg per Step seconds"""
+        result = {"metric": Metric, "step": Step, "t": [], "min": [], "max": [], "avg": []}
+        with self._lock:
+            series = self._series.get(Metric)
+            if series is None:
+                return None
+            capacity = self.Capacity
+            start = (self._head - self._count) % capacity
+            first = self._first_index(start, Since) if Since is not None else 0
+            times = self._times
+            out_t, out_min, out_max, out_avg = result["t"], result["min"], result["max"], result["avg"]
+            bucket = None
+            low = high = total = 0.0
+            n = 0
+            for i in range(first, self._count):
+                pos = (start + i) % capacity
+                value = series[pos]
+                if math.isnan(value):
+                    continue
+                t = times[pos]
+                key = math.floor(t / Step) * Step if Step else t
+                if key != bucket:
+                    if n:
+                        out_t.append(bucket)
+                        out_min.append(low)
+                        out_max.append(high)
+                        out_avg.append(total / n)
+                    bucket = key
+                    low = high = total = value
+                    n = 1
+                else:
+                    if value < low:
+                        low = value
+                    if value > high:
+                        high = value
+                    total += value
+                    n += 1
+            if n:
+                out_t.append(bucket)
+                out_min.append(low)
+                out_max.append(high)
+                out_avg.append(total / n)
+        return result
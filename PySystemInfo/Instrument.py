@@ -0,0 +1,251 @@
+import bisect
+import collections
+import cProfile
+import marshal
+import pstats
+import sys
+import threading
+import time
+
+# 延迟直方图的桶上界（秒），对数分布，最后一个桶为 +Inf
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CPROFILE = 'cprofile'
+SAMPLING = 'sampling'
+# 3.12起cProfile基于解释器全局的sys.monitoring：同时只能启用一个分析器，但它覆盖所有线程
+GLOBAL_PROFILER = sys.version_info >= (3, 12)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram"""
+
+    def __init__(self, Buckets: tuple = LATENCY_BUCKETS):
+        self.Buckets = Buckets
+        self.Counts = [0] * (len(Buckets) + 1)
+        self.Count = 0
+        self.Sum = 0.0
+        self.Max = 0.0
+
+    def Observe(self, Seconds: float):
+        self.Counts[bisect.bisect_left(self.Buckets, Seconds)] += 1
+        self.Count += 1
+        self.Sum += Seconds
+        if Seconds > self.Max:
+            self.Max = Seconds
+
+    def Quantile(self, Fraction: float):
+        """Get the upper bound of the bucket holding the given quantile"""
+        if not self.Count:
+            return None
+        rank = Fraction * self.Count
+        seen = 0
+        for bound, count in zip(self.Buckets, self.Counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.Max)
+        return self.Max
+
+    def Summary(self) -> dict:
+        return {
+            "count": self.Count,
+            "avg_ms": self.Sum / self.Count * 1000 if self.Count else None,
+            "max_ms": self.Max * 1000,
+            "p50_ms": _ms(self.Quantile(0.5)),
+            "p90_ms": _ms(self.Quantile(0.9)),
+            "p99_ms": _ms(self.Quantile(0.99)),
+            "buckets": {("+Inf" if index == len(self.Buckets) else f"{self.Buckets[index]:g}"): count
+                        for index, count in enumerate(self.Counts) if count}
+        }
+
+
+def _ms(seconds):
+    return seconds * 1000 if seconds is not None else None
+
+
+class _Entry:
+    __slots__ = ('latency', 'errors', 'bytes', 'counters')
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.errors = 0
+        self.bytes = 0
+        self.counters = {}
+
+
+class Stats:
+    """Latency histograms, error counters and byte counts grouped by component"""
+
+    def __init__(self):
+        # 当前的分析会话，未开启时为None，调用方只需判断一次
+        self.Session = None
+        self._groups = {}
+        self._lock = threading.Lock()
+        self._session_lock = threading.Lock()
+
+    def _entry(self, group: str, name: str) -> _Entry:
+        entries = self._groups.setdefault(group, {})
+        entry = entries.get(name)
+        if entry is None:
+            entry = entries[name] = _Entry()
+        return entry
+
+    def Observe(self, Group: str, Name: str, Seconds: float, Error: bool = False, Bytes: int = 0):
+        """Record one timed call"""
+        with self._lock:
+            entry = self._entry(Group, Name)
+            entry.latency.Observe(Seconds)
+            if Error:
+                entry.errors += 1
+            entry.bytes += Bytes
+
+    def Mark(self, Group: str, Name: str, Counter: str):
+        """Increment a named counter, e.g. how often a source went stale"""
+        with self._lock:
+            counters = self._entry(Group, Name).counters
+            counters[Counter] = counters.get(Counter, 0) + 1
+
+    def Get(self) -> dict:
+        """Get every group as {group: {name: {latency, errors, bytes, counters}}}"""
+        with self._lock:
+            return {group: {name: {
+                "latency": entry.latency.Summary(),
+                "errors": entry.errors,
+                "bytes": entry.bytes,
+                "counters": dict(entry.counters)
+            } for name, entry in entries.items()} for group, entries in self._groups.items()}
+
+    def Profile(self, Mode: str = SAMPLING, Seconds: float = 10.0, Interval: float = 0.005):
+        """Profile the process for Seconds and return (file name, data, mimetype)
+
+        Only one profile runs at a time; a concurrent call raises RuntimeError.
+        """
+        if not self._session_lock.acquire(blocking=False):
+            raise RuntimeError("A profile is already running")
+        try:
+            # 不采样正在等待的调用线程本身
+            session = ProfileSession(Mode, Interval=Interval, Exclude=(threading.get_ident(),))
+            self.Session = session
+            try:
+                session.Start()
+                time.sleep(Seconds)
+            finally:
+                self.Session = None
+                session.Stop()
+            return session.Result()
+        finally:
+            self._session_lock.release()
+
+
+class ProfileSession:
+    """One profiling run: cProfile on instrumented calls, or stack sampling of every thread"""
+
+    def __init__(self, Mode: str, Interval: float = 0.005, Exclude: tuple = ()):
+        if Mode not in (CPROFILE, SAMPLING):
+            raise ValueError(f"Unknown profile mode: {Mode}")
+        self.Mode = Mode
+        self.Interval = Interval
+        self.Exclude = set(Exclude)
+        self.Started = None
+        self._profiles = []
+        self._global = None
+        self._local = threading.local()
+        self._stacks = collections.Counter()
+        self._samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def Start(self):
+        self.Started = time.time()
+        if self.Mode == SAMPLING:
+            self._thread = threading.Thread(target=self._sample_loop, name="PySystemInfo-Profiler", daemon=True)
+            self._thread.start()
+        elif GLOBAL_PROFILER:
+            # 整个会话只用一个分析器；其他分析工具已在运行时得到空结果，而不是让请求失败
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                return
+            self._global = profile
+
+    def Stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self._global is not None:
+            self._global.disable()
+            with self._lock:
+                self._profiles.append(self._global)
+            self._global = None
+
+    def _enable(self):
+        # 每个线程各自的分析器（3.11及以前）；无法启用时不分析，绝不影响被测调用
+        if self.Mode != CPROFILE or GLOBAL_PROFILER:
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            return None
+        return profile
+
+    def _collect(self, profile):
+        profile.disable()
+        with self._lock:
+            self._profiles.append(profile)
+
+    def Run(self, Func):
+        """Call Func, profiling it in cProfile mode"""
+        profile = self._enable()
+        if profile is None:
+            return Func()
+        try:
+            return Func()
+        finally:
+            self._collect(profile)
+
+    def Begin(self):
+        """Start profiling the current thread until End (for request hooks)"""
+        if getattr(self._local, 'profile', None) is None:
+            self._local.profile = self._enable()
+
+    def End(self):
+        profile = getattr(self._local, 'profile', None)
+        if profile is not None:
+            self._local.profile = None
+            self._collect(profile)
+
+    def _sample_loop(self):
+        exclude = self.Exclude | {threading.get_ident()}
+        while not self._stop.wait(self.Interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident in exclude:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                stack.reverse()
+                self._stacks[';'.join(stack)] += 1
+            self._samples += 1
+
+    def Result(self):
+        """Get (file name, data, mimetype) of the finished profile"""
+        stamp = time.strftime('%Y%m%d-%H%M%S', time.localtime(self.Started))
+        if self.Mode == SAMPLING:
+            # 折叠栈格式，可直接用 flamegraph.pl / speedscope 打开
+            lines = [f"{stack} {count}" for stack, count in self._stacks.most_common()]
+            return f"profile-{stamp}.folded", ('\n'.join(lines) + '\n').encode('utf-8'), 'text/plain'
+        with self._lock:
+            profiles = list(self._profiles)
+        stats = pstats.Stats()
+        for profile in profiles:
+            stats.add(profile)
+        # 与 cProfile.Profile.dump_stats 相同的格式，可用 pstats / snakeviz 读取
+        data = marshal.dumps(stats.stats)
+        return f"profile-{stamp}.pstats", data, 'application/octet-stream'
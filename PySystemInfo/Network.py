@@ -1,3 +1,5 @@
+import os
+import socket
 import psutil
 
 def GetNetworkIO(Pernic: bool = False):
@@ -14,4 +16,84 @@ def GetNetworkInfo() -> dict:
 
 def GetNetworkCardStatus() -> dict:
     """Get network card status"""
-    return psutil.net_if_stats()
\ No newline at end of file
+    return psutil.net_if_stats()
+
+# /proc/net/tcp 中 st 字段（十六进制）对应的TCP状态
+TCP_STATES = {
+    b'01': 'ESTABLISHED',
+    b'02': 'SYN_SENT',
+    b'03': 'SYN_RECV',
+    b'04': 'FIN_WAIT1',
+    b'05': 'FIN_WAIT2',
+    b'06': 'TIME_WAIT',
+    b'07': 'CLOSE',
+    b'08': 'CLOSE_WAIT',
+    b'09': 'LAST_ACK',
+    b'0A': 'LISTEN',
+    b'0B': 'CLOSING',
+    b'0C': 'NEW_SYN_RECV',
+}
+
+PROC_NET_FILES = ('tcp', 'tcp6', 'udp', 'udp6', 'unix')
+
+
+def _count_lines(path: str) -> int:
+    # 按块统计换行符，不为每个套接字创建对象
+    count = 0
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            count += chunk.count(b'\n')
+    return max(0, count - 1)
+
+
+def _count_tcp_states(path: str, states: dict) -> int:
+    count = 0
+    with open(path, 'rb', buffering=1 << 16) as f:
+        f.readline()
+        for line in f:
+            state = line.split(None, 4)[3]
+            states[state] = states.get(state, 0) + 1
+            count += 1
+    return count
+
+
+def _connection_stats_psutil() -> dict:
+    protocols = {}
+    tcp_states = {}
+    total = 0
+    for conn in psutil.net_connections(kind='all'):
+        total += 1
+        if conn.family == socket.AF_UNIX:
+            name = 'unix'
+        else:
+            name = ('tcp' if conn.type == socket.SOCK_STREAM else 'udp') + ('6' if conn.family == socket.AF_INET6 else '')
+            if conn.type == socket.SOCK_STREAM:
+                tcp_states[conn.status] = tcp_states.get(conn.status, 0) + 1
+        protocols[name] = protocols.get(name, 0) + 1
+    return {"total": total, "protocols": protocols, "tcp_states": tcp_states}
+
+
+def GetConnectionStats(ProcRoot: str = '/proc') -> dict:
+    """Get socket counts by protocol and TCP state without building per-connection objects"""
+    net_dir = os.path.join(ProcRoot, 'net')
+    if not os.path.isdir(net_dir):
+        return _connection_stats_psutil()
+
+    protocols = {}
+    raw_states = {}
+    for name in PROC_NET_FILES:
+        path = os.path.join(net_dir, name)
+        try:
+            if name.startswith('tcp'):
+                protocols[name] = _count_tcp_states(path, raw_states)
+            else:
+                protocols[name] = _count_lines(path)
+        except OSError:
+            # 内核未启用IPv6等情况
+            continue
+
+    tcp_states = {}
+    for state, count in raw_states.items():
+        label = TCP_STATES.get(state, state.decode('ascii', 'replace'))
+        tcp_states[label] = tcp_states.get(label, 0) + count
+    return {"total": sum(protocols.values()), "protocols": protocols, "tcp_states": tcp_states}
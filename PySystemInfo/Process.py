@@ -0,0 +1,89 @@
+import heapq
+import threading
+import time
+from operator import itemgetter
+
+import psutil
+
+# 进程记录为元组以减少对象开销：(pid, name, cpu_percent, memory_rss, io_rate)
+SORT_KEYS = {
+    'cpu': itemgetter(2),
+    'memory': itemgetter(3),
+    'io': itemgetter(4),
+}
+
+
+class ProcessTable:
+    """Process table that keeps psutil.Process objects across samples for non-blocking CPU%"""
+
+    def __init__(self):
+        # pid -> [Process, name, 上次IO字节总数, 上次采样时间, 进程创建时间]
+        self._cache = {}
+        self._records = []
+        self._lock = threading.Lock()
+
+    def Update(self) -> int:
+        """Sample every process once and return the process count"""
+        cache = self._cache
+        records = []
+        pids = psutil.pids()
+        alive = set(pids)
+        for pid in [pid for pid in cache if pid not in alive]:
+            del cache[pid]
+
+        for pid in pids:
+            entry = cache.get(pid)
+            try:
+                # 两次采样之间pid可能被新进程复用：创建时间不同时丢弃旧的Process、名称和CPU/IO基线
+                current = psutil.Process(pid)
+                if entry is None or current.create_time() != entry[4]:
+                    entry = [current, None, None, None, current.create_time()]
+                    cache[pid] = entry
+                proc = entry[0]
+                # oneshot() 让同一进程的多个属性只读取一次 /proc/<pid>/stat 等文件
+                with proc.oneshot():
+                    if entry[1] is None:
+                        entry[1] = proc.name()
+                    cpu = proc.cpu_percent(None)
+                    rss = proc.memory_info().rss
+                    try:
+                        io = proc.io_counters()
+                        io_total = io.read_bytes + io.write_bytes
+                    except (psutil.AccessDenied, AttributeError):
+                        io_total = None
+            except (psutil.NoSuchProcess, psutil.ZombieProcess):
+                cache.pop(pid, None)
+                continue
+            except psutil.AccessDenied:
+                continue
+
+            now = time.monotonic()
+            io_rate = 0.0
+            if io_total is not None and entry[2] is not None and now > entry[3]:
+                io_rate = max(0, io_total - entry[2]) / (now - entry[3])
+            entry[2] = io_total
+            entry[3] = now
+            records.append((pid, entry[1], cpu, rss, io_rate))
+
+        with self._lock:
+            self._records = records
+        return len(records)
+
+    def Count(self) -> int:
+        """Get the number of processes seen by the last Update"""
+        return len(self._records)
+
+    def Top(self, Sort: str = 'cpu', Limit: int = 20) -> list:
+        """Get the top-N processes by cpu, memory or io without sorting the whole table"""
+        key = SORT_KEYS.get(Sort)
+        if key is None:
+            raise ValueError(f"Unknown sort key: {Sort}")
+        with self._lock:
+            records = self._records
+        return [{
+            "pid": pid,
+            "name": name,
+            "cpu_percent": round(cpu, 1),
+            "memory_rss": rss,
+            "io_rate": round(io_rate, 1)
+        } for pid, name, cpu, rss, io_rate in heapq.nlargest(Limit, records, key=key)]
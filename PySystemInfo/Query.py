@@ -0,0 +1,110 @@
+def _split(Values) -> list:
+    # 同时支持重复参数和逗号分隔："a,b" 或 ["a", "b"]
+    if Values is None:
+        return []
+    if isinstance(Values, str):
+        Values = [Values]
+    return [item.strip() for value in Values for item in str(value).split(',') if item.strip()]
+
+
+class Query:
+    """Field selection, row filters and offset pagination for the detailed APIs"""
+
+    def __init__(self, Fields=None, Filters: dict = None, Limit: int = None, Cursor=None):
+        # fields 可以是节名（"stats"）或节内的列（"stats.mtu"）
+        self.Sections = {}
+        for field in _split(Fields):
+            section, _, column = field.partition('.')
+            columns = self.Sections.setdefault(section, set())
+            if columns is not None:
+                if column:
+                    columns.add(column)
+                else:
+                    self.Sections[section] = None
+        self.Filters = {key: {str(value) for value in values} for key, values in (Filters or {}).items() if values}
+        if Limit is not None and int(Limit) < 1:
+            raise ValueError("limit must be positive")
+        self.Limit = int(Limit) if Limit is not None else None
+        self.Offset = int(Cursor) if Cursor not in (None, '') else 0
+        if self.Offset < 0:
+            raise ValueError("cursor must not be negative")
+        self.NextCursor = None
+
+    @classmethod
+    def FromArgs(cls, Args):
+        """Build a query from request arguments: fields, filter=key=value (repeatable), limit, cursor"""
+        filters = {}
+        for item in _split(Args.getlist('filter')):
+            key, sep, value = item.partition('=')
+            if not sep:
+                raise ValueError(f"Invalid filter, expected key=value: {item}")
+            filters.setdefault(key.strip(), []).append(value.strip())
+        return cls(Fields=Args.getlist('fields'), Filters=filters,
+                   Limit=Args.get('limit', type=int), Cursor=Args.get('cursor'))
+
+    @classmethod
+    def FromDict(cls, Data: dict):
+        """Build a query from a JSON object, as used by the batch API"""
+        filters = {}
+        for key, value in (Data.get('filter') or {}).items():
+            filters[key] = value if isinstance(value, list) else [value]
+        return cls(Fields=Data.get('fields'), Filters=filters, Limit=Data.get('limit'), Cursor=Data.get('cursor'))
+
+    def Select(self, Available, Defaults=None) -> list:
+        """Get the sections to collect; unknown names raise ValueError"""
+        if not self.Sections:
+            return list(Defaults if Defaults is not None else Available)
+        unknown = [name for name in self.Sections if name not in Available]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        return [name for name in Available if name in self.Sections]
+
+    def Allowed(self, Key: str):
+        """Get the accepted values of a filter key, or None when it is not filtered"""
+        return self.Filters.get(Key)
+
+    def Apply(self, Section: str, Value):
+        """Apply column selection, filters and pagination to one collected section"""
+        columns = self.Sections.get(Section)
+        if isinstance(Value, dict) and Value and all(isinstance(column, list) for column in Value.values()):
+            return self._apply_table(Value, columns)
+        if isinstance(Value, list):
+            if Value and all(isinstance(row, dict) for row in Value):
+                rows = [row for row in Value if self._matches(row)]
+                if columns:
+                    rows = [{key: row[key] for key in row if key in columns} for row in rows]
+                return self._page(rows)
+            return self._page(Value)
+        if isinstance(Value, dict) and columns:
+            return {key: value for key, value in Value.items() if key in columns}
+        return Value
+
+    def _matches(self, row: dict) -> bool:
+        for key, allowed in self.Filters.items():
+            if key in row and str(row[key]) not in allowed:
+                return False
+        return True
+
+    def _apply_table(self, table: dict, columns) -> dict:
+        # 列式表格 {字段: [值...]}：先按过滤条件求出行号，再切片各列
+        count = len(next(iter(table.values())))
+        indexes = range(count)
+        for key, allowed in self.Filters.items():
+            if key in table:
+                values = table[key]
+                indexes = [index for index in indexes if str(values[index]) in allowed]
+        indexes = self._page(list(indexes))
+        whole = len(indexes) == count
+        return {
+            key: values if whole else [values[index] for index in indexes]
+            for key, values in table.items() if not columns or key in columns
+        }
+
+    def _page(self, items: list) -> list:
+        if self.Limit is None and not self.Offset:
+            return items
+        end = len(items) if self.Limit is None else self.Offset + self.Limit
+        if end < len(items):
+            # 多个节分页时，游标取最靠后的下一页位置
+            self.NextCursor = max(self.NextCursor or 0, end)
+        return items[self.Offset:end]
@@ -0,0 +1,147 @@
+import operator
+import threading
+import time
+from array import array
+from itertools import chain
+
+
+class RateTracker:
+    """Turn cumulative counters into per-second rates using monotonic clock deltas"""
+
+    def __init__(self, Width: int = 64):
+        # Width: 计数器位宽，用于识别回绕（32位计数器在部分平台上会回绕）
+        self.Width = Width
+        self._last = None
+        self._last_time = None
+        self._rates = {}
+        self._lock = threading.Lock()
+
+    def _delta(self, current: int, previous: int) -> int:
+        if current >= previous:
+            return current - previous
+        modulus = 1 << self.Width
+        if previous - current > modulus >> 1:
+            # 计数器回绕：跨过上限后从0重新计数
+            return current + modulus - previous
+        # 计数器被重置（网卡重建、驱动重载等），只能计入重置后的增量
+        return current
+
+    def Update(self, Counters: dict, Now: float = None) -> dict:
+        """Feed the latest counter values and return the rates over the last window"""
+        if Now is None:
+            Now = time.monotonic()
+        with self._lock:
+            rates = {}
+            if self._last is not None:
+                elapsed = Now - self._last_time
+                if elapsed > 0:
+                    for name, value in Counters.items():
+                        previous = self._last.get(name)
+                        if previous is not None:
+                            rates[name] = self._delta(value, previous) / elapsed
+                else:
+                    rates = self._rates
+            self._last = dict(Counters)
+            self._last_time = Now
+            self._rates = rates
+            return rates
+
+    def GetRates(self) -> dict:
+        """Get the rates computed by the most recent Update"""
+        return self._rates
+
+    def Reset(self):
+        """Forget the previous counter values"""
+        with self._lock:
+            self._last = None
+            self._last_time = None
+            self._rates = {}
+
+
+class DeviceRates:
+    """Per-second rates for many devices' counters, computed over one flat array per sample"""
+
+    def __init__(self):
+        self._names = None
+        self._fields = None
+        self._values = None
+        self._time = None
+        self._lock = threading.Lock()
+
+    def Update(self, Devices: dict, Now: float = None):
+        """Feed {device: counters namedtuple}; returns a columnar {"name": [...], field: [rate...]} or None"""
+        if Now is None:
+            Now = time.monotonic()
+        if not Devices:
+            return None
+        names = list(Devices)
+        fields = next(iter(Devices.values()))._fields
+        width = len(fields)
+        # 所有设备的计数器展开成一个连续数组，整体做差分
+        current = array('d', chain.from_iterable(Devices.values()))
+        with self._lock:
+            previous_names, previous_fields, previous, previous_time = self._names, self._fields, self._values, self._time
+            self._names, self._fields, self._values, self._time = names, fields, current, Now
+        if previous is None or Now <= previous_time or previous_fields != fields:
+            return None
+        if previous_names != names:
+            # 设备增减时按名称对齐上一轮的数值，新出现的设备本轮增量记为0
+            index = {name: position for position, name in enumerate(previous_names)}
+            aligned = array('d')
+            for position, name in enumerate(names):
+                source, offset = (previous, index[name]) if name in index else (current, position)
+                aligned.extend(source[offset * width:(offset + 1) * width])
+            previous = aligned
+        scale = 1.0 / (Now - previous_time)
+        # 计数器被重置（设备重建、驱动重载）时增量为负，本轮按0处理
+        rates = [delta * scale if delta > 0 else 0.0 for delta in map(operator.sub, current, previous)]
+        table = {"name": names}
+        for position, field in enumerate(fields):
+            table[field] = rates[position::width]
+        return table
+
+
+def _ratio(numerators: list, denominators: list, factor: float = 1.0) -> list:
+    return [round(numerator / denominator * factor, 2) if denominator > 0 else 0.0
+            for numerator, denominator in zip(numerators, denominators)]
+
+
+def _rounded(values: list) -> list:
+    return [round(value, 1) for value in values]
+
+
+def DiskMetrics(Rates: dict) -> dict:
+    """Derive per-disk throughput, IOPS, average await (ms) and %util from DeviceRates output"""
+    reads, writes = Rates["read_count"], Rates["write_count"]
+    read_time, write_time = Rates["read_time"], Rates["write_time"]
+    metrics = {
+        "disk": Rates["name"],
+        "read_bytes_per_sec": _rounded(Rates["read_bytes"]),
+        "write_bytes_per_sec": _rounded(Rates["write_bytes"]),
+        "read_iops": _rounded(reads),
+        "write_iops": _rounded(writes),
+        # read_time/write_time 以毫秒计，增量之比即每次IO的平均耗时
+        "read_await_ms": _ratio(read_time, reads),
+        "write_await_ms": _ratio(write_time, writes),
+        "await_ms": _ratio(list(map(operator.add, read_time, write_time)), list(map(operator.add, reads, writes))),
+    }
+    busy = Rates.get("busy_time")
+    if busy is not None:
+        # busy_time 每秒增加的毫秒数 / 1000 即设备忙碌时间占比
+        metrics["util"] = [round(min(value / 10.0, 100.0), 1) for value in busy]
+    return metrics
+
+
+def NicMetrics(Rates: dict) -> dict:
+    """Derive per-interface bytes/s, packets/s, errors/s and drops/s from DeviceRates output"""
+    return {
+        "interface": Rates["name"],
+        "bytes_sent_per_sec": _rounded(Rates["bytes_sent"]),
+        "bytes_recv_per_sec": _rounded(Rates["bytes_recv"]),
+        "packets_sent_per_sec": _rounded(Rates["packets_sent"]),
+        "packets_recv_per_sec": _rounded(Rates["packets_recv"]),
+        "errors_in_per_sec": _rounded(Rates["errin"]),
+        "errors_out_per_sec": _rounded(Rates["errout"]),
+        "drops_in_per_sec": _rounded(Rates["dropin"]),
+        "drops_out_per_sec": _rounded(Rates["dropout"]),
+    }
@@ -0,0 +1,147 @@
+import threading
+import time
+
+# 刷新层级：静态数据进程内只读取一次，慢变数据每隔SlowInterval秒刷新，快变数据每次采样都读取
+STATIC = 'static'
+SLOW = 'slow'
+FAST = 'fast'
+TIERS = (STATIC, SLOW, FAST)
+
+# 各指标族的默认层级
+DEFAULT_TIERS = {
+    'cpu.cores': STATIC,
+    'cpu.count': STATIC,
+    'system.boot_time': STATIC,
+    'system.const': STATIC,
+    'system.platform': STATIC,
+    'disk.partitions': SLOW,
+    'disk.usage': SLOW,
+    'network.addresses': SLOW,
+    'network.interfaces': SLOW,
+    'sensors': SLOW,
+    'cpu.frequency': FAST,
+    'cgroup.limits': SLOW,
+}
+
+
+def ParseTiers(Text: str) -> dict:
+    """Parse a "family=tier,family=tier" string, as used by SYSINFO_REFRESH_TIERS"""
+    tiers = {}
+    for item in (Text or '').split(','):
+        if not item.strip():
+            continue
+        family, _, tier = item.partition('=')
+        tier = tier.strip()
+        if tier not in TIERS:
+            raise ValueError(f"Unknown refresh tier for {family.strip()}: {tier}")
+        tiers[family.strip()] = tier
+    return tiers
+
+
+class _Pending:
+    __slots__ = ('Done', 'Value', 'Error')
+
+    def __init__(self):
+        self.Done = threading.Event()
+        self.Value = None
+        self.Error = None
+
+
+class RefreshPolicy:
+    """Cache metric families according to their refresh tier"""
+
+    def __init__(self, Tiers: dict = None, SlowInterval: float = 30.0, Intervals: dict = None):
+        self.Tiers = dict(DEFAULT_TIERS)
+        if Tiers:
+            self.Tiers.update(Tiers)
+        self.SlowInterval = SlowInterval
+        # 个别慢变指标族可以有自己的刷新间隔（秒），未设置的使用SlowInterval
+        self.Intervals = dict(Intervals or {})
+        self._cache = {}
+        # 正在读取的键：并发的缓存未命中只调用一次Func
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def GetTier(self, Family: str) -> str:
+        """Get the tier of a metric family; unknown families are fast"""
+        return self.Tiers.get(Family, FAST)
+
+    def SetTier(self, Family: str, Tier: str):
+        """Assign a metric family to a tier"""
+        if Tier not in TIERS:
+            raise ValueError(f"Unknown refresh tier: {Tier}")
+        self.Tiers[Family] = Tier
+        self.Invalidate(Family)
+
+    def Get(self, Family: str, Func, *Args):
+        """Get Func(*Args), reusing the cached value while the family's tier allows it"""
+        tier = self.GetTier(Family)
+        if tier == FAST:
+            return Func(*Args)
+        key = (Family, Args)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and (tier == STATIC or now - entry[1] < self.Intervals.get(Family, self.SlowInterval)):
+                return entry[0]
+            pending = self._pending.get(key)
+            owner = pending is None
+            if owner:
+                pending = self._pending[key] = _Pending()
+        if not owner:
+            # 已有线程在读取：有旧值时直接返回旧值，否则等待这次读取的结果
+            if entry is not None:
+                return entry[0]
+            pending.Done.wait()
+            if pending.Error is not None:
+                raise pending.Error
+            return pending.Value
+        try:
+            # 读取失败时抛出异常且不缓存，下次调用重试
+            value = Func(*Args)
+            pending.Value = value
+            with self._lock:
+                self._cache[key] = (value, now)
+            return value
+        except BaseException as e:
+            pending.Error = e
+            raise
+        finally:
+            with self._lock:
+                del self._pending[key]
+            pending.Done.set()
+
+    def GetMany(self, Family: str, Func, Keys, *Args) -> dict:
+        """Get {key: value} for Keys, caching each key separately; Func(missing_keys, *Args) returns a dict for the misses"""
+        keys = list(dict.fromkeys(Keys))
+        tier = self.GetTier(Family)
+        if tier == FAST:
+            return Func(keys, *Args)
+        # 每个键单独缓存：不同的键组合共享同一份缓存，缓存条目数不超过实际出现过的键
+        now = time.monotonic()
+        interval = self.Intervals.get(Family, self.SlowInterval)
+        results = {}
+        with self._lock:
+            for key in keys:
+                entry = self._cache.get((Family, (key,)))
+                if entry is not None and (tier == STATIC or now - entry[1] < interval):
+                    results[key] = entry[0]
+        missing = [key for key in keys if key not in results]
+        if missing:
+            fetched = Func(missing, *Args)
+            with self._lock:
+                for key, value in fetched.items():
+                    # 失败的结果（异常对象）不缓存，下次调用重试
+                    if not isinstance(value, BaseException):
+                        self._cache[(Family, (key,))] = (value, now)
+            results.update(fetched)
+        return results
+
+    def Invalidate(self, Family: str = None):
+        """Drop cached values of one family, or of all families"""
+        with self._lock:
+            if Family is None:
+                self._cache.clear()
+            else:
+                for key in [key for key in self._cache if key[0] == Family]:
+                    del self._cache[key]
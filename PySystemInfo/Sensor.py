@@ -1,4 +1,25 @@
 import psutil
+import errno
+import os
+import re
+import threading
+import time
+from collections import namedtuple
+
+# 与psutil的字段一致，两种来源的读数可以互换使用
+Temperature = namedtuple('Temperature', 'label current high critical')
+Fan = namedtuple('Fan', 'label current')
+# 功率以瓦为单位
+Power = namedtuple('Power', 'label current')
+PowerSupply = namedtuple('PowerSupply', 'type online percent status power voltage current')
+
+_HWMON_INPUT = re.compile(r'^(temp|fan|power)(\d+)_(input|average)$')
+# sysfs中的单位：温度为毫摄氏度，功率为微瓦，电压为微伏，电流为微安
+_SCALES = {'temp': 1000.0, 'fan': 1.0, 'power': 1000000.0}
+_KINDS = {'temp': 'temperatures', 'fan': 'fans', 'power': 'power'}
+# 设备被移除时读取返回的错误，需要重新发现
+_GONE = (errno.ENODEV, errno.ENOENT, errno.ENXIO)
+
 
 def GetTemperature() -> dict:
     """Get temperature"""
@@ -10,4 +31,254 @@ def GetFanSpeed() -> dict:
 
 def GetBatteryInfo():
     """Get battery info"""
-    return psutil.sensors_battery()
\ No newline at end of file
+    return psutil.sensors_battery()
+
+
+def _read_text(path: str):
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def _read_number(path: str, scale: float = 1.0):
+    text = _read_text(path)
+    try:
+        return int(text) / scale if text is not None else None
+    except ValueError:
+        return None
+
+
+class _Input:
+    __slots__ = ('kind', 'chip', 'label', 'fd', 'scale', 'high', 'critical')
+
+    def __init__(self, kind, chip, label, fd, scale, high=None, critical=None):
+        self.kind = kind
+        self.chip = chip
+        self.label = label
+        self.fd = fd
+        self.scale = scale
+        self.high = high
+        self.critical = critical
+
+
+class SensorReader:
+    """hwmon, thermal_zone and power_supply readings from sysfs with descriptors kept open"""
+
+    def __init__(self, Root: str = '/sys', RescanInterval: float = 60.0):
+        self.Root = Root
+        # 新设备出现时类目录的mtime会变化；sysfs不总是更新mtime，所以每隔RescanInterval秒也重新发现一次
+        self.RescanInterval = RescanInterval
+        self._inputs = []
+        self._supplies = {}
+        self._stale = True
+        self._discovered = None
+        self._mtimes = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def Available(Root: str = '/sys') -> bool:
+        """Whether Root has any hwmon, thermal zone or power supply class directory with entries"""
+        for name in ('hwmon', 'thermal', 'power_supply'):
+            try:
+                if os.listdir(os.path.join(Root, 'class', name)):
+                    return True
+            except OSError:
+                pass
+        return False
+
+    def _open(self, path: str):
+        try:
+            return os.open(path, os.O_RDONLY)
+        except OSError:
+            return None
+
+    def _listdir(self, *parts):
+        try:
+            return sorted(os.listdir(os.path.join(self.Root, 'class', *parts)))
+        except OSError:
+            return []
+
+    def _class_mtimes(self) -> tuple:
+        mtimes = []
+        for name in ('hwmon', 'thermal', 'power_supply'):
+            try:
+                mtimes.append(os.stat(os.path.join(self.Root, 'class', name)).st_mtime_ns)
+            except OSError:
+                mtimes.append(None)
+        return tuple(mtimes)
+
+    def Discover(self):
+        """Find every sensor input and open it; labels and thresholds are read once here"""
+        self._close()
+        self._mtimes = self._class_mtimes()
+        self._discovered = time.monotonic()
+        inputs = []
+        for entry in self._listdir('hwmon'):
+            base = os.path.join(self.Root, 'class', 'hwmon', entry)
+            chip = _read_text(os.path.join(base, 'name')) or entry
+            # 旧内核的传感器文件在 device/ 子目录下
+            for directory in (base, os.path.join(base, 'device')):
+                try:
+                    names = sorted(os.listdir(directory))
+                except OSError:
+                    continue
+                for name in names:
+                    match = _HWMON_INPUT.match(name)
+                    if match is None:
+                        continue
+                    prefix, number, suffix = match.groups()
+                    if suffix == 'average' and f"{prefix}{number}_input" in names:
+                        continue
+                    fd = self._open(os.path.join(directory, name))
+                    if fd is None:
+                        continue
+                    stem = os.path.join(directory, f"{prefix}{number}")
+                    scale = _SCALES[prefix]
+                    label = _read_text(stem + '_label') or ''
+                    high = critical = None
+                    if prefix == 'temp':
+                        high = _read_number(stem + '_max', scale)
+                        critical = _read_number(stem + '_crit', scale)
+                    inputs.append(_Input(_KINDS[prefix], chip, label, fd, scale, high, critical))
+
+        for entry in self._listdir('thermal'):
+            if not entry.startswith('thermal_zone'):
+                continue
+            base = os.path.join(self.Root, 'class', 'thermal', entry)
+            fd = self._open(os.path.join(base, 'temp'))
+            if fd is None:
+                continue
+            high = critical = None
+            for name in self._listdir('thermal', entry):
+                if name.startswith('trip_point_') and name.endswith('_type'):
+                    trip = _read_text(os.path.join(base, name))
+                    value = _read_number(os.path.join(base, name[:-5] + '_temp'), 1000.0)
+                    if trip == 'critical':
+                        critical = value
+                    elif trip == 'hot' or (trip == 'passive' and high is None):
+                        high = value
+            chip = _read_text(os.path.join(base, 'type')) or entry
+            inputs.append(_Input('temperatures', chip, entry, fd, 1000.0, high, critical))
+
+        supplies = {}
+        for entry in self._listdir('power_supply'):
+            base = os.path.join(self.Root, 'class', 'power_supply', entry)
+            handles = {}
+            for name in ('online', 'capacity', 'status', 'power_now', 'voltage_now', 'current_now'):
+                fd = self._open(os.path.join(base, name))
+                if fd is not None:
+                    handles[name] = fd
+            supplies[entry] = (_read_text(os.path.join(base, 'type')), handles)
+
+        self._inputs = inputs
+        self._supplies = supplies
+        self._stale = False
+
+    def _pread(self, fd: int):
+        try:
+            return os.pread(fd, 64, 0)
+        except OSError as e:
+            # 传感器暂时不可读（EIO/ENODATA）时跳过，设备移除时下次重新发现
+            if e.errno in _GONE:
+                self._stale = True
+            return None
+
+    def Read(self) -> dict:
+        """Read every input: {"temperatures": {chip: [Temperature]}, "fans": ..., "power": ..., "supplies": {name: PowerSupply}}"""
+        with self._lock:
+            if self._stale or time.monotonic() - self._discovered >= self.RescanInterval \
+                    or self._class_mtimes() != self._mtimes:
+                self.Discover()
+            pread = self._pread
+            inputs = self._inputs
+            # 先连续读取所有描述符，再统一解析
+            raw = [pread(item.fd) for item in inputs]
+            supplies_raw = {name: (kind, {field: pread(fd) for field, fd in handles.items()})
+                            for name, (kind, handles) in self._supplies.items()}
+
+        result = {"temperatures": {}, "fans": {}, "power": {}, "supplies": {}}
+        for item, data in zip(inputs, raw):
+            try:
+                value = int(data) / item.scale
+            except (TypeError, ValueError):
+                continue
+            if item.kind == 'temperatures':
+                reading = Temperature(item.label, value, item.high, item.critical)
+            elif item.kind == 'fans':
+                reading = Fan(item.label, value)
+            else:
+                reading = Power(item.label, value)
+            result[item.kind].setdefault(item.chip, []).append(reading)
+
+        for name, (kind, fields) in supplies_raw.items():
+            def number(field, scale=1.0):
+                data = fields.get(field)
+                try:
+                    return int(data) / scale if data is not None else None
+                except ValueError:
+                    return None
+
+            power = number('power_now', 1000000.0)
+            voltage = number('voltage_now', 1000000.0)
+            current = number('current_now', 1000000.0)
+            if power is None and voltage is not None and current is not None:
+                power = voltage * current
+            online = number('online')
+            status = fields.get('status')
+            result["supplies"][name] = PowerSupply(kind, bool(online) if online is not None else None,
+                                                   number('capacity'),
+                                                   status.decode().strip() if status else None,
+                                                   power, voltage, current)
+        return result
+
+    def _close(self):
+        for item in self._inputs:
+            os.close(item.fd)
+        for _, handles in self._supplies.values():
+            for fd in handles.values():
+                os.close(fd)
+        self._inputs = []
+        self._supplies = {}
+
+    def Close(self):
+        with self._lock:
+            self._close()
+            self._stale = True
+
+
+_readers = {}
+_readers_lock = threading.Lock()
+
+
+def GetSensorReader(Root: str = '/sys'):
+    """Get the shared reader for Root, or None when there is no sysfs sensor class to read"""
+    with _readers_lock:
+        if Root not in _readers:
+            _readers[Root] = SensorReader(Root) if SensorReader.Available(Root) else None
+        return _readers[Root]
+
+
+def GetSensors(Root: str = '/sys') -> dict:
+    """Get every temperature, fan, power and power supply reading, falling back to psutil without sysfs"""
+    reader = GetSensorReader(Root)
+    if reader is not None:
+        return reader.Read()
+    sensors = {"temperatures": {}, "fans": {}, "power": {}, "supplies": {}}
+    try:
+        sensors["temperatures"] = GetTemperature() or {}
+    except (AttributeError, NotImplementedError):
+        pass
+    try:
+        sensors["fans"] = GetFanSpeed() or {}
+    except (AttributeError, NotImplementedError):
+        pass
+    try:
+        battery = GetBatteryInfo()
+    except (AttributeError, NotImplementedError):
+        battery = None
+    if battery is not None:
+        sensors["supplies"]["battery"] = PowerSupply('Battery', battery.power_plugged, battery.percent,
+                                                     None, None, None, None)
+    return sensors
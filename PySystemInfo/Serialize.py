@@ -0,0 +1,112 @@
+import enum
+import json
+import threading
+import time
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 每种namedtuple类型的字段布局只计算一次
+_layouts = {}
+
+
+def GetLayout(RecordType) -> tuple:
+    """Get the field names of a namedtuple type"""
+    layout = _layouts.get(RecordType)
+    if layout is None:
+        layout = tuple(RecordType._fields)
+        _layouts[RecordType] = layout
+    return layout
+
+
+def _plain_column(values: tuple) -> list:
+    # 枚举（如网卡双工模式、地址族）转换为整数
+    for value in values:
+        if value is not None:
+            if isinstance(value, enum.Enum):
+                return [value.value if isinstance(value, enum.Enum) else value for value in values]
+            break
+    return list(values)
+
+
+def Columnar(Records) -> dict:
+    """Convert a sequence of namedtuples into {field: [values...]}"""
+    Records = list(Records)
+    if not Records:
+        return {}
+    fields = GetLayout(type(Records[0]))
+    # zip(*records) 在C层完成转置，不为每条记录创建字典
+    return {field: _plain_column(column) for field, column in zip(fields, zip(*Records))}
+
+
+def ColumnarMap(Mapping: dict, KeyName: str = 'name') -> dict:
+    """Convert {key: namedtuple} into columns, with the keys as the first column"""
+    if not Mapping:
+        return {}
+    table = {KeyName: list(Mapping)}
+    table.update(Columnar(Mapping.values()))
+    return table
+
+
+def ColumnarGroups(Mapping: dict, KeyName: str = 'name') -> dict:
+    """Convert {key: [namedtuple, ...]} into one row per record, repeating the key"""
+    keys = []
+    records = []
+    for key, group in Mapping.items():
+        keys.extend([key] * len(group))
+        records.extend(group)
+    if not records:
+        return {}
+    table = {KeyName: keys}
+    table.update(Columnar(records))
+    return table
+
+
+def _default(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (tuple, set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def Dumps(Obj) -> bytes:
+    """Encode to compact JSON bytes, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(Obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(Obj, default=_default, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+class SerializationStats:
+    """Per-endpoint count, bytes and time spent encoding responses"""
+
+    def __init__(self):
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def Dumps(self, Name: str, Obj) -> bytes:
+        """Encode Obj and account the cost to Name"""
+        start = time.perf_counter()
+        data = Dumps(Obj)
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            entry = self._stats.get(Name)
+            if entry is None:
+                entry = self._stats[Name] = [0, 0, 0.0]
+            entry[0] += 1
+            entry[1] += len(data)
+            entry[2] += elapsed
+        return data
+
+    def Get(self) -> dict:
+        """Get totals and per-response averages for every endpoint"""
+        with self._lock:
+            return {name: {
+                "count": count,
+                "bytes": total_bytes,
+                "seconds": seconds,
+                "avg_bytes": total_bytes / count,
+                "avg_ms": seconds / count * 1000
+            } for name, (count, total_bytes, seconds) in self._stats.items()}
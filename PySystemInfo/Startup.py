@@ -0,0 +1,115 @@
+import contextlib
+import sys
+import time
+
+
+class _TimedLoader:
+    """Wrap a module loader so that executing the module is timed"""
+
+    def __init__(self, timer, loader):
+        self._timer = timer
+        self._loader = loader
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._timer._enter(module.__name__)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._timer._exit(module.__name__)
+
+
+class ImportTimer:
+    """Measure import time per module, plus named init phases, without -X importtime"""
+
+    def __init__(self):
+        self.Imports = {}
+        self.Phases = []
+        self._stack = []
+        self._started = None
+
+    def Start(self):
+        """Install the timing hook; only modules imported afterwards are measured"""
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+        self._started = time.perf_counter()
+
+    def Stop(self):
+        """Remove the timing hook"""
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, fullname, path, target=None):
+        # 交给其余的finder查找，只替换loader以便计时（对PyInstaller打包后的finder同样有效）
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+                    spec.loader = _TimedLoader(self, spec.loader)
+                return spec
+        return None
+
+    def _enter(self, name: str):
+        # [模块名, 开始时间, 子模块耗时]
+        self._stack.append([name, time.perf_counter(), 0.0])
+
+    def _exit(self, name: str):
+        _, started, children = self._stack.pop()
+        cumulative = time.perf_counter() - started
+        self.Imports[name] = (cumulative - children, cumulative)
+        if self._stack:
+            self._stack[-1][2] += cumulative
+
+    @contextlib.contextmanager
+    def Phase(self, Name: str):
+        """Time one named init phase: with timer.Phase('collector'): ..."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.Phases.append((Name, time.perf_counter() - started))
+
+    def Report(self, Top: int = 15) -> dict:
+        """Summarize: total time, init phases, and import time grouped by top-level package"""
+        packages = {}
+        for name, (own, cumulative) in self.Imports.items():
+            package = name.partition('.')[0]
+            entry = packages.setdefault(package, [0.0, 0])
+            entry[0] += own
+            entry[1] += 1
+        ranked = sorted(packages.items(), key=lambda item: item[1][0], reverse=True)
+        slowest = sorted(self.Imports.items(), key=lambda item: item[1][1], reverse=True)
+        return {
+            "total_seconds": time.perf_counter() - self._started if self._started is not None else 0.0,
+            "phases": [{"name": name, "seconds": seconds} for name, seconds in self.Phases],
+            "packages": [{"package": package, "seconds": seconds, "modules": count}
+                         for package, (seconds, count) in ranked[:Top]],
+            "modules": [{"module": name, "self_seconds": own, "cumulative_seconds": cumulative}
+                        for name, (own, cumulative) in slowest[:Top]],
+            "module_count": len(self.Imports)
+        }
+
+
+def FormatReport(Report: dict, Target: float = None) -> str:
+    """Render a report from ImportTimer.Report as text"""
+    lines = [f"启动耗时: {Report['total_seconds'] * 1000:.1f} ms（导入 {Report['module_count']} 个模块）", "", "阶段:"]
+    for phase in Report["phases"]:
+        lines.append(f"  {phase['name']:32s} {phase['seconds'] * 1000:9.1f} ms")
+    lines += ["", "按顶层包统计的导入耗时:"]
+    for package in Report["packages"]:
+        lines.append(f"  {package['package']:32s} {package['seconds'] * 1000:9.1f} ms  ({package['modules']} 个模块)")
+    lines += ["", "累计耗时最长的模块:"]
+    for module in Report["modules"]:
+        lines.append(f"  {module['module']:40s} {module['cumulative_seconds'] * 1000:9.1f} ms"
+                     f"  (自身 {module['self_seconds'] * 1000:.1f} ms)")
+    if Target is not None:
+        verdict = "达标" if Report["total_seconds"] <= Target else "超出目标"
+        lines += ["", f"目标 {Target * 1000:.0f} ms: {verdict}"]
+    return '\n'.join(lines)
@@ -1,27 +1,36 @@
 ###import modules
-from . import CPU
-from . import Memory
-from . import Network
-from . import Disk
-#from . import Sensor
-from . import SystemConst
-
+# 子模块在首次访问时才导入（PEP 562），缩短冷启动时间
+import importlib
 import warnings
-import psutil
 
-try:
-    from . import GPU
-except Exception as e:
-    warnings.warn(f"GPU module load failure, GPU info will not be available. Error: {e}")
+_SUBMODULES = ("CPU", "Memory", "Network", "Disk", "SystemConst", "GPU", "Sensor")
 
 __VERSION__ = "0.0.1"
 __package__ = "PySystemInfo"
 __author__ = "liang-work"
 
+def __getattr__(name):
+    if name not in _SUBMODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    try:
+        module = importlib.import_module(f".{name}", __name__)
+    except Exception as e:
+        if name != "GPU":
+            raise
+        warnings.warn(f"GPU module load failure, GPU info will not be available. Error: {e}")
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from e
+    globals()[name] = module
+    return module
+
+def __dir__():
+    return sorted(set(globals()) | set(_SUBMODULES))
+
 def GetBootTime() -> float:
     """Get boot time"""
+    import psutil
     return psutil.boot_time()
 
 def GetUser() -> list:
     """Get user info"""
-    return psutil.users()
\ No newline at end of file
+    import psutil
+    return psutil.users()
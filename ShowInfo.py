@@ -1,28 +1,78 @@
-import app
+import argparse
+import json
 import threading
-import webview
 import signal
 import sys
 import os
+import time
+
+# 启动耗时目标（秒），可用SYSINFO_STARTUP_TARGET覆盖
+STARTUP_TARGET = float(os.environ.get('SYSINFO_STARTUP_TARGET', 1.0))
 
 def signal_handler(sig, frame):
     """处理信号以优雅退出"""
     print('\n正在关闭应用程序...')
     os._exit(0)
 
+def startup_report(target, output=None):
+    """启动耗时报告模式：按模块统计导入耗时和各初始化阶段耗时"""
+    from PySystemInfo.Startup import ImportTimer, FormatReport
+    started = time.time()
+    timer = ImportTimer()
+    timer.Start()
+    with timer.Phase('import app'):
+        import app
+    with timer.Phase('first sample'):
+        app.collector.Start()
+    with timer.Phase('first request'):
+        app.app.test_client().get('/api/system-info')
+    timer.Stop()
+    app.collector.Stop()
+
+    # 解释器（及打包程序解压）在本函数之前消耗的时间
+    import psutil
+    timer.Phases.insert(0, ('interpreter', max(0.0, started - psutil.Process().create_time())))
+    report = timer.Report()
+    report["total_seconds"] += timer.Phases[0][1]
+    report["target_seconds"] = target
+    print(FormatReport(report, Target=target))
+    if output:
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 0 if report["total_seconds"] <= target else 1
+
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="系统信息查看器")
+    parser.add_argument('--headless', action='store_true', help="只启动服务，不打开窗口（不加载webview）")
+    parser.add_argument('--port', type=int, default=5000, help="监听端口")
+    parser.add_argument('--startup-report', action='store_true', help="输出启动耗时报告后退出")
+    parser.add_argument('--startup-target', type=float, default=STARTUP_TARGET,
+                        help="启动耗时目标（秒），超出时报告模式以非零状态退出")
+    parser.add_argument('--startup-json', help="启动耗时报告JSON的保存路径")
+    args = parser.parse_args()
+
+    if args.startup_report:
+        sys.exit(startup_report(args.startup_target, args.startup_json))
+
     # 设置信号处理
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
 
     try:
+        import app
+
+        if args.headless:
+            app.app.run(host='0.0.0.0', port=args.port, debug=False)
+            sys.exit(0)
+
         # 启动Flask应用程序的线程
-        flask_thread = threading.Thread(target=app.app.run, kwargs={'host':'0.0.0.0', 'port':5000, 'debug':False})
+        flask_thread = threading.Thread(target=app.app.run, kwargs={'host':'0.0.0.0', 'port':args.port, 'debug':False})
         flask_thread.daemon = True
         flask_thread.start()
 
-        # 创建并显示WebView窗口
-        webview.create_window('系统信息查看器', 'http://localhost:5000')
+        # 需要窗口时才加载webview
+        import webview
+        webview.create_window('系统信息查看器', f'http://localhost:{args.port}')
         webview.start(icon='web/favicon.ico')
     except KeyboardInterrupt:
         print('\n接收到中断信号，正在退出...')
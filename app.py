@@ -1,30 +1,122 @@
-from PySystemInfo import CPU, Memory, Disk, Network, Sensor, SystemConst, GPU
+from PySystemInfo import CPU, Disk, Network
+from PySystemInfo.Collector import Collector
+from PySystemInfo.Rate import RateTracker, DeviceRates, DiskMetrics, NicMetrics
+from PySystemInfo.History import History, FlattenSnapshot
+from PySystemInfo.Process import ProcessTable
+from PySystemInfo.Refresh import RefreshPolicy, ParseTiers
+from PySystemInfo.Exporter import Exporter, COUNTER, GAUGE, PROMETHEUS_CONTENT_TYPE, OPENMETRICS_CONTENT_TYPE
+from PySystemInfo.Serialize import Columnar, ColumnarMap, ColumnarGroups, SerializationStats, orjson
+from PySystemInfo.Query import Query
+from PySystemInfo.Backend import GetBackend, SumCounters
+from PySystemInfo.Instrument import Stats
+from PySystemInfo.CoreUsage import CoreTracker
 import flask
+import argparse
+import hashlib
+import hmac
 import os
 import platform
 import psutil
 import time
+import threading
 from datetime import datetime
-import json
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 template_dir = os.path.join(BASE_DIR, 'web/')
 static_dir = os.path.join(BASE_DIR, 'web/')
 app = flask.Flask(__name__, template_folder=template_dir, static_folder=static_dir)
 
-# 全局变量用于存储网络IO计数器的上一次值
-last_net_io = None
-last_net_time = None
+# 自身运行指标：各采集函数和接口的延迟直方图、错误数、响应字节数
+instrument = Stats()
 
-# 全局变量用于存储磁盘IO计数器的上一次值
-last_disk_io = None
-last_disk_time = None
+@app.before_request
+def instrument_begin():
+    """记录请求开始时间；开启cProfile分析时为当前请求线程启用分析器"""
+    flask.g.instrument_start = time.perf_counter()
+    session = instrument.Session
+    if session is not None and flask.request.endpoint != 'profile_info':
+        session.Begin()
+
+@app.after_request
+def instrument_end(response):
+    """按接口记录耗时、5xx错误和响应字节数"""
+    start = flask.g.pop('instrument_start', None)
+    if start is not None:
+        instrument.Observe('endpoints', flask.request.endpoint or 'unknown', time.perf_counter() - start,
+                           Error=response.status_code >= 500,
+                           Bytes=0 if response.is_streamed else response.content_length or 0)
+    return response
+
+@app.teardown_request
+def instrument_teardown(error=None):
+    session = instrument.Session
+    if session is not None:
+        session.End()
+
+# 分层刷新策略：静态数据只读取一次，慢变数据定期刷新（SYSINFO_REFRESH_TIERS可覆盖默认层级）
+refresh = RefreshPolicy(Tiers=ParseTiers(os.environ.get('SYSINFO_REFRESH_TIERS')),
+                        SlowInterval=float(os.environ.get('SYSINFO_SLOW_INTERVAL', 30.0)),
+                        Intervals={'sensors': float(os.environ.get('SYSINFO_SENSOR_INTERVAL', 5.0))})
+
+# 传感器所在的sysfs根目录；没有hwmon/thermal/power_supply时退回psutil
+SENSOR_ROOT = os.environ.get('SYSINFO_SENSOR_ROOT', '/sys')
+# 按顺序选取CPU温度的芯片：Intel、AMD、ARM的thermal zone、Intel封装温度
+CPU_TEMPERATURE_CHIPS = ('coretemp', 'k10temp', 'zenpower', 'cpu_thermal', 'cpu-thermal', 'x86_pkg_temp')
+
+# 单个挂载点disk_usage的超时时间（秒），防止失去响应的NFS挂载阻塞整个响应
+DISK_USAGE_TIMEOUT = float(os.environ.get('SYSINFO_DISK_TIMEOUT', 2.0))
+
+# 目录占用分析：每个挂载点一份按目录mtime增量更新的索引，保存在SYSINFO_DISK_INDEX_DIR
+DISK_INDEX_DIR = os.environ.get('SYSINFO_DISK_INDEX_DIR',
+                                os.path.join(os.path.expanduser('~'), '.cache', 'PySystemInfo', 'disk-index'))
+DISK_SCAN_WORKERS = int(os.environ.get('SYSINFO_DISK_SCAN_WORKERS', 8))
+# 超过该时间（秒）的扫描结果在下次请求时于后台重新扫描
+DISK_TREE_MAX_AGE = float(os.environ.get('SYSINFO_DISK_TREE_MAX_AGE', 300.0))
+# 增量扫描不会发现原地追加写入的文件，超过该时间（秒）后的自动刷新改为完整扫描
+DISK_TREE_FULL_AGE = float(os.environ.get('SYSINFO_DISK_TREE_FULL_AGE', DISK_TREE_MAX_AGE * 12))
+# 手动刷新（?refresh=）的最小间隔（秒）；完整扫描另外受DISK_TREE_FULL_AGE限制
+DISK_TREE_MIN_INTERVAL = float(os.environ.get('SYSINFO_DISK_TREE_MIN_INTERVAL', 60.0))
+usage_trees = {}
+usage_trees_lock = threading.Lock()
+
+# 计数器后端：Linux上常驻打开/proc文件直接解析，其他系统使用psutil（SYSINFO_BACKEND=procfs/psutil可指定）
+host_backend = GetBackend(os.environ.get('SYSINFO_BACKEND'))
+
+# cgroup v2：当前cgroup及其所有子cgroup的用量、限额和限流（SYSINFO_CGROUPS=0关闭）
+CGROUP_ROOT = os.environ.get('SYSINFO_CGROUP_ROOT', '/sys/fs/cgroup')
+cgroup_monitor = None
+if os.environ.get('SYSINFO_CGROUPS') != '0' and os.path.exists(os.path.join(CGROUP_ROOT, 'cgroup.controllers')):
+    from PySystemInfo.Cgroup import CgroupMonitor
+    cgroup_monitor = CgroupMonitor(Root=CGROUP_ROOT, Path=os.environ.get('SYSINFO_CGROUP_PATH'))
+
+def get_cgroup_limits():
+    """获取所在cgroup的CPU（核数）和内存限额，不在容器中或无限额时为空"""
+    if cgroup_monitor is None:
+        return {}
+    try:
+        return refresh.Get('cgroup.limits', cgroup_monitor.Limits)
+    except OSError:
+        return {}
+
+# 按核心的CPU占用分解：由相邻两次cpu_times差分得出，不阻塞等待
+# SYSINFO_CORE_HISTORY 为热力图保留的采样数，0表示不保留
+core_tracker = CoreTracker(History=int(os.environ.get('SYSINFO_CORE_HISTORY', 300)))
+
+# 进程表，跨采样周期缓存psutil.Process对象
+process_table = ProcessTable()
+
+# 网络/磁盘IO速率计算器，由后台采样器统一更新，所有客户端共享同一采样窗口
+net_rates = RateTracker()
+disk_rates = RateTracker()
+# 按设备的速率：每次采样对所有磁盘/网卡一次性差分
+disk_device_rates = DeviceRates()
+nic_device_rates = DeviceRates()
 
 def get_cpu_info():
     """获取CPU信息"""
     try:
-        # 获取CPU使用率
-        cpu_usage = CPU.GetCPUUtilization(InterruptsTime=1, EveryCore=False)
+        # 获取CPU使用率（非阻塞，统计自上一次采样以来的使用率）
+        cpu_usage = CPU.GetCPUUtilization(InterruptsTime=None, EveryCore=False)
         if isinstance(cpu_usage, list):
             cpu_usage = sum(cpu_usage) / len(cpu_usage) if cpu_usage else 0
         
@@ -38,27 +130,29 @@ def get_cpu_info():
             cpu_freq = 0
         
         # 获取CPU核心数
-        cpu_cores = CPU.GetCPUCoreCount()
+        cpu_cores = refresh.Get('cpu.cores', CPU.GetCPUCoreCount)
         if cpu_cores:
             cpu_cores = len(cpu_cores)
         else:
-            cpu_cores = psutil.cpu_count(logical=False) or 1
+            cpu_cores = refresh.Get('cpu.count', psutil.cpu_count, False) or 1
         
         # 获取CPU温度（如果有传感器）
         cpu_temp = None
         try:
-            temps = Sensor.GetTemperature()
-            if temps and 'coretemp' in temps:
-                core_temps = temps['coretemp']
-                if core_temps:
-                    cpu_temp = core_temps[0].current if hasattr(core_temps[0], 'current') else core_temps[0]
-        except:
+            temps = get_sensors_info()["temperatures"]
+            for chip in CPU_TEMPERATURE_CHIPS:
+                if temps.get(chip):
+                    cpu_temp = temps[chip][0].current
+                    break
+        except Exception:
             cpu_temp = None
         
         return {
             "usage": round(float(cpu_usage), 1),
             "frequency": round(float(cpu_freq), 1) if cpu_freq else 0,
             "cores": cpu_cores,
+            # cgroup的cpu.max限额折算的核数，无限额时为None
+            "limit": get_cgroup_limits().get("cpus"),
             "temperature": round(float(cpu_temp), 1) if cpu_temp else None
         }
     except Exception as e:
@@ -68,7 +162,7 @@ def get_cpu_info():
 def get_memory_info():
     """获取内存信息"""
     try:
-        memory = Memory.GetRunMemory()
+        memory, _ = host_backend.ReadMemory()
         
         # 计算内存使用率
         memory_usage = (memory.used / memory.total) * 100 if memory.total > 0 else 0
@@ -77,66 +171,75 @@ def get_memory_info():
             "usage": round(float(memory_usage), 1),
             "used": memory.used,
             "available": memory.available,
-            "total": memory.total
+            "total": memory.total,
+            "limit": get_cgroup_limits().get("memory")
         }
     except Exception as e:
         print(f"获取内存信息失败: {e}")
         return {"error": str(e)}
 
+def get_disk_usages(mountpoints):
+    """并行获取各挂载点的使用情况，所有挂载点共享同一超时期限"""
+    return refresh.GetMany('disk.usage', Disk.GetDiskUsages, mountpoints, DISK_USAGE_TIMEOUT)
+
 def get_disk_info():
     """获取磁盘信息"""
-    global last_disk_io, last_disk_time
-
     try:
-        partitions = Disk.GetDiskMount(all=False)
+        partitions = refresh.Get('disk.partitions', Disk.GetDiskMount, False)
         disk_info = []
+        unavailable = []
 
         # 获取磁盘IO信息
-        current_disk_io = psutil.disk_io_counters(perdisk=False)
-        current_time = time.time()
-
-        disk_read_speed = 0
-        disk_write_speed = 0
-
-        if last_disk_io and last_disk_time:
-            time_diff = current_time - last_disk_time
-            if time_diff > 0:
-                disk_read_speed = (current_disk_io.read_bytes - last_disk_io.read_bytes) / time_diff
-                disk_write_speed = (current_disk_io.write_bytes - last_disk_io.write_bytes) / time_diff
-
-        # 更新全局变量
-        last_disk_io = current_disk_io
-        last_disk_time = current_time
+        disks = host_backend.ReadDisks()
+        device_rates = disk_device_rates.Update(disks)
+        current_disk_io = host_backend.DiskTotals(disks)
+        rates = {}
+        if current_disk_io:
+            rates = disk_rates.Update({
+                "read_bytes": current_disk_io.read_bytes,
+                "write_bytes": current_disk_io.write_bytes,
+                "read_count": current_disk_io.read_count,
+                "write_count": current_disk_io.write_count
+            })
 
+        # 处理Windows路径问题
+        mountpoints = []
         for partition in partitions:
-            try:
-                # 处理Windows路径问题
-                mountpoint = partition.mountpoint
-                # 如果是Windows路径，确保路径格式正确
-                if ':' in mountpoint and '\\' in mountpoint:
-                    # 使用原始字符串格式避免转义问题
-                    mountpoint = mountpoint.replace('\\', '/')
-
-                usage = Disk.GetDiskUsage(mountpoint)
-                disk_info.append({
-                    "device": partition.device,
-                    "mountpoint": partition.mountpoint,
-                    "usage": round((usage.used / usage.total) * 100, 1) if usage.total > 0 else 0,
-                    "used": usage.used,
-                    "free": usage.free,
-                    "total": usage.total
-                })
-            except Exception as e:
-                # 安全地处理设备名称显示
-                device_name = str(partition.device).replace('\\', '\\\\')
+            mountpoint = partition.mountpoint
+            # 如果是Windows路径，确保路径格式正确
+            if ':' in mountpoint and '\\' in mountpoint:
+                # 使用原始字符串格式避免转义问题
+                mountpoint = mountpoint.replace('\\', '/')
+            mountpoints.append(mountpoint)
+
+        usages = get_disk_usages(mountpoints)
+        for partition, mountpoint in zip(partitions, mountpoints):
+            usage = usages.get(mountpoint)
+            if isinstance(usage, TimeoutError):
+                # 挂载点无响应，单独标记而不阻塞其他分区
+                unavailable.append(partition.mountpoint)
                 continue
+            if usage is None or isinstance(usage, Exception):
+                continue
+            disk_info.append({
+                "device": partition.device,
+                "mountpoint": partition.mountpoint,
+                "usage": round((usage.used / usage.total) * 100, 1) if usage.total > 0 else 0,
+                "used": usage.used,
+                "free": usage.free,
+                "total": usage.total
+            })
 
         return {
             "partitions": disk_info,
+            "unavailable": unavailable,
             "io": {
-                "read_speed": round(float(disk_read_speed), 1),
-                "write_speed": round(float(disk_write_speed), 1)
-            }
+                "read_speed": round(rates.get("read_bytes", 0.0), 1),
+                "write_speed": round(rates.get("write_bytes", 0.0), 1),
+                "read_iops": round(rates.get("read_count", 0.0), 1),
+                "write_iops": round(rates.get("write_count", 0.0), 1)
+            },
+            "devices": DiskMetrics(device_rates) if device_rates else None
         }
     except Exception as e:
         print(f"获取磁盘信息失败: {e}")
@@ -144,32 +247,29 @@ def get_disk_info():
 
 def get_network_info():
     """获取网络信息"""
-    global last_net_io, last_net_time
-    
     try:
-        current_net_io = Network.GetNetworkIO(Pernic=False)
-        current_time = time.time()
-        
-        upload_speed = 0
-        download_speed = 0
-        
-        if last_net_io and last_net_time:
-            time_diff = current_time - last_net_time
-            if time_diff > 0:
-                upload_speed = (current_net_io.bytes_sent - last_net_io.bytes_sent) / time_diff
-                download_speed = (current_net_io.bytes_recv - last_net_io.bytes_recv) / time_diff
-        
-        # 更新全局变量
-        last_net_io = current_net_io
-        last_net_time = current_time
-        
-        # 获取网络连接数
-        connections = len(Network.GetNetworkStats(Pernic='all'))
+        nics = host_backend.ReadNetwork()
+        device_rates = nic_device_rates.Update(nics)
+        current_net_io = SumCounters(nics)
+        rates = net_rates.Update({
+            "bytes_sent": current_net_io.bytes_sent,
+            "bytes_recv": current_net_io.bytes_recv,
+            "packets_sent": current_net_io.packets_sent,
+            "packets_recv": current_net_io.packets_recv
+        })
+
+        # 获取网络连接数（直接统计/proc/net，不构造每个连接的对象）
+        connection_stats = Network.GetConnectionStats()
         
         return {
-            "upload": round(float(upload_speed), 1),
-            "download": round(float(download_speed), 1),
-            "connections": connections
+            "upload": round(rates.get("bytes_sent", 0.0), 1),
+            "download": round(rates.get("bytes_recv", 0.0), 1),
+            "packets_sent": round(rates.get("packets_sent", 0.0), 1),
+            "packets_recv": round(rates.get("packets_recv", 0.0), 1),
+            "connections": connection_stats["total"],
+            "protocols": connection_stats["protocols"],
+            "tcp_states": connection_stats["tcp_states"],
+            "interfaces": NicMetrics(device_rates) if device_rates else None
         }
     except Exception as e:
         print(f"获取网络信息失败: {e}")
@@ -179,7 +279,7 @@ def get_system_info():
     """获取系统信息"""
     try:
         # 获取系统启动时间
-        boot_time = psutil.boot_time()
+        boot_time = refresh.Get('system.boot_time', psutil.boot_time)
 
         # 计算系统运行时间
         uptime = time.time() - boot_time
@@ -196,9 +296,42 @@ def get_system_info():
         print(f"获取系统信息失败: {e}")
         return {"error": str(e)}
 
+def get_process_info():
+    """采样进程表"""
+    try:
+        return {"count": process_table.Update()}
+    except Exception as e:
+        print(f"获取进程信息失败: {e}")
+        return {"error": str(e)}
+
+def get_sensors_info():
+    """获取全部温度、风扇、功率和电源传感器读数（sysfs句柄常驻，按SYSINFO_SENSOR_INTERVAL刷新）"""
+    from PySystemInfo import Sensor
+    return refresh.Get('sensors', Sensor.GetSensors, SENSOR_ROOT)
+
+def get_counters_info():
+    """采集导出指标所需的明细计数器（按核心、按磁盘、按网卡）"""
+    try:
+        sample = host_backend.Sample()
+        breakdown = core_tracker.Update(sample.cpu_per_core, Now=sample.timestamp)
+        return {
+            "cpu_per_core": breakdown["usage"] if breakdown else [],
+            "cpu_breakdown": breakdown,
+            "cpu_times": sample.cpu,
+            "swap": sample.swap,
+            "disk_io": sample.disks,
+            "net_io": sample.nics,
+            "sensors": get_sensors_info()
+        }
+    except Exception as e:
+        print(f"获取计数器信息失败: {e}")
+        return {"error": str(e)}
+
 def get_gpu_info():
     """获取GPU信息"""
     try:
+        # GPU模块及其后端在首次采样时才加载
+        from PySystemInfo import GPU
         gpu_data = GPU.GetGPUInfo()
         if not gpu_data:
             return {"gpus": []}
@@ -229,6 +362,161 @@ def get_gpu_info():
         print(f"获取GPU信息失败: {e}")
         return {"gpus": []}
 
+# 后台采样器：由单独线程按固定间隔采样，HTTP接口只读取最新快照
+collector = Collector(Interval=float(os.environ.get('SYSINFO_SAMPLE_INTERVAL', 1.0)), Stats=instrument)
+collector.Register('cpu', get_cpu_info)
+collector.Register('memory', get_memory_info)
+collector.Register('disk', get_disk_info)
+collector.Register('network', get_network_info)
+collector.Register('system', get_system_info)
+collector.Register('gpu', get_gpu_info)
+collector.Register('processes', get_process_info)
+collector.Register('counters', get_counters_info)
+
+def get_cgroup_info():
+    """采样所有cgroup（列式表格，每行一个cgroup）"""
+    try:
+        return {"path": cgroup_monitor.Path, "groups": cgroup_monitor.Sample()}
+    except Exception as e:
+        print(f"获取cgroup信息失败: {e}")
+        return {"error": str(e)}
+
+if cgroup_monitor is not None:
+    collector.Register('cgroups', get_cgroup_info)
+
+# 服务端历史数据：默认以采样间隔保留4小时，内存占用固定
+history = History(Capacity=max(1, int(float(os.environ.get('SYSINFO_HISTORY_SECONDS', 14400)) / collector.Interval)))
+
+# 可选：持久化归档，设置SYSINFO_ARCHIVE_DIR后启用
+archive = None
+if os.environ.get('SYSINFO_ARCHIVE_DIR'):
+    from PySystemInfo.Archive import Archive
+    retention = os.environ.get('SYSINFO_ARCHIVE_RETENTION')
+    archive = Archive(os.environ['SYSINFO_ARCHIVE_DIR'], RetentionSeconds=float(retention) if retention else None)
+
+# 集群模式：agent将样本批量上报给aggregator（SYSINFO_FLEET_TOKEN用于双方鉴权）
+FLEET_TOKEN = os.environ.get('SYSINFO_FLEET_TOKEN')
+fleet_agent = None
+aggregator = None
+if os.environ.get('SYSINFO_FLEET_AGGREGATOR') == '1':
+    from PySystemInfo.Fleet import Aggregator
+    aggregator = Aggregator(Capacity=int(float(os.environ.get('SYSINFO_FLEET_HISTORY_SECONDS', 900))))
+
+# 可选：告警引擎，设置任一SYSINFO_ALERT*变量后启用；未指定通知渠道时输出到标准输出
+alerts = None
+if any(os.environ.get(name) for name in ('SYSINFO_ALERTS', 'SYSINFO_ALERT_RULES', 'SYSINFO_ALERT_WEBHOOK',
+                                         'SYSINFO_ALERT_FILE', 'SYSINFO_ALERT_STDOUT')):
+    from PySystemInfo.Alert import AlertEngine, LoadRules, StdoutNotifier, FileNotifier, WebhookNotifier
+    notifiers = []
+    if os.environ.get('SYSINFO_ALERT_WEBHOOK'):
+        notifiers.append(WebhookNotifier(os.environ['SYSINFO_ALERT_WEBHOOK']))
+    if os.environ.get('SYSINFO_ALERT_FILE'):
+        notifiers.append(FileNotifier(os.environ['SYSINFO_ALERT_FILE']))
+    if os.environ.get('SYSINFO_ALERT_STDOUT') == '1' or not notifiers:
+        notifiers.append(StdoutNotifier())
+    try:
+        alert_rules = LoadRules(os.environ.get('SYSINFO_ALERT_RULES'))
+    except (OSError, ValueError) as e:
+        # 规则文件不可读或格式错误时不影响服务启动，只是没有告警规则
+        print(f"加载告警规则失败: {e}")
+        alert_rules = []
+    alerts = AlertEngine(alert_rules, notifiers,
+                         Cooldown=float(os.environ.get('SYSINFO_ALERT_COOLDOWN', 300.0)),
+                         Repeat=float(os.environ.get('SYSINFO_ALERT_REPEAT', 0.0)))
+
+# 后台组件只在实际服务请求的进程中启动一次：导入模块（benchmark、debug重载器的父进程）不产生任何副作用
+background_started = False
+background_lock = threading.Lock()
+
+def start_background():
+    """启动后台组件：CPU分解基线、nvidia-smi常驻查询、归档写入和告警通知"""
+    global background_started
+    if background_started:
+        return
+    with background_lock:
+        if background_started:
+            return
+        background_started = True
+    core_tracker.Update(host_backend.ReadCPU()[1])
+    # 可选：让nvidia-smi常驻循环输出，代替每次采样启动一个子进程
+    if os.environ.get('SYSINFO_GPU_QUERY_LOOP') == '1':
+        from PySystemInfo import GPU
+        GPU.GetGPUBackend().StartQueryLoop(Interval=collector.Interval)
+    if archive is not None:
+        archive.Start()
+    if alerts is not None:
+        alerts.Start()
+
+@app.before_request
+def ensure_background():
+    """第一个请求时启动后台组件（由WSGI服务器加载时没有__main__入口）"""
+    start_background()
+
+def get_sensor_values(snapshot):
+    """将温度传感器读数展开为 sensors.<芯片>.<标签> 指标，供告警规则使用"""
+    temperatures = (snapshot.get("counters") or {}).get("sensors", {}).get("temperatures") or {}
+    return {
+        f"sensors.{chip}.{reading.label or index}": reading.current
+        for chip, readings in temperatures.items()
+        for index, reading in enumerate(readings)
+        if reading.current is not None
+    }
+
+def record_snapshot(snapshot):
+    """将新快照写入历史数据、归档、集群上报和告警引擎（只展开一次）"""
+    values = FlattenSnapshot({name: snapshot[name] for name in HISTORY_SOURCES})
+    history.Record(snapshot["timestamp"], values)
+    if alerts is not None:
+        alerts.Evaluate(snapshot["timestamp"], values)
+        alerts.Evaluate(snapshot["timestamp"], get_sensor_values(snapshot))
+    if archive is not None:
+        archive.Append(snapshot["timestamp"], values)
+    if fleet_agent is not None:
+        fleet_agent.Add(snapshot["timestamp"], values)
+
+collector.Subscribe(record_snapshot)
+
+def get_snapshot():
+    """获取采样器的最新快照"""
+    return collector.GetSnapshot()
+
+# 各接口的序列化字节数和耗时统计
+serialization_stats = SerializationStats()
+
+def json_response(data, status=200):
+    """用序列化层编码响应，并按接口记录字节数和耗时"""
+    body = serialization_stats.Dumps(flask.request.endpoint or 'unknown', data)
+    return flask.Response(body, status=status, mimetype='application/json')
+
+SUBSYSTEMS = ("cpu", "memory", "disk", "network", "system", "gpu")
+# 写入历史数据的数据源（明细计数器只用于导出，不逐项记录历史）
+HISTORY_SOURCES = SUBSYSTEMS + ("processes",)
+
+def build_system_info(snapshot, subsystems=SUBSYSTEMS):
+    """从快照中组合指定子系统的数据"""
+    response_data = {name: snapshot[name] for name in subsystems}
+    # 各子系统的采样状态：ok / stale（超时，沿用上次结果）/ failed
+    response_data["status"] = {name: snapshot["status"].get(name) for name in subsystems}
+    response_data["timestamp"] = datetime.fromtimestamp(snapshot["timestamp"]).isoformat()
+    return response_data
+
+# 推送负载缓存：每个采样周期、每种子系统组合只序列化一次，再分发给所有订阅者
+_stream_cache = {"seq": None, "payloads": {}}
+_stream_lock = threading.Lock()
+
+def get_stream_payload(seq, snapshot, subsystems):
+    """获取某次采样对应的SSE消息（已编码）"""
+    with _stream_lock:
+        if _stream_cache["seq"] != seq:
+            _stream_cache["seq"] = seq
+            _stream_cache["payloads"] = {}
+        payload = _stream_cache["payloads"].get(subsystems)
+        if payload is None:
+            data = serialization_stats.Dumps('stream_info', build_system_info(snapshot, subsystems))
+            payload = f"id: {seq}\nevent: sample\ndata: ".encode('utf-8') + data + b"\n\n"
+            _stream_cache["payloads"][subsystems] = payload
+        return payload
+
 @app.route('/')
 def index():
     """主页路由"""
@@ -238,36 +526,55 @@ def index():
 def system_info():
     """系统信息API接口"""
     try:
-        # 并行获取所有系统信息
-        cpu_data = get_cpu_info()
-        memory_data = get_memory_info()
-        disk_data = get_disk_info()
-        network_data = get_network_info()
-        system_data = get_system_info()
-        gpu_data = get_gpu_info()
-
-        # 组合所有数据
-        response_data = {
-            "cpu": cpu_data,
-            "memory": memory_data,
-            "disk": disk_data,
-            "network": network_data,
-            "system": system_data,
-            "gpu": gpu_data,
-            "timestamp": datetime.now().isoformat()
-        }
+        # 直接读取后台采样器的最新快照，不在请求线程中采样
+        response_data = build_system_info(get_snapshot())
 
-        return flask.jsonify(response_data)
+        return json_response(response_data)
 
     except Exception as e:
         print(f"系统信息API错误: {e}")
         return flask.jsonify({"error": f"获取系统信息失败: {str(e)}"}), 500
 
+@app.route('/api/stream')
+def stream_info():
+    """服务端推送(SSE)接口，可通过subsystems和interval参数选择订阅内容和频率"""
+    requested = flask.request.args.get('subsystems')
+    if requested:
+        subsystems = tuple(name for name in SUBSYSTEMS if name in requested.split(','))
+        if not subsystems:
+            return flask.jsonify({"error": f"未知子系统: {requested}"}), 400
+    else:
+        subsystems = SUBSYSTEMS
+    interval = max(collector.Interval, flask.request.args.get('interval', collector.Interval, type=float))
+
+    get_snapshot()
+
+    def generate():
+        seq = 0
+        next_send = 0.0
+        yield b"retry: 3000\n\n"
+        while True:
+            result = collector.WaitForSample(seq, Timeout=15)
+            if result is None:
+                # 保持连接，防止代理超时断开
+                yield b": keepalive\n\n"
+                continue
+            seq, snapshot = result
+            now = time.monotonic()
+            if now < next_send:
+                continue
+            # 留出半个采样间隔的容差，避免因调度抖动跳过一个周期
+            next_send = now + interval - collector.Interval / 2
+            yield get_stream_payload(seq, snapshot, subsystems)
+
+    return flask.Response(generate(), mimetype='text/event-stream',
+                          headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @app.route('/api/cpu')
 def cpu_info():
     """单独的CPU信息API"""
     try:
-        return flask.jsonify(get_cpu_info())
+        return json_response(get_snapshot()['cpu'])
     except Exception as e:
         return flask.jsonify({"error": str(e)}), 500
 
@@ -275,7 +582,7 @@ def cpu_info():
 def memory_info():
     """单独的内存信息API"""
     try:
-        return flask.jsonify(get_memory_info())
+        return json_response(get_snapshot()['memory'])
     except Exception as e:
         return flask.jsonify({"error": str(e)}), 500
 
@@ -283,7 +590,7 @@ def memory_info():
 def disk_info():
     """单独的磁盘信息API"""
     try:
-        return flask.jsonify(get_disk_info())
+        return json_response(get_snapshot()['disk'])
     except Exception as e:
         return flask.jsonify({"error": str(e)}), 500
 
@@ -291,7 +598,7 @@ def disk_info():
 def network_info():
     """单独的网络信息API"""
     try:
-        return flask.jsonify(get_network_info())
+        return json_response(get_snapshot()['network'])
     except Exception as e:
         return flask.jsonify({"error": str(e)}), 500
 
@@ -299,7 +606,7 @@ def network_info():
 def system_basic_info():
     """单独的系统基本信息API"""
     try:
-        return flask.jsonify(get_system_info())
+        return json_response(get_snapshot()['system'])
     except Exception as e:
         return flask.jsonify({"error": str(e)}), 500
 
@@ -307,173 +614,786 @@ def system_basic_info():
 def gpu_info():
     """单独的GPU信息API"""
     try:
-        return flask.jsonify(get_gpu_info())
+        return json_response(get_snapshot()['gpu'])
     except Exception as e:
         return flask.jsonify({"error": str(e)}), 500
 
-@app.route('/api/cpu/detailed')
-def cpu_detailed_info():
-    """CPU详细信息API"""
+@app.route('/api/history')
+def history_info():
+    """历史数据API，支持降采样"""
     try:
-        import psutil
-        cpu_info = {
-            "physical_cores": psutil.cpu_count(logical=False),
-            "logical_cores": psutil.cpu_count(logical=True),
-            "usage_per_core": psutil.cpu_percent(percpu=True, interval=1),
-            "frequency": psutil.cpu_freq(percpu=True) if psutil.cpu_freq() else None,
-            "stats": psutil.cpu_stats()._asdict() if psutil.cpu_stats() else None,
-            "times": psutil.cpu_times(percpu=True) if psutil.cpu_times(percpu=True) else None
-        }
-        return flask.jsonify(cpu_info)
+        get_snapshot()
+        metric = flask.request.args.get('metric')
+        if not metric:
+            return flask.jsonify({"metrics": history.Metrics()})
+
+        since = flask.request.args.get('since', type=float)
+        if since is not None and since < 0:
+            # 负数表示相对当前时间的秒数
+            since = time.time() + since
+        step = flask.request.args.get('step', type=float)
+        if step is not None and step <= 0:
+            step = None
+
+        series = history.Query(metric, Since=since, Step=step)
+        if series is None:
+            return flask.jsonify({"error": f"未知指标: {metric}"}), 404
+        return json_response(series)
     except Exception as e:
         return flask.jsonify({"error": str(e)}), 500
 
-@app.route('/api/memory/detailed')
-def memory_detailed_info():
-    """内存详细信息API"""
+@app.route('/api/processes')
+def processes_info():
+    """进程排行API，按cpu/memory/io排序返回前N个进程"""
     try:
-        import psutil
-        memory = psutil.virtual_memory()
-        swap = psutil.swap_memory()
-
-        memory_info = {
-            "virtual_memory": {
-                "total": memory.total,
-                "available": memory.available,
-                "used": memory.used,
-                "free": memory.free,
-                "percent": memory.percent,
-                "active": getattr(memory, 'active', None),
-                "inactive": getattr(memory, 'inactive', None),
-                "buffers": getattr(memory, 'buffers', None),
-                "cached": getattr(memory, 'cached', None),
-                "shared": getattr(memory, 'shared', None),
-                "slab": getattr(memory, 'slab', None)
-            },
-            "swap_memory": {
-                "total": swap.total,
-                "used": swap.used,
-                "free": swap.free,
-                "percent": swap.percent,
-                "sin": swap.sin,
-                "sout": swap.sout
+        get_snapshot()
+        sort = flask.request.args.get('sort', 'cpu')
+        limit = min(1000, max(1, flask.request.args.get('limit', 20, type=int)))
+        return json_response({
+            "count": process_table.Count(),
+            "sort": sort,
+            "processes": process_table.Top(Sort=sort, Limit=limit)
+        })
+    except ValueError as e:
+        return flask.jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return flask.jsonify({"error": str(e)}), 500
+
+@app.route('/api/archive')
+def archive_info():
+    """归档数据API，resolution可选raw/1m/1h"""
+    try:
+        if archive is None:
+            return flask.jsonify({"error": "未启用归档（设置SYSINFO_ARCHIVE_DIR）"}), 404
+        metric = flask.request.args.get('metric')
+        if not metric:
+            return flask.jsonify({"error": "缺少metric参数"}), 400
+
+        now = time.time()
+        start = flask.request.args.get('start', -3600, type=float)
+        end = flask.request.args.get('end', type=float)
+        # 负数表示相对当前时间的秒数
+        if start < 0:
+            start = now + start
+        if end is not None and end < 0:
+            end = now + end
+        resolution = flask.request.args.get('resolution', 'raw')
+        return json_response(archive.Query(metric, start, end, Resolution=resolution))
+    except ValueError as e:
+        return flask.jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return flask.jsonify({"error": str(e)}), 500
+
+def cached(cache, key, func, *args):
+    """同一次查询中相同的读取只执行一次，批量查询的各子系统看到一致的数据"""
+    if key not in cache:
+        cache[key] = func(*args)
+    return cache[key]
+
+def core_breakdown(cache):
+    """获取最近一次的按核心占用分解；采样器尚未产生数据时以当前计数器立即计算一次"""
+    def read():
+        return core_tracker.GetBreakdown() or core_tracker.Update(host_backend.ReadCPU()[1])
+    return cached(cache, 'core_breakdown', read)
+
+def core_breakdown_section(query, cache):
+    breakdown = core_breakdown(cache)
+    if not breakdown:
+        return None
+    table = {"core": list(range(breakdown["cores"]))}
+    table.update((name, values) for name, values in breakdown.items() if isinstance(values, list))
+    return table
+
+def sensors_section(query, cache):
+    """全部传感器读数（列式），每行一个温度、风扇或功率传感器"""
+    sensors = get_sensors_info()
+    table = {"kind": [], "chip": [], "label": [], "current": [], "high": [], "critical": []}
+    for kind in ("temperatures", "fans", "power"):
+        for chip, readings in (sensors.get(kind) or {}).items():
+            for reading in readings:
+                table["kind"].append(kind)
+                table["chip"].append(chip)
+                table["label"].append(reading.label)
+                table["current"].append(reading.current)
+                table["high"].append(getattr(reading, 'high', None))
+                table["critical"].append(getattr(reading, 'critical', None))
+    return table
+
+def cpu_frequency_section(query, cache):
+    """各核心频率（列式）"""
+    frequency = psutil.cpu_freq(percpu=True)
+    return Columnar(frequency) if frequency else None
+
+def cpu_stats_section(query, cache):
+    """CPU上下文切换、中断等统计"""
+    stats = psutil.cpu_stats()
+    return stats._asdict() if stats else None
+
+def virtual_memory_section(query, cache):
+    """物理内存详细信息"""
+    memory = cached(cache, 'memory', host_backend.ReadMemory)[0]
+    return {
+        "total": memory.total,
+        "available": memory.available,
+        "used": memory.used,
+        "free": memory.free,
+        "percent": memory.percent,
+        "active": getattr(memory, 'active', None),
+        "inactive": getattr(memory, 'inactive', None),
+        "buffers": getattr(memory, 'buffers', None),
+        "cached": getattr(memory, 'cached', None),
+        "shared": getattr(memory, 'shared', None),
+        "slab": getattr(memory, 'slab', None)
+    }
+
+def swap_memory_section(query, cache):
+    """交换内存详细信息"""
+    swap = cached(cache, 'memory', host_backend.ReadMemory)[1]
+    return {
+        "total": swap.total,
+        "used": swap.used,
+        "free": swap.free,
+        "percent": swap.percent,
+        "sin": swap.sin,
+        "sout": swap.sout
+    }
+
+def disk_partitions_section(query, cache):
+    """分区及使用情况，先按过滤条件筛选分区，只读取需要的挂载点"""
+    partitions = refresh.Get('disk.partitions', Disk.GetDiskMount, False)
+    for key in ('device', 'mountpoint', 'fstype'):
+        allowed = query.Allowed(key)
+        if allowed is not None:
+            partitions = [partition for partition in partitions if getattr(partition, key) in allowed]
+
+    disk_info = []
+    usages = get_disk_usages([partition.mountpoint for partition in partitions])
+    for partition in partitions:
+        usage = usages.get(partition.mountpoint)
+        if usage is None or isinstance(usage, Exception):
+            continue
+        disk_info.append({
+            "device": partition.device,
+            "mountpoint": partition.mountpoint,
+            "fstype": partition.fstype,
+            "opts": partition.opts,
+            "usage": {
+                "total": usage.total,
+                "used": usage.used,
+                "free": usage.free,
+                "percent": usage.percent
             }
-        }
-        return flask.jsonify(memory_info)
+        })
+    return disk_info
+
+def network_connections_section(query, cache):
+    """连接列表（列式），kind过滤条件选择连接类型，默认inet"""
+    kinds = query.Allowed('kind')
+    connections = Columnar(Network.GetNetworkStats(Pernic=next(iter(kinds)) if kinds else 'inet'))
+    for column in ("laddr", "raddr"):
+        if column in connections:
+            connections[column] = [list(addr) if addr else None for addr in connections[column]]
+    return connections
+
+def gpu_devices_section(query, cache):
+    """GPU设备列表"""
+    from PySystemInfo import GPU
+    return [{
+        "id": gpu.get('id'),
+        "name": gpu.get('name'),
+        "load": gpu.get('load'),
+        "memory_used": gpu.get('memory_used'),
+        "memory_total": gpu.get('memory_total'),
+        "memory_free": gpu.get('memory_free'),
+        "memory_util": gpu.get('memory_util'),
+        "temperature": gpu.get('temperature')
+    } for gpu in GPU.GetGPUInfo() or []]
+
+def get_platform_info():
+    """获取平台信息（进程生命周期内不变）"""
+    return {
+        "system": platform.system(),
+        "node": platform.node(),
+        "release": platform.release(),
+        "version": platform.version(),
+        "machine": platform.machine(),
+        "processor": platform.processor()
+    }
+
+# 各详细信息接口的数据节：只有被请求的节才会采集
+DETAILED_SECTIONS = {
+    "cpu": {
+        "physical_cores": lambda query, cache: refresh.Get('cpu.count', psutil.cpu_count, False),
+        "logical_cores": lambda query, cache: refresh.Get('cpu.count', psutil.cpu_count, True),
+        "usage_per_core": lambda query, cache: (core_breakdown(cache) or {}).get("usage"),
+        "breakdown": core_breakdown_section,
+        "heatmap": lambda query, cache: core_tracker.GetHistory(),
+        "frequency": cpu_frequency_section,
+        "stats": cpu_stats_section,
+        "times": lambda query, cache: Columnar(psutil.cpu_times(percpu=True)) or None,
+    },
+    "memory": {
+        "virtual_memory": virtual_memory_section,
+        "swap_memory": swap_memory_section,
+    },
+    "disk": {
+        "partitions": disk_partitions_section,
+        "io_stats": lambda query, cache: ColumnarMap(cached(cache, 'disks', host_backend.ReadDisks), KeyName='disk'),
+        # 由采样器按相邻两次采样计算的每设备速率
+        "io_rates": lambda query, cache: get_snapshot()["disk"].get("devices"),
+    },
+    "network": {
+        # 地址每行一条（interface列重复网卡名），状态和计数器每行一个网卡
+        "interfaces": lambda query, cache: ColumnarGroups(refresh.Get('network.addresses', Network.GetNetworkInfo),
+                                                          KeyName='interface'),
+        "stats": lambda query, cache: ColumnarMap(refresh.Get('network.interfaces', Network.GetNetworkCardStatus),
+                                                  KeyName='interface'),
+        "io_counters": lambda query, cache: ColumnarMap(cached(cache, 'nics', host_backend.ReadNetwork),
+                                                        KeyName='interface'),
+        "io_rates": lambda query, cache: get_snapshot()["network"].get("interfaces"),
+        "connection_stats": lambda query, cache: Network.GetConnectionStats(),
+        "connections": network_connections_section,
+    },
+    "gpu": {
+        "gpus": gpu_devices_section,
+    },
+    "system": {
+        "platform": lambda query, cache: refresh.Get('system.platform', get_platform_info),
+        "boot_time": lambda query, cache: refresh.Get('system.boot_time', psutil.boot_time),
+        "users": lambda query, cache: Columnar(psutil.users()),
+        "pids": lambda query, cache: sorted(cached(cache, 'pids', psutil.pids)),
+        "process_count": lambda query, cache: len(cached(cache, 'pids', psutil.pids)),
+        "sensors": sensors_section,
+        "power_supplies": lambda query, cache: ColumnarMap(get_sensors_info().get("supplies") or {}),
+    },
+}
+
+# 未指定fields时返回的节；完整连接列表和PID列表体积大，需要显式请求
+DETAILED_DEFAULTS = {
+    "cpu": ("physical_cores", "logical_cores", "usage_per_core", "breakdown", "frequency", "stats", "times"),
+    "network": ("interfaces", "stats", "io_counters", "io_rates", "connection_stats"),
+    "system": ("platform", "boot_time", "users", "process_count", "sensors", "power_supplies"),
+}
+
+def collect_detailed(subsystem, query, cache):
+    """按查询采集一个子系统的详细信息"""
+    sections = DETAILED_SECTIONS[subsystem]
+    result = {}
+    for name in query.Select(sections, DETAILED_DEFAULTS.get(subsystem)):
+        result[name] = query.Apply(name, sections[name](query, cache))
+    if query.NextCursor is not None:
+        result["next_cursor"] = str(query.NextCursor)
+    return result
+
+def detailed_response(subsystem):
+    """详细信息接口的公共处理：?fields=、?filter=key=value、?limit=、?cursor="""
+    try:
+        query = Query.FromArgs(flask.request.args)
+        return json_response(collect_detailed(subsystem, query, {}))
+    except ValueError as e:
+        return flask.jsonify({"error": str(e)}), 400
     except Exception as e:
         return flask.jsonify({"error": str(e)}), 500
 
+@app.route('/api/cpu/detailed')
+def cpu_detailed_info():
+    """CPU详细信息API"""
+    return detailed_response('cpu')
+
+@app.route('/api/memory/detailed')
+def memory_detailed_info():
+    """内存详细信息API"""
+    return detailed_response('memory')
+
 @app.route('/api/disk/detailed')
 def disk_detailed_info():
     """磁盘详细信息API"""
-    try:
-        import psutil
-        partitions = psutil.disk_partitions(all=False)
-        disk_info = []
-
-        for partition in partitions:
-            try:
-                usage = psutil.disk_usage(partition.mountpoint)
-                disk_info.append({
-                    "device": partition.device,
-                    "mountpoint": partition.mountpoint,
-                    "fstype": partition.fstype,
-                    "opts": partition.opts,
-                    "usage": {
-                        "total": usage.total,
-                        "used": usage.used,
-                        "free": usage.free,
-                        "percent": usage.percent
-                    }
-                })
-            except Exception as e:
-                continue
+    return detailed_response('disk')
 
-        # IO统计信息
-        io_counters = psutil.disk_io_counters(perdisk=True)
-        io_stats = {}
-        if io_counters:
-            for disk, stats in io_counters.items():
-                io_stats[disk] = {
-                    "read_count": stats.read_count,
-                    "write_count": stats.write_count,
-                    "read_bytes": stats.read_bytes,
-                    "write_bytes": stats.write_bytes,
-                    "read_time": stats.read_time,
-                    "write_time": stats.write_time,
-                    "busy_time": getattr(stats, 'busy_time', None)
-                }
+def get_usage_tree(mount):
+    """获取挂载点的目录占用索引，只接受当前已挂载的挂载点"""
+    partitions = refresh.Get('disk.partitions', Disk.GetDiskMount, False)
+    if mount not in {partition.mountpoint for partition in partitions}:
+        raise ValueError(f"Unknown mount: {mount}")
+    with usage_trees_lock:
+        tree = usage_trees.get(mount)
+        if tree is None:
+            from PySystemInfo.DiskTree import UsageTree
+            name = hashlib.sha1(mount.encode('utf-8')).hexdigest()[:16]
+            tree = UsageTree(mount, IndexPath=os.path.join(DISK_INDEX_DIR, f"{name}.index"), Workers=DISK_SCAN_WORKERS)
+            usage_trees[mount] = tree
+        return tree
 
-        return flask.jsonify({
-            "partitions": disk_info,
-            "io_stats": io_stats
-        })
+@app.route('/api/disk/usage-tree')
+def disk_usage_tree():
+    """目录占用分析API：返回挂载点下占用最大的子目录树，扫描在后台进行（与内部接口相同的访问限制）"""
+    # 会暴露目录名并触发全盘扫描，只允许本机或持有SYSINFO_INTERNAL_TOKEN的客户端
+    error = internal_unauthorized()
+    if error is not None:
+        return error
+    try:
+        args = flask.request.args
+        mount = args.get('mount', '/')
+        depth = min(10, max(0, args.get('depth', 2, type=int)))
+        top = min(100, max(1, args.get('top', 10, type=int)))
+        # refresh=1 增量重新扫描，refresh=full 忽略索引完整扫描；过于频繁的手动刷新被降级或忽略
+        rescan = args.get('refresh')
+        tree = get_usage_tree(mount)
+        now = time.time()
+        throttled = False
+        if rescan == 'full' and tree.FullScannedAt is not None and now - tree.FullScannedAt < DISK_TREE_FULL_AGE:
+            rescan, throttled = '1', True
+        if rescan and tree.ScannedAt is not None and now - tree.ScannedAt < DISK_TREE_MIN_INTERVAL:
+            rescan, throttled = None, True
+        if rescan or tree.ScannedAt is None or now - tree.ScannedAt > DISK_TREE_MAX_AGE:
+            full = (rescan == 'full' or tree.FullScannedAt is None
+                    or now - tree.FullScannedAt > DISK_TREE_FULL_AGE)
+            tree.Refresh(Full=full)
+        result = {
+            "mount": mount,
+            "scanning": tree.Scanning,
+            "scanned_at": tree.ScannedAt,
+            "full_scanned_at": tree.FullScannedAt,
+            "refresh_throttled": throttled,
+            "stats": tree.Stats,
+            "tree": tree.Tree(Depth=depth, Top=top, Path=args.get('path'))
+        }
+        if tree.ScannedAt is None:
+            # 首次扫描尚未完成
+            return json_response(result, 202)
+        if result["tree"] is None:
+            raise ValueError(f"Path not found in index: {args.get('path')}")
+        return json_response(result)
+    except ValueError as e:
+        return flask.jsonify({"error": str(e)}), 400
     except Exception as e:
         return flask.jsonify({"error": str(e)}), 500
 
 @app.route('/api/network/detailed')
 def network_detailed_info():
     """网络详细信息API"""
+    return detailed_response('network')
+
+@app.route('/api/cgroups')
+def cgroups_info():
+    """cgroup用量API：支持fields/filter/limit/cursor，例如 filter=path=/system.slice"""
     try:
-        import psutil
-        network_info = {
-            "interfaces": psutil.net_if_addrs(),
-            "stats": psutil.net_if_stats(),
-            "io_counters": psutil.net_io_counters(pernic=True) if psutil.net_io_counters(pernic=True) else {},
-            "connections": [conn._asdict() for conn in psutil.net_connections(kind='inet')]
+        if cgroup_monitor is None:
+            return flask.jsonify({"error": "cgroup v2 is not available"}), 404
+        query = Query.FromArgs(flask.request.args)
+        snapshot = get_snapshot().get("cgroups") or {}
+        if "error" in snapshot:
+            return flask.jsonify(snapshot), 500
+        result = {
+            "path": snapshot.get("path"),
+            "limits": get_cgroup_limits(),
+            "groups": query.Apply("groups", snapshot.get("groups"))
         }
-        return flask.jsonify(network_info)
+        if query.NextCursor is not None:
+            result["next_cursor"] = str(query.NextCursor)
+        return json_response(result)
+    except ValueError as e:
+        return flask.jsonify({"error": str(e)}), 400
     except Exception as e:
         return flask.jsonify({"error": str(e)}), 500
 
-@app.route('/api/gpu/detailed')
-def gpu_detailed_info():
-    """GPU详细信息API"""
+@app.route('/api/network/connections')
+def network_connections_info():
+    """网络连接列表API（分页），需要完整连接列表时才调用"""
     try:
-        gpu_data = GPU.GetGPUInfo()
-        if not gpu_data:
-            return flask.jsonify({"gpus": []})
+        kind = flask.request.args.get('kind', 'inet')
+        offset = max(0, flask.request.args.get('offset', 0, type=int))
+        limit = min(1000, max(1, flask.request.args.get('limit', 100, type=int)))
 
-        detailed_gpus = []
-        for gpu in gpu_data:
-            gpu_detail = {
-                "id": gpu.get('id'),
-                "name": gpu.get('name'),
-                "load": gpu.get('load'),
-                "memory_used": gpu.get('memory_used'),
-                "memory_total": gpu.get('memory_total'),
-                "memory_free": gpu.get('memory_free'),
-                "memory_util": gpu.get('memory_util'),
-                "temperature": gpu.get('temperature')
-            }
-            detailed_gpus.append(gpu_detail)
+        connections = Network.GetNetworkStats(Pernic=kind)
+        page = Columnar(connections[offset:offset + limit])
+        for column in ("laddr", "raddr"):
+            if column in page:
+                page[column] = [list(addr) if addr else None for addr in page[column]]
 
-        return flask.jsonify({"gpus": detailed_gpus})
+        return json_response({
+            "total": len(connections),
+            "offset": offset,
+            "limit": limit,
+            "connections": page
+        })
+    except ValueError as e:
+        return flask.jsonify({"error": str(e)}), 400
     except Exception as e:
         return flask.jsonify({"error": str(e)}), 500
 
+@app.route('/api/gpu/detailed')
+def gpu_detailed_info():
+    """GPU详细信息API"""
+    return detailed_response('gpu')
+
 @app.route('/api/system/detailed')
 def system_detailed_info():
     """系统详细信息API"""
+    return detailed_response('system')
+
+@app.route('/api/query', methods=['POST'])
+def batch_query():
+    """批量查询：{子系统: {fields, filter, limit, cursor, source}}，所有子系统共享同一快照和同一组读取结果"""
     try:
-        import psutil
-        import platform
-
-        system_info = {
-            "platform": {
-                "system": platform.system(),
-                "node": platform.node(),
-                "release": platform.release(),
-                "version": platform.version(),
-                "machine": platform.machine(),
-                "processor": platform.processor()
-            },
-            "boot_time": psutil.boot_time(),
-            "users": [user._asdict() for user in psutil.users()],
-            "pids": psutil.pids(),
-            "process_count": len(psutil.pids())
-        }
-        return flask.jsonify(system_info)
+        body = flask.request.get_json(force=True, silent=True)
+        if not isinstance(body, dict) or not body:
+            return flask.jsonify({"error": "请求体应为 {子系统: 查询条件} 形式的JSON对象"}), 400
+
+        snapshot = get_snapshot()
+        cache = {}
+        results = {}
+        for name, spec in body.items():
+            spec = spec or {}
+            if not isinstance(spec, dict):
+                raise ValueError(f"{name} 的查询条件应为JSON对象")
+            query = Query.FromDict(spec)
+            if spec.get('source') == 'snapshot':
+                # 读取采样器快照中的汇总数据
+                if name not in SUBSYSTEMS:
+                    raise ValueError(f"未知子系统: {name}")
+                data = snapshot[name]
+                sections = query.Select(data) if isinstance(data, dict) else []
+                results[name] = {section: query.Apply(section, data[section]) for section in sections}
+                if query.NextCursor is not None:
+                    results[name]["next_cursor"] = str(query.NextCursor)
+            elif name in DETAILED_SECTIONS:
+                results[name] = collect_detailed(name, query, cache)
+            else:
+                raise ValueError(f"未知子系统: {name}")
+
+        return json_response({
+            "timestamp": datetime.fromtimestamp(snapshot["timestamp"]).isoformat(),
+            "status": snapshot["status"],
+            "results": results
+        })
+    except ValueError as e:
+        return flask.jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return flask.jsonify({"error": str(e)}), 500
+
+def fleet_unavailable():
+    """检查聚合模式和鉴权，返回错误响应或None"""
+    if aggregator is None:
+        return flask.jsonify({"error": "未启用聚合模式（--aggregator 或 SYSINFO_FLEET_AGGREGATOR=1）"}), 404
+    if FLEET_TOKEN:
+        supplied = flask.request.headers.get('Authorization', '')
+        if not hmac.compare_digest(supplied, f'Bearer {FLEET_TOKEN}'):
+            return flask.jsonify({"error": "未授权"}), 401
+    return None
+
+@app.route('/api/fleet/ingest', methods=['POST'])
+def fleet_ingest():
+    """接收agent上报的压缩批次"""
+    error = fleet_unavailable()
+    if error is not None:
+        return error
+    try:
+        count = aggregator.Ingest(flask.request.get_data())
+        return flask.jsonify({"accepted": count})
+    except (ValueError, KeyError, TypeError) as e:
+        return flask.jsonify({"error": f"无效的批次: {e}"}), 400
+    except Exception as e:
+        return flask.jsonify({"error": str(e)}), 500
+
+@app.route('/api/fleet/hosts')
+def fleet_hosts():
+    """集群主机列表"""
+    error = fleet_unavailable()
+    if error is not None:
+        return error
+    return flask.jsonify({"hosts": aggregator.Hosts()})
+
+@app.route('/api/fleet/top')
+def fleet_top():
+    """按指标最新值排序的主机Top-N"""
+    error = fleet_unavailable()
+    if error is not None:
+        return error
+    metric = flask.request.args.get('metric', 'cpu.usage')
+    limit = min(1000, max(1, flask.request.args.get('limit', 10, type=int)))
+    return flask.jsonify({"metric": metric, "hosts": aggregator.Top(Metric=metric, Limit=limit)})
+
+@app.route('/api/fleet/disks')
+def fleet_disks():
+    """使用率超过阈值的磁盘"""
+    error = fleet_unavailable()
+    if error is not None:
+        return error
+    threshold = flask.request.args.get('threshold', 90.0, type=float)
+    return flask.jsonify({"threshold": threshold, "disks": aggregator.DisksOver(Threshold=threshold)})
+
+@app.route('/api/fleet/history')
+def fleet_history():
+    """单个主机的历史数据"""
+    error = fleet_unavailable()
+    if error is not None:
+        return error
+    host = flask.request.args.get('host')
+    metric = flask.request.args.get('metric', 'cpu.usage')
+    since = flask.request.args.get('since', type=float)
+    if since is not None and since < 0:
+        since = time.time() + since
+    step = flask.request.args.get('step', type=float)
+    series = aggregator.Query(host, metric, Since=since, Step=step if step and step > 0 else None)
+    if series is None:
+        return flask.jsonify({"error": f"未知主机或指标: {host} {metric}"}), 404
+    return flask.jsonify(series)
+
+def run_agent(url, host=None):
+    """无界面agent模式：只运行采样器并把样本上报给aggregator"""
+    global fleet_agent
+    from PySystemInfo.Fleet import Agent
+    fleet_agent = Agent(url, Host=host, Token=FLEET_TOKEN)
+    fleet_agent.Start()
+    start_background()
+    collector.Start()
+    print(f"agent {fleet_agent.Host} 正在向 {url} 上报")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        collector.Stop()
+        fleet_agent.Stop()
+
+# Prometheus / OpenMetrics 指标定义，名称和标签模板只构建一次
+exporter = Exporter(Prefix='sysinfo')
+exporter.Family('cpu_usage_percent', GAUGE, 'CPU utilization across all cores.')
+exporter.Family('cpu_core_usage_percent', GAUGE, 'CPU utilization per logical core.', ('core',))
+exporter.Family('cpu_seconds', COUNTER, 'CPU time spent in each mode.', ('mode',))
+exporter.Family('cpu_frequency_mhz', GAUGE, 'Current CPU frequency.')
+exporter.Family('cpu_cores', GAUGE, 'Number of usable CPU cores.')
+exporter.Family('cpu_temperature_celsius', GAUGE, 'CPU package temperature.')
+exporter.Family('memory_usage_percent', GAUGE, 'Memory utilization.')
+exporter.Family('memory_bytes', GAUGE, 'Memory size by state.', ('state',))
+exporter.Family('swap_bytes', GAUGE, 'Swap size by state.', ('state',))
+exporter.Family('swap_in_bytes', COUNTER, 'Bytes swapped in from disk.')
+exporter.Family('swap_out_bytes', COUNTER, 'Bytes swapped out to disk.')
+exporter.Family('filesystem_bytes', GAUGE, 'Filesystem size by state.', ('device', 'mountpoint', 'state'))
+exporter.Family('filesystem_usage_percent', GAUGE, 'Filesystem utilization.', ('device', 'mountpoint'))
+exporter.Family('disk_read_bytes', COUNTER, 'Bytes read per disk.', ('disk',))
+exporter.Family('disk_written_bytes', COUNTER, 'Bytes written per disk.', ('disk',))
+exporter.Family('disk_reads_completed', COUNTER, 'Reads completed per disk.', ('disk',))
+exporter.Family('disk_writes_completed', COUNTER, 'Writes completed per disk.', ('disk',))
+exporter.Family('disk_io_time_seconds', COUNTER, 'Time spent doing IO per disk.', ('disk',))
+exporter.Family('network_receive_bytes', COUNTER, 'Bytes received per interface.', ('interface',))
+exporter.Family('network_transmit_bytes', COUNTER, 'Bytes transmitted per interface.', ('interface',))
+exporter.Family('network_receive_packets', COUNTER, 'Packets received per interface.', ('interface',))
+exporter.Family('network_transmit_packets', COUNTER, 'Packets transmitted per interface.', ('interface',))
+exporter.Family('network_receive_errors', COUNTER, 'Receive errors per interface.', ('interface',))
+exporter.Family('network_transmit_errors', COUNTER, 'Transmit errors per interface.', ('interface',))
+exporter.Family('network_receive_drop', COUNTER, 'Dropped incoming packets per interface.', ('interface',))
+exporter.Family('network_transmit_drop', COUNTER, 'Dropped outgoing packets per interface.', ('interface',))
+exporter.Family('network_connections', GAUGE, 'Open sockets per protocol.', ('protocol',))
+exporter.Family('network_tcp_connections', GAUGE, 'TCP sockets per state.', ('state',))
+exporter.Family('gpu_utilization_percent', GAUGE, 'GPU utilization.', ('gpu', 'name'))
+exporter.Family('gpu_memory_bytes', GAUGE, 'GPU memory by state.', ('gpu', 'name', 'state'))
+exporter.Family('gpu_temperature_celsius', GAUGE, 'GPU temperature.', ('gpu', 'name'))
+exporter.Family('sensor_temperature_celsius', GAUGE, 'Hardware temperature sensor reading.', ('chip', 'sensor'))
+exporter.Family('sensor_fan_rpm', GAUGE, 'Fan speed.', ('chip', 'sensor'))
+exporter.Family('sensor_power_watts', GAUGE, 'Hardware power sensor reading.', ('chip', 'sensor'))
+exporter.Family('power_supply_online', GAUGE, 'Whether a power supply is online.', ('supply', 'type'))
+exporter.Family('power_supply_capacity_percent', GAUGE, 'Remaining battery capacity.', ('supply', 'type'))
+exporter.Family('power_supply_power_watts', GAUGE, 'Power drawn from or delivered by a power supply.', ('supply', 'type'))
+exporter.Family('cgroup_cpu_cores', GAUGE, 'CPU cores used by a cgroup.', ('cgroup',))
+exporter.Family('cgroup_cpu_throttled_percent', GAUGE, 'Share of CFS periods in which a cgroup was throttled.', ('cgroup',))
+exporter.Family('cgroup_memory_bytes', GAUGE, 'Memory charged to a cgroup.', ('cgroup',))
+exporter.Family('cgroup_memory_limit_bytes', GAUGE, 'Memory limit of a cgroup.', ('cgroup',))
+exporter.Family('boot_time_seconds', GAUGE, 'System boot time in unix seconds.')
+exporter.Family('processes', GAUGE, 'Number of processes.')
+exporter.Family('collector_up', GAUGE, 'Whether the last sample of a source succeeded (stale counts as down).', ('source',))
+exporter.Family('sample_timestamp_seconds', GAUGE, 'Unix time of the snapshot being exported.')
+
+def build_metric_samples(snapshot):
+    """将快照转换为各指标族的样本列表"""
+    samples = {}
+    cpu = snapshot.get("cpu", {})
+    memory = snapshot.get("memory", {})
+    disk = snapshot.get("disk", {})
+    network = snapshot.get("network", {})
+    system = snapshot.get("system", {})
+    counters = snapshot.get("counters", {})
+
+    samples['cpu_usage_percent'] = [(cpu.get("usage"),)]
+    samples['cpu_core_usage_percent'] = [(usage, str(core)) for core, usage in enumerate(counters.get("cpu_per_core") or [])]
+    cpu_times = counters.get("cpu_times")
+    if cpu_times is not None:
+        samples['cpu_seconds'] = [(value, mode) for mode, value in zip(cpu_times._fields, cpu_times)]
+    samples['cpu_frequency_mhz'] = [(cpu.get("frequency"),)]
+    samples['cpu_cores'] = [(cpu.get("cores"),)]
+    samples['cpu_temperature_celsius'] = [(cpu.get("temperature"),)]
+
+    samples['memory_usage_percent'] = [(memory.get("usage"),)]
+    samples['memory_bytes'] = [(memory.get(state), state) for state in ("total", "used", "available")]
+    swap = counters.get("swap")
+    if swap is not None:
+        samples['swap_bytes'] = [(swap.total, "total"), (swap.used, "used"), (swap.free, "free")]
+        samples['swap_in_bytes'] = [(swap.sin,)]
+        samples['swap_out_bytes'] = [(swap.sout,)]
+
+    filesystem_bytes = []
+    filesystem_usage = []
+    for partition in disk.get("partitions") or []:
+        device, mountpoint = partition["device"], partition["mountpoint"]
+        for state in ("total", "used", "free"):
+            filesystem_bytes.append((partition[state], device, mountpoint, state))
+        filesystem_usage.append((partition["usage"], device, mountpoint))
+    samples['filesystem_bytes'] = filesystem_bytes
+    samples['filesystem_usage_percent'] = filesystem_usage
+
+    disk_io = counters.get("disk_io") or {}
+    samples['disk_read_bytes'] = [(io.read_bytes, name) for name, io in disk_io.items()]
+    samples['disk_written_bytes'] = [(io.write_bytes, name) for name, io in disk_io.items()]
+    samples['disk_reads_completed'] = [(io.read_count, name) for name, io in disk_io.items()]
+    samples['disk_writes_completed'] = [(io.write_count, name) for name, io in disk_io.items()]
+    samples['disk_io_time_seconds'] = [(io.busy_time / 1000, name) for name, io in disk_io.items()
+                                       if hasattr(io, 'busy_time')]
+
+    net_io = counters.get("net_io") or {}
+    samples['network_receive_bytes'] = [(io.bytes_recv, name) for name, io in net_io.items()]
+    samples['network_transmit_bytes'] = [(io.bytes_sent, name) for name, io in net_io.items()]
+    samples['network_receive_packets'] = [(io.packets_recv, name) for name, io in net_io.items()]
+    samples['network_transmit_packets'] = [(io.packets_sent, name) for name, io in net_io.items()]
+    samples['network_receive_errors'] = [(io.errin, name) for name, io in net_io.items()]
+    samples['network_transmit_errors'] = [(io.errout, name) for name, io in net_io.items()]
+    samples['network_receive_drop'] = [(io.dropin, name) for name, io in net_io.items()]
+    samples['network_transmit_drop'] = [(io.dropout, name) for name, io in net_io.items()]
+    samples['network_connections'] = [(count, protocol) for protocol, count in (network.get("protocols") or {}).items()]
+    samples['network_tcp_connections'] = [(count, state) for state, count in (network.get("tcp_states") or {}).items()]
+
+    gpu_utilization = []
+    gpu_memory = []
+    gpu_temperature = []
+    for gpu in snapshot.get("gpu", {}).get("gpus") or []:
+        gpu_id, name = str(gpu.get("id")), gpu.get("name") or ""
+        gpu_utilization.append((gpu.get("load"), gpu_id, name))
+        for state in ("used", "total", "free"):
+            value = gpu.get(f"memory_{state}")
+            # nvidia-smi 以MiB为单位
+            gpu_memory.append((value * 1048576 if value is not None else None, gpu_id, name, state))
+        gpu_temperature.append((gpu.get("temperature"), gpu_id, name))
+    samples['gpu_utilization_percent'] = gpu_utilization
+    samples['gpu_memory_bytes'] = gpu_memory
+    samples['gpu_temperature_celsius'] = gpu_temperature
+
+    sensors = counters.get("sensors") or {}
+    samples['sensor_temperature_celsius'] = [
+        (reading.current, chip, reading.label or str(index))
+        for chip, readings in (sensors.get("temperatures") or {}).items()
+        for index, reading in enumerate(readings)
+    ]
+    samples['sensor_fan_rpm'] = [
+        (reading.current, chip, reading.label or str(index))
+        for chip, readings in (sensors.get("fans") or {}).items()
+        for index, reading in enumerate(readings)
+    ]
+    samples['sensor_power_watts'] = [
+        (reading.current, chip, reading.label or str(index))
+        for chip, readings in (sensors.get("power") or {}).items()
+        for index, reading in enumerate(readings)
+    ]
+    supplies = (sensors.get("supplies") or {}).items()
+    samples['power_supply_online'] = [(int(supply.online) if supply.online is not None else None, name, supply.type or '')
+                                      for name, supply in supplies]
+    samples['power_supply_capacity_percent'] = [(supply.percent, name, supply.type or '') for name, supply in supplies]
+    samples['power_supply_power_watts'] = [(supply.power, name, supply.type or '') for name, supply in supplies]
+
+    groups = (snapshot.get("cgroups") or {}).get("groups") or {}
+    paths = groups.get("path") or []
+    for family, column in (('cgroup_cpu_cores', 'cpu_cores'), ('cgroup_cpu_throttled_percent', 'throttled_percent'),
+                           ('cgroup_memory_bytes', 'memory_current'), ('cgroup_memory_limit_bytes', 'memory_max')):
+        samples[family] = list(zip(groups.get(column) or [], paths))
+
+    samples['boot_time_seconds'] = [(system.get("boot_time"),)]
+    samples['processes'] = [(system.get("processes"),)]
+    samples['collector_up'] = [(state == "ok", source) for source, state in snapshot.get("status", {}).items()]
+    samples['sample_timestamp_seconds'] = [(snapshot.get("timestamp"),)]
+    return samples
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus / OpenMetrics 指标接口，只读取最新快照，不触发阻塞采样"""
+    try:
+        openmetrics = 'application/openmetrics-text' in flask.request.headers.get('Accept', '')
+        body = exporter.Render(build_metric_samples(get_snapshot()), OpenMetrics=openmetrics)
+        content_type = OPENMETRICS_CONTENT_TYPE if openmetrics else PROMETHEUS_CONTENT_TYPE
+        return flask.Response(body, content_type=content_type)
+    except Exception as e:
+        return flask.Response(f"# error: {e}\n", status=500, content_type='text/plain; charset=utf-8')
+
+@app.route('/api/alerts')
+def alerts_info():
+    """当前告警和最近的告警事件"""
+    try:
+        if alerts is None:
+            return flask.jsonify({"error": "未启用告警（设置SYSINFO_ALERTS=1或SYSINFO_ALERT_RULES）"}), 404
+        get_snapshot()
+        limit = min(100, max(1, flask.request.args.get('limit', 50, type=int)))
+        return flask.jsonify({
+            "rules": [rule.Name for rule in alerts.Rules],
+            "active": alerts.Active(),
+            "recent": alerts.Recent(Limit=limit),
+            "dropped": alerts.Dropped()
+        })
+    except Exception as e:
+        return flask.jsonify({"error": str(e)}), 500
+
+# 内部接口（运行指标、性能分析）的鉴权：未设置令牌时只接受本机回环地址的请求
+INTERNAL_TOKEN = os.environ.get('SYSINFO_INTERNAL_TOKEN')
+LOOPBACK_ADDRESSES = ('127.0.0.1', '::1', '::ffff:127.0.0.1')
+# 单次性能分析的最长时间（秒），分析期间占用一个请求线程
+PROFILE_MAX_SECONDS = float(os.environ.get('SYSINFO_PROFILE_MAX_SECONDS', 60.0))
+
+def internal_unauthorized():
+    """检查内部接口的鉴权，返回错误响应或None"""
+    if INTERNAL_TOKEN:
+        supplied = flask.request.headers.get('Authorization', '')
+        if not hmac.compare_digest(supplied, f'Bearer {INTERNAL_TOKEN}'):
+            return flask.jsonify({"error": "未授权"}), 401
+    elif flask.request.remote_addr not in LOOPBACK_ADDRESSES:
+        return flask.jsonify({"error": "内部接口仅允许本机访问（或设置SYSINFO_INTERNAL_TOKEN）"}), 403
+    return None
+
+@app.route('/api/internal/stats')
+def internal_stats_info():
+    """运行指标：采集函数、采样周期和接口的延迟直方图、错误数、字节数，以及序列化统计"""
+    error = internal_unauthorized()
+    if error is not None:
+        return error
+    try:
+        data = instrument.Get()
+        data["serialization"] = serialization_stats.Get()
+        return flask.jsonify(data)
+    except Exception as e:
+        return flask.jsonify({"error": str(e)}), 500
+
+@app.route('/api/internal/profile')
+def profile_info():
+    """按需性能分析：?mode=sampling|cprofile&seconds=N，结束后以附件形式返回分析文件"""
+    error = internal_unauthorized()
+    if error is not None:
+        return error
+    try:
+        mode = flask.request.args.get('mode', 'sampling')
+        seconds = min(PROFILE_MAX_SECONDS, max(0.1, flask.request.args.get('seconds', 10.0, type=float)))
+        name, data, mimetype = instrument.Profile(Mode=mode, Seconds=seconds)
+        return flask.Response(data, mimetype=mimetype,
+                              headers={'Content-Disposition': f'attachment; filename={name}'})
+    except ValueError as e:
+        return flask.jsonify({"error": str(e)}), 400
+    except RuntimeError as e:
+        return flask.jsonify({"error": str(e)}), 409
+    except Exception as e:
+        return flask.jsonify({"error": str(e)}), 500
+
+@app.route('/api/stats/serialization')
+def serialization_stats_info():
+    """各接口的响应次数、序列化字节数和耗时"""
+    try:
+        return flask.jsonify({
+            "encoder": "orjson" if orjson is not None else "json",
+            "endpoints": serialization_stats.Get()
+        })
     except Exception as e:
         return flask.jsonify({"error": str(e)}), 500
 
@@ -483,14 +1403,21 @@ def health_check():
     return flask.jsonify({"status": "healthy", "timestamp": datetime.now().isoformat()})
 
 if __name__ == '__main__':
-    # 初始化网络监控
-    last_net_io = Network.GetNetworkIO(Pernic=False)
-    last_net_time = time.time()
-
-    # 初始化磁盘IO监控
-    last_disk_io = psutil.disk_io_counters(perdisk=False)
-    last_disk_time = time.time()
-    
+    parser = argparse.ArgumentParser(description="系统信息监控服务")
+    parser.add_argument('--host', default='0.0.0.0', help="监听地址")
+    parser.add_argument('--port', type=int, default=5000, help="监听端口")
+    parser.add_argument('--agent', metavar='URL', help="以无界面agent模式运行，向指定的aggregator上报")
+    parser.add_argument('--name', help="agent上报使用的主机名（默认为本机主机名）")
+    parser.add_argument('--aggregator', action='store_true', help="启用聚合模式，接收agent上报")
+    args = parser.parse_args()
+
+    if args.agent:
+        run_agent(args.agent, host=args.name)
+        raise SystemExit(0)
+    if args.aggregator:
+        from PySystemInfo.Fleet import Aggregator
+        aggregator = Aggregator(Capacity=int(float(os.environ.get('SYSINFO_FLEET_HISTORY_SECONDS', 900))))
+
     '''print("系统信息监控服务启动中...")
     print("访问地址: http://localhost:5000")
     print("API文档:")
@@ -503,4 +1430,7 @@ if __name__ == '__main__':
     print("  - 系统信息: http://localhost:5000/api/system")
     print("  - 健康检查: http://localhost:5000/health")
     '''
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    # debug模式下重载器的父进程只负责监视文件，后台组件在实际服务的子进程（WERKZEUG_RUN_MAIN）中启动
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_background()
+    app.run(debug=True, host=args.host, port=args.port)
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+性能基准测试脚本
+
+测量各采集函数的耗时、接口在并发客户端下的吞吐量和延迟分位数，
+以及大型主机（大量分区、网卡、连接、进程）下的序列化开销。
+结果以JSON保存，可用 --compare 与之前的结果对比。
+
+用法:
+    python benchmark.py --output bench.json
+    python benchmark.py --clients 16 --requests 200 --compare bench.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+
+# 添加当前目录到Python路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import app
+from PySystemInfo import Network
+from PySystemInfo.Backend import BACKENDS, GetBackend, DiskIO, NicIO
+from PySystemInfo.History import History, FlattenSnapshot
+from PySystemInfo.Process import ProcessTable
+from PySystemInfo.Rate import DeviceRates, DiskMetrics, NicMetrics
+from PySystemInfo.Serialize import Dumps
+
+COLLECTORS = ('get_cpu_info', 'get_memory_info', 'get_disk_info',
+              'get_network_info', 'get_system_info', 'get_gpu_info', 'get_process_info')
+
+ENDPOINTS = ('/api/system-info', '/api/cpu', '/api/processes',
+             '/api/cpu/detailed', '/api/memory/detailed', '/api/disk/detailed',
+             '/api/network/detailed', '/api/gpu/detailed', '/api/system/detailed')
+
+
+def percentile(values, fraction):
+    """计算分位数（values需已排序）"""
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, int(round(fraction * (len(values) - 1))))
+    return values[index]
+
+
+def summarize(samples):
+    """将耗时样本（秒）汇总为毫秒统计"""
+    samples = sorted(samples)
+    return {
+        "count": len(samples),
+        "mean_ms": sum(samples) / len(samples) * 1000 if samples else 0.0,
+        "p50_ms": percentile(samples, 0.50) * 1000,
+        "p99_ms": percentile(samples, 0.99) * 1000,
+        "max_ms": samples[-1] * 1000 if samples else 0.0,
+    }
+
+
+def measure(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def bench_collectors(repeat):
+    """测量每个采集函数的耗时"""
+    results = {}
+    for name in COLLECTORS:
+        func = getattr(app, name)
+        func()  # 预热（建立速率基线、进程缓存等）
+        results[name] = measure(func, repeat)
+    return results
+
+
+def bench_backends(repeat):
+    """测量各计数器后端完成一次完整主机采样的耗时"""
+    results = {}
+    for name in BACKENDS:
+        try:
+            backend = GetBackend(name)
+        except OSError as e:
+            print(f"  跳过后端 {name}: {e}")
+            continue
+        backend.Sample()
+        results[f"{name}_sample"] = measure(backend.Sample, repeat * 50)
+        backend.Close()
+    return results
+
+
+def bench_endpoints(clients, requests):
+    """测量接口在并发客户端下的吞吐量和延迟"""
+    app.get_snapshot()
+    results = {}
+    for endpoint in ENDPOINTS:
+        samples = []
+        errors = []
+        lock = threading.Lock()
+
+        def worker():
+            client = app.app.test_client()
+            local = []
+            for _ in range(requests):
+                start = time.perf_counter()
+                response = client.get(endpoint)
+                local.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    with lock:
+                        errors.append(response.status_code)
+            with lock:
+                samples.extend(local)
+
+        threads = [threading.Thread(target=worker) for _ in range(clients)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        result = summarize(samples)
+        result["throughput_rps"] = len(samples) / elapsed if elapsed > 0 else 0.0
+        result["errors"] = len(errors)
+        results[endpoint] = result
+    return results
+
+
+def synthetic_device_tables(partitions, nics):
+    """用与应用相同的DeviceRates/DiskMetrics/NicMetrics生成按设备的列式速率表"""
+    disk_tracker, nic_tracker = DeviceRates(), DeviceRates()
+    for now, step in ((0.0, 0), (1.0, 100)):
+        disks = disk_tracker.Update({f"sd{i}": DiskIO(*[i * 10 + step] * 9) for i in range(partitions)}, Now=now)
+        interfaces = nic_tracker.Update({f"veth{i}": NicIO(*[i * 1000 + step] * 8) for i in range(nics)}, Now=now)
+    return DiskMetrics(disks), NicMetrics(interfaces)
+
+
+def synthetic_snapshot(partitions, nics):
+    """构造大型主机的快照（大量分区和网卡），各节的结构与应用实际产生的快照一致"""
+    devices, interfaces = synthetic_device_tables(partitions, nics)
+    return {
+        "cpu": {"usage": 42.0, "frequency": 2400.0, "cores": 128, "temperature": 55.0},
+        "memory": {"usage": 63.2, "used": 1 << 38, "available": 1 << 37, "total": 1 << 39},
+        "disk": {
+            "partitions": [{
+                "device": f"/dev/sd{i}",
+                "mountpoint": f"/mnt/volume{i}",
+                "usage": 50.0,
+                "used": 1 << 40,
+                "free": 1 << 40,
+                "total": 1 << 41
+            } for i in range(partitions)],
+            "unavailable": [],
+            "io": {"read_speed": 1e6, "write_speed": 2e6, "read_iops": 100.0, "write_iops": 200.0},
+            "devices": devices
+        },
+        "network": {
+            "upload": 1e6, "download": 2e6, "packets_sent": 1e3, "packets_recv": 2e3,
+            "connections": 100000, "tcp_states": {"ESTABLISHED": 90000, "TIME_WAIT": 10000},
+            "interfaces": interfaces
+        },
+        "system": {"boot_time": 1.7e9, "uptime": 86400.0, "processes": 10000},
+        "gpu": {"gpus": []},
+        "timestamp": time.time()
+    }
+
+
+def write_fake_proc(directory, sockets):
+    """构造包含大量套接字的伪 /proc/net 目录"""
+    net_dir = os.path.join(directory, 'net')
+    os.makedirs(net_dir, exist_ok=True)
+    header = "  sl  local_address rem_address   st tx_queue rx_queue tr tm->when retrnsmt   uid  timeout inode\n"
+    states = ('01', '06', '0A', '08')
+    with open(os.path.join(net_dir, 'tcp'), 'w') as f:
+        f.write(header)
+        for i in range(sockets):
+            f.write(f"{i:6d}: 0100007F:{i % 65536:04X} 0100007F:0050 {states[i % len(states)]} "
+                    f"00000000:00000000 00:00000000 00000000  1000        0 {i} 1 0000000000000000 20 4 30 10 -1\n")
+    for name in ('tcp6', 'udp', 'udp6'):
+        with open(os.path.join(net_dir, name), 'w') as f:
+            f.write(header)
+    with open(os.path.join(net_dir, 'unix'), 'w') as f:
+        f.write("Num       RefCount Protocol Flags    Type St Inode Path\n")
+        for i in range(sockets // 10):
+            f.write(f"{i:016x}: 00000002 00000000 00010000 0001 01 {i}\n")
+
+
+def bench_large_host(repeat, partitions, nics, sockets, processes):
+    """测量大型主机下的序列化和统计开销"""
+    results = {}
+    snapshot = synthetic_snapshot(partitions, nics)
+
+    payload = {}
+
+    def encode():
+        payload["bytes"] = len(json.dumps(snapshot, separators=(',', ':')))
+
+    results["json_snapshot"] = measure(encode, repeat)
+    results["json_snapshot"]["bytes"] = payload["bytes"]
+
+    results["serialize_snapshot"] = measure(lambda: Dumps(snapshot), repeat)
+
+    with app.app.app_context():
+        results["flask_jsonify_snapshot"] = measure(lambda: app.flask.jsonify(snapshot), repeat)
+
+    results["flatten_snapshot"] = measure(lambda: FlattenSnapshot(snapshot), repeat)
+
+    history = History(Capacity=3600)
+    values = FlattenSnapshot(snapshot)
+    results["history_record"] = measure(lambda: history.Record(time.time(), values), repeat)
+    for i in range(3600):
+        history.Record(i, values)
+    results["history_query_step60"] = measure(lambda: history.Query('cpu.usage', Step=60), repeat)
+
+    with tempfile.TemporaryDirectory() as directory:
+        write_fake_proc(directory, sockets)
+        results["connection_stats"] = measure(lambda: Network.GetConnectionStats(ProcRoot=directory), repeat)
+
+    # 每设备速率：交替喂入两组计数器，每次都对所有设备做一次完整的差分
+    disks = [{f"disk{i}": DiskIO(*[i * 10 + step] * 9) for i in range(partitions)} for step in (0, 100)]
+    interfaces = [{f"nic{i}": NicIO(*[i * 10 + step] * 8) for i in range(nics)} for step in (0, 100)]
+    disk_tracker, nic_tracker = DeviceRates(), DeviceRates()
+    disk_tracker.Update(disks[1], Now=0.0)
+    nic_tracker.Update(interfaces[1], Now=0.0)
+    clock = [0.0]
+
+    def device_rates():
+        clock[0] += 1.0
+        step = int(clock[0]) % 2
+        DiskMetrics(disk_tracker.Update(disks[step], Now=clock[0]))
+        NicMetrics(nic_tracker.Update(interfaces[step], Now=clock[0]))
+
+    results["device_rates"] = measure(device_rates, repeat)
+
+    table = ProcessTable()
+    table._records = [(pid, f"proc{pid}", float(pid % 100), pid * 4096, float(pid % 7))
+                      for pid in range(processes)]
+    results["process_top20"] = measure(lambda: table.Top(Sort='cpu', Limit=20), repeat)
+    return results
+
+
+def compare(current, baseline, threshold):
+    """对比两次结果，输出p50变慢超过阈值的项目"""
+    regressions = []
+    for section, entries in current.items():
+        if not isinstance(entries, dict) or section not in baseline:
+            continue
+        for name, stats in entries.items():
+            old = baseline[section].get(name)
+            if not isinstance(stats, dict) or not isinstance(old, dict) or not old.get("p50_ms"):
+                continue
+            ratio = stats["p50_ms"] / old["p50_ms"]
+            if ratio > 1 + threshold:
+                regressions.append((section, name, old["p50_ms"], stats["p50_ms"], ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SystemInfoView 性能基准测试")
+    parser.add_argument('--repeat', type=int, default=20, help="每项测量的重复次数")
+    parser.add_argument('--clients', type=int, default=8, help="并发客户端数量")
+    parser.add_argument('--requests', type=int, default=50, help="每个客户端的请求次数")
+    parser.add_argument('--partitions', type=int, default=200, help="合成主机的分区数量")
+    parser.add_argument('--nics', type=int, default=500, help="合成主机的网卡数量")
+    parser.add_argument('--sockets', type=int, default=100000, help="合成主机的套接字数量")
+    parser.add_argument('--processes', type=int, default=10000, help="合成主机的进程数量")
+    parser.add_argument('--skip', action='append', default=[], choices=('collectors', 'endpoints', 'large_host'),
+                        help="跳过某组测试（可重复）")
+    parser.add_argument('--output', help="结果JSON的保存路径")
+    parser.add_argument('--compare', help="与之前保存的结果JSON对比")
+    parser.add_argument('--threshold', type=float, default=0.2, help="判定为性能退化的p50增幅")
+    args = parser.parse_args()
+
+    results = {
+        "meta": {
+            "timestamp": time.time(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": vars(args),
+        }
+    }
+    if 'collectors' not in args.skip:
+        print("测量采集函数...")
+        results["collectors"] = bench_collectors(args.repeat)
+        results["backends"] = bench_backends(args.repeat)
+    if 'endpoints' not in args.skip:
+        print(f"测量接口（{args.clients} 个并发客户端）...")
+        results["endpoints"] = bench_endpoints(args.clients, args.requests)
+    if 'large_host' not in args.skip:
+        print("测量大型主机序列化开销...")
+        results["large_host"] = bench_large_host(args.repeat, args.partitions, args.nics,
+                                                 args.sockets, args.processes)
+
+    for section, entries in results.items():
+        if section == "meta":
+            continue
+        print(f"\n[{section}]")
+        for name, stats in entries.items():
+            extra = f"  {stats['throughput_rps']:.0f} req/s" if "throughput_rps" in stats else ""
+            print(f"  {name:40s} p50 {stats['p50_ms']:9.3f} ms  p99 {stats['p99_ms']:9.3f} ms{extra}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n结果已保存到 {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print("\n性能退化:")
+            for section, name, old, new, ratio in regressions:
+                print(f"  {section}/{name}: {old:.3f} ms -> {new:.3f} ms (x{ratio:.2f})")
+            sys.exit(1)
+        print("\n未发现性能退化")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from PySystemInfo.Alert import (AlertEngine, EWMARule, FIRING, LoadRules, P2Quantile, ParseRule, RESOLVED,
+                                ThresholdRule, WebhookNotifier)
+
+
+def test_ewma_fires_on_spike_after_warmup():
+    rule = EWMARule('spike', 'network.download', Alpha=0.1, Sigma=4, Warmup=30)
+    state = rule.NewState()
+    random.seed(1)
+    for second in range(100):
+        firing, _ = rule.Evaluate(state, float(second), 1000.0 + random.uniform(-10, 10))
+        assert not firing
+    firing, detail = rule.Evaluate(state, 100.0, 5000.0)
+    assert firing and 'baseline' in detail
+
+
+def test_ewma_waits_for_warmup():
+    rule = EWMARule('spike', 'network.download', Warmup=30)
+    state = rule.NewState()
+    for second in range(10):
+        rule.Evaluate(state, float(second), 1.0 + second % 2)
+    assert rule.Evaluate(state, 10.0, 1000.0)[0] is False
+
+
+def test_p2_quantile_estimate():
+    random.seed(2)
+    estimator = P2Quantile(0.9)
+    values = [random.uniform(0, 1000) for _ in range(20000)]
+    for value in values:
+        estimator.Add(value)
+    exact = sorted(values)[int(0.9 * len(values))]
+    assert abs(estimator.Value() - exact) < 20
+    with pytest.raises(ValueError):
+        P2Quantile(1.5)
+
+
+def test_cooldown_suppresses_flapping():
+    engine = AlertEngine([ThresholdRule('cpu-high', 'cpu.usage', '>', 90)], Cooldown=60)
+    for second, value in enumerate([95, 50, 95, 50, 95]):
+        engine.Evaluate(float(second), {"cpu.usage": value})
+    assert [event["state"] for event in engine.Recent()] == [RESOLVED, FIRING]
+    # 冷却期结束后可以再次通知
+    engine.Evaluate(70.0, {"cpu.usage": 50})
+    engine.Evaluate(71.0, {"cpu.usage": 95})
+    assert [event["state"] for event in engine.Recent()] == [FIRING, RESOLVED, FIRING]
+    assert engine.Active()[0]["rule"] == 'cpu-high'
+
+
+def test_invalid_rules_are_reported_by_name(tmp_path):
+    with pytest.raises(ValueError, match="'disk-full'.*value"):
+        ParseRule({"name": "disk-full", "metric": "disk.*"})
+    with pytest.raises(ValueError, match="Unknown operator"):
+        ParseRule({"name": "bad-op", "metric": "cpu.usage", "op": "!", "value": 1})
+    path = tmp_path / 'rules.json'
+    path.write_text(json.dumps([
+        {"name": "ok", "metric": "cpu.usage", "value": 90},
+        {"name": "missing-metric", "value": 90},
+        "not a rule",
+    ]))
+    assert [rule.Name for rule in LoadRules(str(path))] == ["ok"]
+    path.write_text('{"name": "ok"}')
+    with pytest.raises(ValueError):
+        LoadRules(str(path))
+
+
+class _Stub(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        server = self.server
+        server.attempts += 1
+        status = 500 if server.attempts <= server.failures else 200
+        if status == 200:
+            server.received.append(json.loads(body))
+        self.send_response(status)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def webhook():
+    server = HTTPServer(('127.0.0.1', 0), _Stub)
+    server.received = []
+    server.attempts = 0
+    server.failures = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_webhook_delivery_with_retry(webhook):
+    webhook.failures = 1
+    notifier = WebhookNotifier(f"http://127.0.0.1:{webhook.server_port}/hook")
+    engine = AlertEngine([ThresholdRule('disk-full', 'disk.partitions.*.usage', '>', 95)], [notifier])
+    engine.Start()
+    engine.Evaluate(1.0, {"disk.partitions./data.usage": 97.0, "disk.partitions./.usage": 10.0})
+    # 第一次投递失败，1秒退避后重试
+    deadline = time.monotonic() + 10
+    while not webhook.received and time.monotonic() < deadline:
+        time.sleep(0.05)
+    engine.Stop()
+    assert webhook.attempts == 2
+    assert [(event["rule"], event["metric"], event["state"]) for event in webhook.received] == \
+        [("disk-full", "disk.partitions./data.usage", FIRING)]
+    assert engine.Dropped() == 0
@@ -0,0 +1,25 @@
+import math
+
+from PySystemInfo.Archive import Segment
+
+
+def test_reopen_truncates_partial_record(tmp_path):
+    path = str(tmp_path / '0.seg')
+    segment = Segment(path, ['cpu.usage', 'memory.usage'])
+    for second in range(5):
+        segment.Append(float(second), [second * 10.0, 50.0])
+    segment.Close()
+    # 模拟写到一半时崩溃
+    with open(path, 'ab') as f:
+        f.write(b'\x01\x02\x03\x04\x05')
+
+    reopened = Segment(path)
+    for second in range(5, 8):
+        reopened.Append(float(second), [second * 10.0, 50.0])
+    reopened.Close()
+
+    rows = Segment(path).Read(['cpu.usage', 'memory.usage'], 0.0, math.inf)
+    assert [t for t, _ in rows] == [float(second) for second in range(8)]
+    assert [values for _, values in rows] == [[second * 10.0, 50.0] for second in range(8)]
+    # 时间戳二分查找仍然正确
+    assert [t for t, _ in Segment(path).Read(['cpu.usage'], 5.5, 6.5)] == [6.0]
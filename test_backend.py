@@ -0,0 +1,99 @@
+import os
+
+import pytest
+
+from PySystemInfo import Backend
+from PySystemInfo.Backend import ProcFile, ProcfsBackend
+
+DISKS = 400
+NICS = 300
+
+
+def write_proc(root):
+    files = {
+        'stat': "cpu  100 0 50 1000 10 0 5 0 0 0\ncpu0 100 0 50 1000 10 0 5 0 0 0\n"
+                "intr 1234 0 0\nctxt 5678\nsoftirq 90 0 0\n",
+        'meminfo': "MemTotal: 1000 kB\nMemFree: 200 kB\nMemAvailable: 600 kB\nSwapTotal: 100 kB\nSwapFree: 40 kB\n",
+        # pswpin/pswpout 在 vmstat 的后部，超过一页才能读到
+        'vmstat': ''.join(f"nr_padding_{i} {i}\n" for i in range(500)) + "pswpin 3\npswpout 7\n",
+        'diskstats': ''.join(f"   8 {i} sd{i} {i} 1 2 3 4 5 6 7 0 {i * 10} 11 0 0 0 0\n" for i in range(DISKS)),
+        'net/dev': "Inter-|   Receive\n face |bytes    packets\n" +
+                   ''.join(f"  eth{i}: {i} 1 2 3 0 0 0 0 {i * 2} 4 5 6 0 0 0 0\n" for i in range(NICS)),
+    }
+    for name, text in files.items():
+        path = os.path.join(root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(text)
+    return files
+
+
+def short_preadv(monkeypatch, limit=4096):
+    # 模拟seq_file：每次调用最多返回一页
+    preadv = os.preadv
+
+    def read(fd, buffers, offset):
+        return preadv(fd, [memoryview(buffers[0])[:limit]], offset)
+
+    monkeypatch.setattr(Backend.os, 'preadv', read)
+
+
+def test_procfile_reads_to_eof(tmp_path, monkeypatch):
+    path = tmp_path / 'big'
+    data = os.urandom(50000)
+    path.write_bytes(data)
+    short_preadv(monkeypatch)
+    proc_file = ProcFile(str(path), Size=1024)
+    assert proc_file.Read() == data
+    # 再次读取复用已扩大的缓冲区，内容缩短后不残留旧数据
+    path.write_bytes(data[:100])
+    assert proc_file.Read() == data[:100]
+    proc_file.Close()
+
+
+@pytest.mark.skipif(not os.path.exists('/proc/self/maps'), reason="needs procfs")
+def test_procfile_real_seq_file():
+    proc_file = ProcFile('/proc/self/maps', Size=512)
+    data = proc_file.Read()
+    proc_file.Close()
+    with open('/proc/self/maps', 'rb') as f:
+        assert len(data) == len(f.read())
+
+
+def test_procfs_backend_many_devices(tmp_path, monkeypatch):
+    write_proc(str(tmp_path))
+    short_preadv(monkeypatch)
+    backend = ProcfsBackend(Root=str(tmp_path), SysRoot=str(tmp_path / 'sys'))
+    sample = backend.Sample()
+    backend.Close()
+    assert len(sample.disks) == DISKS
+    assert sample.disks[f"sd{DISKS - 1}"].busy_time == (DISKS - 1) * 10
+    assert len(sample.nics) == NICS
+    assert sample.nics[f"eth{NICS - 1}"].bytes_sent == (NICS - 1) * 2
+    assert sample.swap.sin == 3 * Backend.SWAP_PAGE_SIZE
+    assert sample.swap.sout == 7 * Backend.SWAP_PAGE_SIZE
+    assert sample.cpu_stats.ctx_switches == 5678
+
+
+def test_device_rates_many_devices(tmp_path, monkeypatch):
+    from PySystemInfo.Rate import DeviceRates, DiskMetrics, NicMetrics
+
+    write_proc(str(tmp_path))
+    short_preadv(monkeypatch)
+    backend = ProcfsBackend(Root=str(tmp_path), SysRoot=str(tmp_path / 'sys'))
+    disk_rates, nic_rates = DeviceRates(), DeviceRates()
+    first = backend.Sample()
+    disk_rates.Update(first.disks, 0.0)
+    nic_rates.Update(first.nics, 0.0)
+    # 每个磁盘多读了2个扇区
+    with open(tmp_path / 'diskstats', 'w') as f:
+        f.write(''.join(f"   8 {i} sd{i} {i} 1 4 3 4 5 6 7 0 {i * 10} 11 0 0 0 0\n" for i in range(DISKS)))
+    second = backend.Sample()
+    backend.Close()
+    disks = DiskMetrics(disk_rates.Update(second.disks, 1.0))
+    nics = NicMetrics(nic_rates.Update(second.nics, 1.0))
+    assert len(disks["disk"]) == DISKS
+    assert len(nics["interface"]) == NICS
+    assert disks["disk"][-1] == f"sd{DISKS - 1}"
+    assert disks["read_bytes_per_sec"][-1] == 2 * Backend.SECTOR_SIZE
+    assert nics["interface"][-1] == f"eth{NICS - 1}"
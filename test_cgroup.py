@@ -0,0 +1,109 @@
+import shutil
+
+from PySystemInfo.Cgroup import CgroupMonitor, CurrentCgroup
+
+
+def write_group(directory, usage=0, periods=0, throttled=0, cpu_max='max 100000', memory=1024, memory_max='max',
+                rbytes=0, pids=1):
+    directory.mkdir(parents=True, exist_ok=True)
+    files = {
+        'cpu.stat': f"usage_usec {usage}\nuser_usec {usage // 2}\nsystem_usec {usage // 2}\n"
+                    f"nr_periods {periods}\nnr_throttled {throttled}\nthrottled_usec {throttled * 1000}\n",
+        'cpu.max': f"{cpu_max}\n",
+        'memory.current': f"{memory}\n",
+        'memory.max': f"{memory_max}\n",
+        'io.stat': f"8:0 rbytes={rbytes} wbytes=0 rios=0 wios=0 dbytes=0 dios=0\n",
+        'pids.current': f"{pids}\n",
+    }
+    for name, text in files.items():
+        (directory / name).write_text(text)
+
+
+def fake_cgroupfs(tmp_path):
+    root = tmp_path / 'cgroup'
+    root.mkdir()
+    (root / 'cgroup.controllers').write_text("cpu io memory pids\n")
+    proc = tmp_path / 'proc'
+    (proc / 'self').mkdir(parents=True)
+    (proc / 'self' / 'cgroup').write_text("0::/app.slice\n")
+    return root, proc
+
+
+def rows(table):
+    return {path: {name: values[index] for name, values in table.items()}
+            for index, path in enumerate(table["path"])}
+
+
+def test_current_cgroup(tmp_path):
+    _, proc = fake_cgroupfs(tmp_path)
+    assert CurrentCgroup(str(proc)) == '/app.slice'
+    assert CurrentCgroup(str(tmp_path / 'missing')) is None
+
+
+def test_rates_throttling_and_limits(tmp_path):
+    root, proc = fake_cgroupfs(tmp_path)
+    group = root / 'app.slice'
+    write_group(group, usage=1000000, periods=100, throttled=10, cpu_max='200000 100000',
+                memory=512, memory_max='2048', rbytes=0)
+    monitor = CgroupMonitor(Root=str(root), ProcRoot=str(proc))
+    assert CgroupMonitor.Available(str(root))
+    assert monitor.Path == '/app.slice'
+    first = rows(monitor.Sample(Now=10.0))['/app.slice']
+    # 第一次采样没有可以差分的基线
+    assert first["cpu_cores"] is None and first["throttled_percent"] is None
+    assert first["cpu_limit"] == 2.0 and first["memory_percent"] == 25.0
+
+    write_group(group, usage=1500000, periods=200, throttled=35, cpu_max='200000 100000',
+                memory=512, memory_max='2048', rbytes=4096)
+    second = rows(monitor.Sample(Now=11.0))['/app.slice']
+    assert second["cpu_cores"] == 0.5
+    assert second["cpu_limit_percent"] == 25.0
+    assert second["throttled_percent"] == 25.0
+    assert second["throttled_seconds"] == 0.025
+    assert second["io_read_bytes_per_sec"] == 4096
+    assert monitor.Limits() == {"cpus": 2.0, "memory": 2048}
+    monitor.Close()
+
+
+def test_max_limits_are_none(tmp_path):
+    root, proc = fake_cgroupfs(tmp_path)
+    write_group(root / 'app.slice', cpu_max='max 100000', memory_max='max')
+    monitor = CgroupMonitor(Root=str(root), ProcRoot=str(proc))
+    row = rows(monitor.Sample(Now=1.0))['/app.slice']
+    assert row["cpu_limit"] is None and row["cpu_limit_percent"] is None
+    assert row["memory_max"] is None and row["memory_percent"] is None
+    assert monitor.Limits() == {"cpus": None, "memory": None}
+    monitor.Close()
+
+
+def test_children_are_discovered_and_removed(tmp_path):
+    root, proc = fake_cgroupfs(tmp_path)
+    write_group(root / 'app.slice')
+    monitor = CgroupMonitor(Root=str(root), ProcRoot=str(proc))
+    assert monitor.Sample(Now=1.0)["path"] == ['/app.slice']
+
+    write_group(root / 'app.slice' / 'worker-1', usage=100)
+    write_group(root / 'app.slice' / 'worker-1' / 'task', usage=100)
+    assert monitor.Sample(Now=2.0)["path"] == ['/app.slice', '/app.slice/worker-1', '/app.slice/worker-1/task']
+
+    shutil.rmtree(root / 'app.slice' / 'worker-1')
+    assert monitor.Sample(Now=3.0)["path"] == ['/app.slice']
+    assert monitor._handles == 6
+    monitor.Close()
+
+
+def test_handle_cap_falls_back_to_opening_files(tmp_path):
+    root, proc = fake_cgroupfs(tmp_path)
+    group = root / 'app.slice'
+    write_group(group, usage=0, pids=3)
+    write_group(group / 'child', usage=0, pids=4)
+    monitor = CgroupMonitor(Root=str(root), ProcRoot=str(proc), MaxHandles=2)
+    monitor.Sample(Now=1.0)
+    assert monitor._handles == 2
+    write_group(group, usage=2000000, pids=3)
+    write_group(group / 'child', usage=1000000, pids=4)
+    table = rows(monitor.Sample(Now=2.0))
+    assert table['/app.slice']["cpu_cores"] == 2.0 and table['/app.slice']["pids"] == 3
+    assert table['/app.slice/child']["cpu_cores"] == 1.0 and table['/app.slice/child']["pids"] == 4
+    monitor.Close()
+    assert monitor._handles == 0
@@ -0,0 +1,91 @@
+import threading
+import time
+
+from PySystemInfo import Disk
+from PySystemInfo.Refresh import RefreshPolicy, SLOW
+
+
+def test_hung_mounts_do_not_starve_healthy_ones(monkeypatch):
+    release = threading.Event()
+
+    def usage(path):
+        if path.startswith('/hung'):
+            release.wait()
+        return path
+
+    monkeypatch.setattr(Disk, '_disk_usage', usage)
+    hung = [f"/hung{i}" for i in range(20)]
+    try:
+        results = Disk.GetDiskUsages(hung + ['/ok'], 0.2)
+        assert results['/ok'] == '/ok'
+        assert all(isinstance(results[path], TimeoutError) for path in hung)
+
+        threads = threading.active_count()
+        started = time.monotonic()
+        results = Disk.GetDiskUsages(hung + ['/ok2'], 0.2)
+        # 仍在进行中的挂载点直接判定为不可用，不再等待也不再提交
+        assert time.monotonic() - started < 0.2
+        assert results['/ok2'] == '/ok2'
+        assert all(isinstance(results[path], TimeoutError) for path in hung)
+        assert threading.active_count() <= threads + 1
+    finally:
+        release.set()
+    deadline = time.monotonic() + 5
+    while Disk._usage_pending and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert Disk.GetDiskUsages(['/hung0'], 1.0)['/hung0'] == '/hung0'
+
+
+def test_concurrent_misses_call_once():
+    calls = []
+    gate = threading.Event()
+
+    def read():
+        calls.append(1)
+        gate.wait()
+        return len(calls)
+
+    policy = RefreshPolicy(Tiers={'slow.family': SLOW})
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(policy.Get('slow.family', read))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+    gate.set()
+    for thread in threads:
+        thread.join()
+    assert calls == [1]
+    assert results == [1] * 8
+
+
+def test_failed_read_is_shared_and_not_cached():
+    policy = RefreshPolicy(Tiers={'slow.family': SLOW})
+
+    def fail():
+        raise OSError("unavailable")
+
+    for _ in range(2):
+        try:
+            policy.Get('slow.family', fail)
+        except OSError:
+            pass
+        else:
+            raise AssertionError("expected OSError")
+    assert policy.Get('slow.family', lambda: 5) == 5
+
+
+def test_usages_are_cached_per_mountpoint():
+    calls = []
+
+    def usages(paths, timeout):
+        calls.append(list(paths))
+        return {path: TimeoutError(path) if path == '/hung' else path.upper() for path in paths}
+
+    policy = RefreshPolicy()
+    assert policy.GetMany('disk.usage', usages, ['/a', '/b'], 1.0) == {'/a': '/A', '/b': '/B'}
+    # 不同的挂载点组合复用同一份缓存，只读取未缓存的挂载点
+    results = policy.GetMany('disk.usage', usages, ['/b', '/hung', '/a'], 1.0)
+    assert results['/a'] == '/A' and isinstance(results['/hung'], TimeoutError)
+    policy.GetMany('disk.usage', usages, ['/hung'], 1.0)
+    assert calls == [['/a', '/b'], ['/hung'], ['/hung']]
+    assert sorted(policy._cache) == [('disk.usage', ('/a',)), ('disk.usage', ('/b',))]
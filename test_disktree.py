@@ -0,0 +1,38 @@
+import os
+
+from PySystemInfo.DiskTree import UsageTree
+
+
+def test_full_scan_sees_files_growing_in_place(tmp_path):
+    logs = tmp_path / 'logs'
+    logs.mkdir()
+    (logs / 'app.log').write_bytes(b'x' * 4096)
+    tree = UsageTree(str(tmp_path))
+    stats = tree.Scan()
+    # 没有索引时的首次扫描就是完整扫描
+    assert stats["full"] and tree.FullScannedAt == tree.ScannedAt
+    before = tree.Tree(Depth=0, Path=str(logs))["bytes"]
+
+    mtime = os.stat(logs).st_mtime_ns
+    with open(logs / 'app.log', 'ab') as f:
+        f.write(os.urandom(5 * 1024 * 1024))
+    assert os.stat(logs).st_mtime_ns == mtime
+
+    stats = tree.Scan()
+    assert not stats["full"] and "note" in stats
+    assert tree.Tree(Depth=0, Path=str(logs))["bytes"] == before
+
+    full_before = tree.FullScannedAt
+    stats = tree.Scan(Full=True)
+    assert stats["full"] and "note" not in stats
+    assert tree.FullScannedAt >= full_before
+    assert tree.Tree(Depth=0, Path=str(logs))["bytes"] >= before + 5 * 1024 * 1024
+
+
+def test_full_scan_time_is_persisted(tmp_path):
+    root = tmp_path / 'root'
+    root.mkdir()
+    index = str(tmp_path / 'index')
+    tree = UsageTree(str(root), IndexPath=index)
+    tree.Scan()
+    assert UsageTree(str(root), IndexPath=index).FullScannedAt == tree.FullScannedAt
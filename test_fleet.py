@@ -0,0 +1,86 @@
+import threading
+import zlib
+
+import pytest
+from werkzeug.serving import make_server
+
+import app
+from PySystemInfo.Fleet import Agent, Aggregator, DecodeBatch, EncodeBatch
+
+
+@pytest.fixture
+def aggregator(monkeypatch):
+    aggregator = Aggregator(Capacity=100, Retention=60)
+    monkeypatch.setattr(app, 'aggregator', aggregator)
+    monkeypatch.setattr(app, 'FLEET_TOKEN', 'secret')
+    return aggregator
+
+
+def post(client, data, token='secret'):
+    return client.post('/api/fleet/ingest', data=data, headers={'Authorization': f'Bearer {token}'})
+
+
+def test_encode_decode_round_trip():
+    samples = [(1.0, {"cpu.usage": 10.0}), (2.0, {"cpu.usage": 20.0, "memory.usage": 50.0})]
+    host, decoded = DecodeBatch(EncodeBatch("web-1", samples))
+    assert host == "web-1"
+    assert decoded == samples
+
+
+def test_ingest_round_trip(aggregator):
+    client = app.app.test_client()
+    batch = EncodeBatch("web-1", [(1.0, {"cpu.usage": 10.0}), (2.0, {"cpu.usage": 30.0, "memory.usage": 40.0})])
+    response = post(client, batch)
+    assert response.status_code == 200 and response.get_json() == {"accepted": 2}
+    hosts = client.get('/api/fleet/hosts', headers={'Authorization': 'Bearer secret'}).get_json()["hosts"]
+    assert hosts == [{"host": "web-1", "last_seen": 2.0, "cpu": 30.0, "memory": 40.0}]
+    assert post(client, batch, token='wrong').status_code == 401
+
+
+def test_corrupt_bodies_are_rejected(aggregator):
+    client = app.app.test_client()
+    for body in (b'not deflate at all', zlib.compress(b'{not json'), zlib.compress(b'{"host": "a"}')):
+        response = post(client, body)
+        assert response.status_code == 400, body
+    assert aggregator.Hosts() == []
+
+
+def test_partial_samples_keep_disk_values(aggregator):
+    prefix = 'disk.partitions./data.usage'
+    batch = EncodeBatch("db-1", [(1.0, {prefix: 95.0, "cpu.usage": 5.0}), (2.0, {"cpu.usage": 6.0})])
+    aggregator.Ingest(batch, Now=1000.0)
+    assert aggregator.DisksOver(90.0, Now=1000.0) == [{"host": "db-1", "mountpoint": "/data", "usage": 95.0}]
+    # 后续批次没有磁盘指标，也不会清空已有的值
+    aggregator.Ingest(EncodeBatch("db-1", [(3.0, {"cpu.usage": 7.0})]), Now=1001.0)
+    assert aggregator.DisksOver(90.0, Now=1001.0)[0]["usage"] == 95.0
+    assert aggregator.Top('cpu.usage', Now=1001.0) == [{"host": "db-1", "value": 7.0}]
+
+
+def test_stale_hosts_and_metrics_expire(aggregator):
+    aggregator.Ingest(EncodeBatch("old", [(1.0, {"cpu.usage": 99.0, "disk.partitions./.usage": 99.0})]), Now=1000.0)
+    aggregator.Ingest(EncodeBatch("new", [(1.0, {"cpu.usage": 1.0})]), Now=1030.0)
+    assert [item["host"] for item in aggregator.Top('cpu.usage', Now=1030.0)] == ["old", "new"]
+    assert [item["host"] for item in aggregator.Top('cpu.usage', Now=1070.0)] == ["new"]
+    assert aggregator.DisksOver(90.0, Now=1070.0) == []
+    assert [item["host"] for item in aggregator.Hosts(Now=1070.0)] == ["new"]
+    # 下一次清理时彻底移除
+    aggregator.Ingest(EncodeBatch("new", [(2.0, {"cpu.usage": 2.0})]), Now=1070.0)
+    assert aggregator.Query("old", "cpu.usage") is None
+
+
+def test_agent_over_loopback(aggregator):
+    server = make_server('127.0.0.1', 0, app.app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        agent = Agent(f"http://127.0.0.1:{server.server_port}", Host="edge-1", BatchSize=2,
+                      FlushInterval=0.2, Token='secret')
+        agent.Start()
+        for second in range(5):
+            agent.Add(float(second), {"cpu.usage": float(second * 10)})
+        agent.Stop()
+    finally:
+        server.shutdown()
+    hosts = aggregator.Hosts()
+    assert hosts[0]["host"] == "edge-1" and hosts[0]["last_seen"] == 4.0 and hosts[0]["cpu"] == 40.0
+    assert len(aggregator.Query("edge-1", "cpu.usage")["t"]) == 5
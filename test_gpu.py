@@ -0,0 +1,86 @@
+import stat
+import sys
+import time
+
+from PySystemInfo.GPU import GPUBackend
+
+FAKE_NVIDIA_SMI = '''#!{python}
+import sys, time
+gpus = ["0, GPU-0, Fake GPU, 10, 8192, 1024, 7168, 40",
+        "1, GPU-1, Fake GPU, [N/A], 8192, 2048, 6144, 55"]
+if "-lms" in sys.argv and "{mode}" == "hang":
+    # 输出一轮后不再输出，但进程仍然存活
+    print(gpus[0], flush=True)
+    time.sleep(30)
+if "-lms" not in sys.argv:
+    print("\\n".join(gpus), flush=True)
+    raise SystemExit(0)
+# 第一轮输出两块GPU，之后GPU 1被移除
+print("\\n".join(gpus), flush=True)
+for _ in range(3):
+    time.sleep(0.05)
+    print(gpus[0], flush=True)
+time.sleep(30)
+'''
+
+
+def fake_nvidia_smi(tmp_path, monkeypatch, mode='normal'):
+    path = tmp_path / 'nvidia-smi'
+    path.write_text(FAKE_NVIDIA_SMI.format(python=sys.executable, mode=mode))
+    path.chmod(path.stat().st_mode | stat.S_IXUSR)
+    monkeypatch.setenv('NVIDIA_SMI', str(path))
+    return str(path)
+
+
+def test_single_query(tmp_path, monkeypatch):
+    fake_nvidia_smi(tmp_path, monkeypatch)
+    gpus = GPUBackend().Query()
+    assert [gpu['id'] for gpu in gpus] == [0, 1]
+    assert gpus[0]['memory_util'] == 12.5 and gpus[1]['load'] is None
+
+
+def test_missing_executable(tmp_path, monkeypatch):
+    monkeypatch.setenv('NVIDIA_SMI', str(tmp_path / 'missing'))
+    backend = GPUBackend()
+    assert backend.Query() == []
+    assert backend.StartQueryLoop() is False
+
+
+def test_query_loop_drops_removed_gpus(tmp_path, monkeypatch):
+    fake_nvidia_smi(tmp_path, monkeypatch)
+    backend = GPUBackend()
+    assert backend.StartQueryLoop(Interval=0.05)
+    try:
+        deadline = time.monotonic() + 10
+        seen = set()
+        while time.monotonic() < deadline:
+            ids = tuple(gpu['id'] for gpu in backend.Query())
+            seen.add(ids)
+            if (0, 1) in seen and ids == (0,):
+                break
+            time.sleep(0.01)
+        assert (0, 1) in seen
+        assert [gpu['id'] for gpu in backend.Query()] == [0]
+        assert backend.IsQueryLoopRunning()
+    finally:
+        backend.StopQueryLoop()
+    assert not backend.IsQueryLoopRunning()
+
+
+def test_stalled_query_loop_is_replaced(tmp_path, monkeypatch):
+    fake_nvidia_smi(tmp_path, monkeypatch, mode='hang')
+    backend = GPUBackend()
+    assert backend.StartQueryLoop(Interval=0.05, StaleAfter=0.5)
+    try:
+        first = backend._loop
+        deadline = time.monotonic() + 10
+        while not backend.Query() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert [gpu['id'] for gpu in backend.Query()] == [0]
+        time.sleep(0.6)
+        # 循环停止输出后改用单次查询（两块GPU），并启动新的循环进程
+        assert [gpu['id'] for gpu in backend.Query()] == [0, 1]
+        assert backend._loop is not first and backend.IsQueryLoopRunning()
+        assert first.poll() is not None
+    finally:
+        backend.StopQueryLoop()
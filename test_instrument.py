@@ -0,0 +1,52 @@
+import cProfile
+import pstats
+import marshal
+import threading
+
+from PySystemInfo.Instrument import CPROFILE, ProfileSession
+
+
+def work(n=20000):
+    return sum(i * i for i in range(n))
+
+
+def test_concurrent_cprofile_threads():
+    session = ProfileSession(CPROFILE)
+    session.Start()
+    results, errors = [], []
+
+    def run():
+        try:
+            session.Begin()
+            results.append(session.Run(work))
+        except Exception as e:
+            errors.append(e)
+        finally:
+            session.End()
+
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    session.Stop()
+    assert errors == []
+    assert results == [work()] * 4
+    _, data, _ = session.Result()
+    assert any(key[2] == 'work' for key in marshal.loads(data))
+
+
+def test_other_profiler_active():
+    # 外部分析工具已在运行时，被测调用照常返回
+    other = cProfile.Profile()
+    other.enable()
+    try:
+        session = ProfileSession(CPROFILE)
+        session.Start()
+        session.Begin()
+        assert session.Run(work) == work()
+        session.End()
+        session.Stop()
+    finally:
+        other.disable()
+    session.Result()
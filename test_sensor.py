@@ -0,0 +1,162 @@
+import errno
+import os
+
+from PySystemInfo import Sensor
+from PySystemInfo.Sensor import SensorReader, GetSensorReader, GetSensors
+
+
+def write(root, path, text):
+    path = os.path.join(root, path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(text + '\n')
+
+
+def fake_sysfs(root):
+    root = str(root)
+    write(root, 'class/hwmon/hwmon0/name', 'coretemp')
+    write(root, 'class/hwmon/hwmon0/temp1_input', '45000')
+    write(root, 'class/hwmon/hwmon0/temp1_label', 'Package id 0')
+    write(root, 'class/hwmon/hwmon0/temp1_max', '80000')
+    write(root, 'class/hwmon/hwmon0/temp1_crit', '100000')
+    write(root, 'class/hwmon/hwmon1/name', 'nct6775')
+    write(root, 'class/hwmon/hwmon1/fan1_input', '1200')
+    write(root, 'class/hwmon/hwmon1/fan1_label', 'CPU_FAN')
+    write(root, 'class/hwmon/hwmon1/power1_average', '15500000')
+    # 旧内核：传感器文件在 device/ 子目录下
+    write(root, 'class/hwmon/hwmon2/name', 'legacy')
+    write(root, 'class/hwmon/hwmon2/device/temp1_input', '30000')
+    write(root, 'class/thermal/thermal_zone0/type', 'acpitz')
+    write(root, 'class/thermal/thermal_zone0/temp', '27800')
+    write(root, 'class/thermal/thermal_zone0/trip_point_0_type', 'passive')
+    write(root, 'class/thermal/thermal_zone0/trip_point_0_temp', '90000')
+    write(root, 'class/thermal/thermal_zone0/trip_point_1_type', 'critical')
+    write(root, 'class/thermal/thermal_zone0/trip_point_1_temp', '105000')
+    write(root, 'class/power_supply/BAT0/type', 'Battery')
+    write(root, 'class/power_supply/BAT0/capacity', '87')
+    write(root, 'class/power_supply/BAT0/status', 'Discharging')
+    write(root, 'class/power_supply/BAT0/voltage_now', '12000000')
+    write(root, 'class/power_supply/BAT0/current_now', '1500000')
+    write(root, 'class/power_supply/AC/type', 'Mains')
+    write(root, 'class/power_supply/AC/online', '1')
+    return root
+
+
+def test_discovery_and_read(tmp_path):
+    reader = SensorReader(fake_sysfs(tmp_path))
+    sensors = reader.Read()
+    assert sensors["temperatures"]["coretemp"] == [Sensor.Temperature('Package id 0', 45.0, 80.0, 100.0)]
+    assert sensors["temperatures"]["legacy"] == [Sensor.Temperature('', 30.0, None, None)]
+    assert sensors["fans"]["nct6775"] == [Sensor.Fan('CPU_FAN', 1200.0)]
+    assert sensors["power"]["nct6775"] == [Sensor.Power('', 15.5)]
+    battery = sensors["supplies"]["BAT0"]
+    assert battery.type == 'Battery' and battery.percent == 87 and battery.status == 'Discharging'
+    # 没有power_now时由电压和电流计算
+    assert battery.power == 18.0
+    assert sensors["supplies"]["AC"].online is True
+    reader.Close()
+
+
+def test_thermal_trip_points(tmp_path):
+    reader = SensorReader(fake_sysfs(tmp_path))
+    zone = reader.Read()["temperatures"]["acpitz"][0]
+    assert zone == Sensor.Temperature('thermal_zone0', 27.8, 90.0, 105.0)
+    reader.Close()
+
+
+def test_values_are_reread_through_open_handles(tmp_path):
+    root = fake_sysfs(tmp_path)
+    reader = SensorReader(root)
+    reader.Read()
+    write(root, 'class/hwmon/hwmon0/temp1_input', '47000')
+    assert reader.Read()["temperatures"]["coretemp"][0].current == 47.0
+    reader.Close()
+
+
+def test_rediscovery_after_enodev(tmp_path, monkeypatch):
+    root = fake_sysfs(tmp_path)
+    reader = SensorReader(root)
+    reader.Read()
+    write(root, 'class/hwmon/hwmon0/temp2_input', '38000')
+    # 已发现的设备中新增的传感器在重新发现之前不会出现
+    assert len(reader.Read()["temperatures"]["coretemp"]) == 1
+
+    pread = os.pread
+
+    def removed(fd, size, offset):
+        raise OSError(errno.ENODEV, "No such device")
+
+    monkeypatch.setattr(Sensor.os, 'pread', removed)
+    assert reader.Read()["temperatures"] == {}
+    monkeypatch.setattr(Sensor.os, 'pread', pread)
+    assert reader.Read()["temperatures"]["coretemp"][1].current == 38.0
+    reader.Close()
+
+
+def test_new_devices_are_discovered(tmp_path):
+    root = fake_sysfs(tmp_path)
+    reader = SensorReader(root)
+    reader.Read()
+    mtime = os.stat(os.path.join(root, 'class/hwmon')).st_mtime_ns
+    write(root, 'class/hwmon/hwmon3/name', 'nvme')
+    write(root, 'class/hwmon/hwmon3/temp1_input', '38000')
+    # 保证类目录的mtime确实变化（文件系统时间戳精度可能较粗）
+    os.utime(os.path.join(root, 'class/hwmon'), ns=(mtime + 1000000000, mtime + 1000000000))
+    assert reader.Read()["temperatures"]["nvme"][0].current == 38.0
+    reader.Close()
+
+
+def test_periodic_rediscovery(tmp_path):
+    root = fake_sysfs(tmp_path)
+    reader = SensorReader(root, RescanInterval=0)
+    reader.Read()
+    write(root, 'class/hwmon/hwmon0/temp2_input', '38000')
+    assert reader.Read()["temperatures"]["coretemp"][1].current == 38.0
+    reader.Close()
+
+
+def test_vanishing_thermal_zone(tmp_path, monkeypatch):
+    root = fake_sysfs(tmp_path)
+    listdir = os.listdir
+
+    def vanished(path):
+        if path.endswith('thermal_zone0'):
+            raise FileNotFoundError(errno.ENOENT, "No such file or directory", path)
+        return listdir(path)
+
+    monkeypatch.setattr(Sensor.os, 'listdir', vanished)
+    reader = SensorReader(root)
+    zone = reader.Read()["temperatures"]["acpitz"][0]
+    assert zone == Sensor.Temperature('thermal_zone0', 27.8, None, None)
+    reader.Close()
+
+
+def test_transient_errors_do_not_rediscover(tmp_path, monkeypatch):
+    reader = SensorReader(fake_sysfs(tmp_path))
+    reader.Read()
+
+    def busy(fd, size, offset):
+        raise OSError(errno.EIO, "I/O error")
+
+    monkeypatch.setattr(Sensor.os, 'pread', busy)
+    assert reader.Read()["temperatures"] == {}
+    assert not reader._stale
+    reader.Close()
+
+
+def test_psutil_fallback(tmp_path, monkeypatch):
+    missing = str(tmp_path / 'missing')
+    assert GetSensorReader(missing) is None
+    monkeypatch.setattr(Sensor, 'GetTemperature', lambda: {"cpu": [Sensor.Temperature('', 50.0, None, None)]})
+    monkeypatch.setattr(Sensor, 'GetFanSpeed', lambda: {})
+    monkeypatch.setattr(Sensor, 'GetBatteryInfo', lambda: None)
+    sensors = GetSensors(missing)
+    assert sensors["temperatures"]["cpu"][0].current == 50.0
+    assert sensors["fans"] == {} and sensors["power"] == {} and sensors["supplies"] == {}
+
+
+def test_shared_reader_per_root(tmp_path):
+    root = fake_sysfs(tmp_path)
+    assert GetSensorReader(root) is GetSensorReader(root)
+    assert GetSensors(root)["temperatures"]["coretemp"][0].current == 45.0
+    GetSensorReader(root).Close()